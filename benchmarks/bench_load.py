@@ -0,0 +1,215 @@
+"""Runs ServerCommunicator, AntiBot and ToxicityManager against fake_server.py and reports throughput and latencies
+
+Run from the root of the project:
+    python benchmarks/bench_load.py
+    python benchmarks/bench_load.py --scenarios bot_wave mixed --duration 60"""
+
+
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'src'))
+
+import psutil
+
+from loguru import logger
+
+from settings import settings
+from anti_bot.anti_bot import AntiBot
+from toxicity_manager.manager import ToxicityManager
+from server_communicator.communicator import ServerCommunicator
+
+from fake_server import SCENARIOS
+
+
+ROOT        = Path(__file__).resolve().parents[1]
+FAKE_SERVER = Path(__file__).resolve().parent / 'fake_server.py'
+FIXTURES    = ROOT / 'tests' / 'test_notifications' / 'fixtures'
+LOOP_SLEEP  = 1
+"""Seconds between runs of AntiBot, as in manager's main loop"""
+
+
+def configure(work_dir: Path) -> None:
+    """Configures settings for a fast benchmark: AntiBot runs on each loop and kicks static Users sooner
+
+    Notes:
+        Login bursts are counted per second, with threshold below the smallest bot wave, but above the rate, at which
+        humans log in, so only bot waves and forbidden commands get kicked
+
+    Args:
+        work_dir: Temporary folder for files, that are written during the run"""
+
+    shutil.copy(FIXTURES / 'notifications_data.json', work_dir / 'messages.json')
+    shutil.copy(FIXTURES / 'user_data.json', work_dir / 'users.json')
+
+    settings.paths.MESSAGES    = str(work_dir / 'messages.json')
+    settings.paths.USERS_DATA  = str(work_dir / 'users.json')
+    settings.paths.BAD_WORDS   = str(ROOT / 'bad_words.txt')
+    settings.paths.LEMMA_CACHE = ''
+    settings.paths.DB          = str(work_dir / 'bench.db')
+    settings.raw_log.FILE      = str(work_dir / 'minecraft.log')
+
+    settings.notifications.ACTIVATED     = True
+    settings.notifications.USERS_STORAGE = 'json'
+    settings.TOXICITY_ON                 = True
+
+    settings.antibot.ON                                   = True
+    settings.antibot.RUN_EVERY                            = 1
+    settings.antibot.KICK_STATIC_IN_SPAWN_POINT_AFTER_SEC = 5
+    settings.antibot.KICK_STATIC_IN_SPAWN_AREA_AFTER_SEC  = 10
+    settings.antibot.WINDOW_SIZE_SECONDS                  = 1
+    settings.antibot.LOGINS_THRESHOLD                     = 25
+
+
+def percentile(values: list[float],
+               percent: float) -> float:
+    """Gets percentile of values
+
+    Args:
+        values: Values
+        percent: Percentile, 0-100
+    Returns:
+        Percentile or NaN, if there are no values"""
+
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[min(int(len(values) * percent / 100), len(values) - 1)]
+
+
+def run_scenario(scenario: str,
+                 duration: float,
+                 work_dir: Path) -> dict:
+    """Runs fake server with scenario and the manager's components on top of it
+
+    Args:
+        scenario: Name of the scenario
+        duration: Seconds to run
+        work_dir: Temporary folder
+    Returns:
+        Results"""
+
+    stats_path = work_dir / f'{scenario}.json'
+    server_proc = subprocess.Popen(
+        [sys.executable, str(FAKE_SERVER), '--scenario', scenario, '--stats', str(stats_path)],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        bufsize=0
+    )
+
+    server_comm  = ServerCommunicator(server_proc)
+    line_times   = []
+    process_line = server_comm._process_line
+
+    def timed_process_line(line: str) -> None:
+        started_at = time.perf_counter()
+        process_line(line)
+        line_times.append(time.perf_counter() - started_at)
+
+    server_comm._process_line = timed_process_line
+    server_comm.antibot       = AntiBot(server_comm)
+    server_comm.toxicity      = ToxicityManager(server_comm)
+    server_comm.start_communication()
+
+    me          = psutil.Process()
+    cpu_before  = me.cpu_times()
+    max_rss     = me.memory_info().rss
+    max_queue   = 0
+    cycle_times = []
+
+    started_at = time.monotonic()
+    while time.monotonic() - started_at < duration:
+        cycle_started_at = time.perf_counter()
+        server_comm.antibot.check_players()
+        cycle_times.append(time.perf_counter() - cycle_started_at)
+
+        max_rss   = max(max_rss, me.memory_info().rss)
+        max_queue = max(max_queue, server_comm._output_queue.qsize())
+        time.sleep(LOOP_SLEEP)
+
+    server_comm.antibot.stop()
+    server_comm.toxicity.stop()
+    server_comm.send_to_server('stop')
+    server_proc.wait(timeout=30)
+    server_comm._stop_event.wait(timeout=30)
+    server_comm._output_queue.join()
+    # Delayed kicks may still be pending, they are dropped silently, as there is no server anymore
+    server_comm.server_proc = None
+    wall      = time.monotonic() - started_at
+    cpu_after = me.cpu_times()
+    server_comm.notificator.stop()
+
+    server_stats = json.loads(stats_path.read_text(encoding='utf-8'))
+    cpu = (cpu_after.user - cpu_before.user) + (cpu_after.system - cpu_before.system)
+    return {
+        'scenario': scenario,
+        'lines': server_stats['lines'],
+        'processed': len(line_times),
+        'lines_per_sec': len(line_times) / wall,
+        'line_p50_us': percentile(line_times, 50) * 1e6,
+        'line_p99_us': percentile(line_times, 99) * 1e6,
+        'cycle_p50_ms': percentile(cycle_times, 50) * 1e3,
+        'cycle_max_ms': max(cycle_times) * 1e3,
+        'max_queue': max_queue,
+        'kicks': len(server_stats['login_kick_latency']),
+        'login_kick_p50_s': percentile(server_stats['login_kick_latency'], 50),
+        'command_kick_p50_ms': percentile(server_stats['command_kick_latency'], 50) * 1e3,
+        'command_kick_p95_ms': percentile(server_stats['command_kick_latency'], 95) * 1e3,
+        'bans': server_stats['commands'].get('ban-ip', 0),
+        'bots_left': server_stats['bots_left'],
+        'cpu_percent': cpu / wall * 100,
+        'max_rss_mb': max_rss / 2 ** 20,
+        'commands': sum(server_stats['commands'].values()),
+    }
+
+
+def print_results(results: list[dict]) -> None:
+    """Prints results as a table
+
+    Args:
+        results: Results of scenarios"""
+
+    for result in results:
+        print(f'\n== {result["scenario"]} ==')
+        print(f'lines:        {result["processed"]}/{result["lines"]} processed, '
+              f'{result["lines_per_sec"]:.0f} lines/s, max queue {result["max_queue"]}')
+        print(f'per line:     p50 {result["line_p50_us"]:.0f} us, p99 {result["line_p99_us"]:.0f} us')
+        print(f'AntiBot:      cycle p50 {result["cycle_p50_ms"]:.1f} ms, max {result["cycle_max_ms"]:.1f} ms')
+        print(f'kicks:        {result["kicks"]}, login->kick p50 {result["login_kick_p50_s"]:.1f} s, '
+              f'command->kick p50 {result["command_kick_p50_ms"]:.1f} ms, p95 {result["command_kick_p95_ms"]:.1f} ms')
+        print(f'bans:         {result["bans"]}, bots left online {result["bots_left"]}, '
+              f'commands sent {result["commands"]}')
+        print(f'resources:    CPU {result["cpu_percent"]:.0f}%, max RSS {result["max_rss_mb"]:.0f} MB')
+    print(f'\nMedian throughput: {statistics.median(r["lines_per_sec"] for r in results):.0f} lines/s')
+
+
+def main() -> None:
+    """Runs benchmark and prints results"""
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--duration', type=float, default=20, help='Seconds per scenario')
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level='ERROR')
+
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        configure(Path(work_dir))
+        for scenario in args.scenarios:
+            results.append(run_scenario(scenario, args.duration, Path(work_dir)))
+    print_results(results)
+
+
+if __name__ == '__main__':
+    main()
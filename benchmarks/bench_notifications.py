@@ -0,0 +1,138 @@
+"""Compares selection of login notification: linear scan over announcements vs EligibilityIndex
+
+Run from the root of the project:
+    python benchmarks/bench_notifications.py"""
+
+
+import sys
+import time
+import random
+
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'src'))
+
+from notifications.eligibility import EligibilityIndex
+from notifications.models import NotificationsCatalogue, Notification, User
+
+
+ANNOUNCEMENTS = 500
+USERS         = 2_000
+LOGINS        = 50_000
+MAX_VIEWS     = 3
+
+
+def build_catalogue() -> NotificationsCatalogue:
+    """Builds catalogue with lots of announcements and a few random texts
+
+    Returns:
+        Catalogue"""
+
+    data = []
+    for i in range(ANNOUNCEMENTS):
+        data.append({
+            'id': f'announcement_{i}',
+            'max_views': MAX_VIEWS,
+            'header': {'en': f'Header {i}'},
+            'body': {'en': f'Body {i}'}
+        })
+    for i in range(5):
+        data.append({'id': f'text_{i}', 'max_views': 0, 'header': {'en': 'T'}, 'body': {'en': 'Text'}})
+    return NotificationsCatalogue(data)
+
+
+def build_users() -> list[User]:
+    """Builds Users, which have already seen some part of announcements
+
+    Returns:
+        Users"""
+
+    users = []
+    for i in range(USERS):
+        seen = random.randint(0, ANNOUNCEMENTS)
+        data = [{'id': f'announcement_{j}', 'times_seen': MAX_VIEWS} for j in range(seen)]
+        users.append(User(name=f'user_{i}', data=data))
+    return users
+
+
+def linear_select(catalogue: NotificationsCatalogue,
+                  user: User) -> Notification | None:
+    """Previous implementation: walks all announcements on each login
+
+    Args:
+        catalogue: Catalogue
+        user: User
+    Returns:
+        Announcement or None"""
+
+    for notification in catalogue.announcements:
+        if notification.id in user.seen_announcements:
+            if notification.max_views > user.seen_announcements[notification.id].times_seen:
+                return notification
+        else:
+            return notification
+    return None
+
+
+def record_view(user: User,
+                notification: Notification) -> None:
+    """Same as storage does on view
+
+    Args:
+        user: User
+        notification: Shown notification"""
+
+    if notification.id in user.seen_announcements:
+        user.seen_announcements[notification.id].times_seen += 1
+    else:
+        user.add_new_seen_notification(notification)
+
+
+def run(use_index: bool,
+        logins: list[int]) -> float:
+    """Runs all logins
+
+    Args:
+        use_index: If to select with EligibilityIndex
+        logins: Indexes of Users, that log in
+    Returns:
+        Seconds spent"""
+
+    random.seed(1)
+    catalogue = build_catalogue()
+    users     = build_users()
+    index     = EligibilityIndex()
+
+    started_at = time.perf_counter()
+    for user_index in logins:
+        user = users[user_index]
+        if use_index:
+            announcement = index.get_next_announcement(catalogue, user)
+        else:
+            announcement = linear_select(catalogue, user)
+
+        if announcement:
+            record_view(user, announcement)
+            if use_index:
+                index.on_view(catalogue, user, announcement)
+
+    return time.perf_counter() - started_at
+
+
+def main() -> None:
+    """Runs benchmark and prints results"""
+
+    random.seed(2)
+    logins = [random.randrange(USERS) for _ in range(LOGINS)]
+
+    linear_time = run(use_index=False, logins=logins)
+    index_time  = run(use_index=True, logins=logins)
+
+    print(f'{ANNOUNCEMENTS} announcements, {USERS} users, {LOGINS} logins')
+    print(f'Linear scan:       {linear_time:.3f}s ({linear_time / LOGINS * 1e6:.1f} us per login)')
+    print(f'Eligibility index: {index_time:.3f}s ({index_time / LOGINS * 1e6:.1f} us per login)')
+    print(f'Speed up: x{linear_time / index_time:.1f}')
+
+
+if __name__ == '__main__':
+    main()
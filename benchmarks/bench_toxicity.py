@@ -0,0 +1,91 @@
+"""Compares check of chat messages for bad words: better_profanity vs ProfanityMatcher
+
+Run from the root of the project:
+    python benchmarks/bench_toxicity.py"""
+
+
+import sys
+import time
+import random
+
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'src'))
+
+from better_profanity import Profanity
+
+from toxicity_manager.matcher import ProfanityMatcher
+
+
+BAD_WORDS = Path(__file__).resolve().parents[1] / 'bad_words.txt'
+MESSAGES  = 300
+TOXIC     = 0.05
+
+CLEAN_WORDS = [
+    'привет', 'как', 'дела', 'где', 'база', 'пойдем', 'в', 'шахту', 'алмазы', 'нашел', 'крипер', 'взорвал', 'дом',
+    'hello', 'anyone', 'trade', 'diamonds', 'for', 'iron', 'lol', 'gg', 'server', 'lag', 'spawn', 'nether', 'portal'
+]
+"""Words to build clean messages from"""
+
+
+def build_corpus(bad_words: list[str]) -> list[str]:
+    """Builds chat messages, some of them with bad words
+
+    Args:
+        bad_words: Bad words
+    Returns:
+        Messages"""
+
+    random.seed(1)
+    messages = []
+    for _ in range(MESSAGES):
+        words = random.choices(CLEAN_WORDS, k=random.randint(1, 15))
+        if random.random() < TOXIC:
+            words.insert(random.randrange(len(words) + 1), random.choice(bad_words))
+        messages.append(' '.join(words))
+    return messages
+
+
+def measure(check, messages: list[str]) -> tuple[float, int]:
+    """Checks all messages
+
+    Args:
+        check: Function, that checks single message
+        messages: Messages to check
+    Returns:
+        Seconds spent and number of messages with bad words"""
+
+    started_at = time.perf_counter()
+    found = sum(1 for message in messages if check(message))
+    return time.perf_counter() - started_at, found
+
+
+def main() -> None:
+    """Runs benchmark and prints results"""
+
+    bad_words = BAD_WORDS.read_text(encoding='utf-8').splitlines()
+    messages  = build_corpus(bad_words)
+
+    started_at = time.perf_counter()
+    # Same as ToxicityManager did: default word list plus words from the file
+    profanity  = Profanity()
+    profanity.add_censor_words(bad_words)
+    profanity_build = time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    matcher    = ProfanityMatcher(ProfanityMatcher.get_default_words() + bad_words)
+    matcher_build = time.perf_counter() - started_at
+
+    profanity_time, profanity_found = measure(profanity.contains_profanity, messages)
+    matcher_time, matcher_found     = measure(matcher.contains_profanity, messages)
+
+    print(f'{len(bad_words)} bad words, {MESSAGES} messages')
+    print(f'better_profanity: build {profanity_build:.3f}s, check {profanity_time:.3f}s '
+          f'({profanity_time / MESSAGES * 1e6:.1f} us per message), found {profanity_found}')
+    print(f'ProfanityMatcher: build {matcher_build:.3f}s, check {matcher_time:.3f}s '
+          f'({matcher_time / MESSAGES * 1e6:.1f} us per message), found {matcher_found}')
+    print(f'Speed up: x{profanity_time / matcher_time:.1f}')
+
+
+if __name__ == '__main__':
+    main()
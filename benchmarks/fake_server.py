@@ -0,0 +1,400 @@
+"""Fake Minecraft server: prints log lines of a live Paper server and answers commands, to load the manager without Java
+
+Can stand in for server.jar through PATH_START_BAT (ex: a script, that runs 'python fake_server.py --scenario mixed').
+Writes statistics of received commands as JSON on exit, if --stats is set. See --help for options"""
+
+
+import sys
+import json
+import time
+import uuid
+import random
+import argparse
+import threading
+
+from collections import Counter
+
+
+SCENARIOS: dict[str, dict[str, float]] = {
+    'idle':     {'players': 10, 'logins_per_sec': 0.2, 'chat_per_sec': 0.5, 'commands_per_sec': 0,
+                 'bot_wave_every_sec': 0, 'bot_wave_size': 0},
+    'chat':     {'players': 50, 'logins_per_sec': 0.5, 'chat_per_sec': 100, 'commands_per_sec': 0.5,
+                 'bot_wave_every_sec': 0, 'bot_wave_size': 0},
+    'bot_wave': {'players': 20, 'logins_per_sec': 0.5, 'chat_per_sec': 2, 'commands_per_sec': 0.5,
+                 'bot_wave_every_sec': 10, 'bot_wave_size': 30},
+    'mixed':    {'players': 100, 'logins_per_sec': 2, 'chat_per_sec': 50, 'commands_per_sec': 2,
+                 'bot_wave_every_sec': 15, 'bot_wave_size': 50},
+    'flood':    {'players': 200, 'logins_per_sec': 5, 'chat_per_sec': 5000, 'commands_per_sec': 5,
+                 'bot_wave_every_sec': 5, 'bot_wave_size': 100},
+}
+"""Rates of events per scenario"""
+
+SPAWN: tuple[float, float, float] = (5560.5, 87.0, -4583.5)
+"""Spawn point, same as default spawn point of AntiBot"""
+
+FORBIDDEN_COMMANDS = ['plugins', 'pl', 'bukkit:version', 'version grimac', 'tps']
+ALLOWED_COMMANDS   = ['home', 'spawn', 'msg Friend hi', 'tpa Friend', 'help']
+CHAT_WORDS         = ['hello', 'anyone', 'trade', 'diamonds', 'for', 'iron', 'lol', 'gg', 'lag', 'nether', 'base',
+                      'привет', 'как', 'дела', 'пойдем', 'в', 'шахту', 'алмазы', 'нашел', 'крипер', 'взорвал', 'дом']
+
+TICKS_PER_SEC = 20
+
+INITIAL_LOGINS_PER_SEC = 15
+"""Players, who are online from the start, log in at this rate, so they do not look like a burst of bot logins"""
+
+
+class Player:
+    """Player online
+
+    Attributes:
+        name: Player's name
+        ip: Player's IP
+        is_bot: Bots never move
+        x: X coordinate
+        y: Y coordinate
+        z: Z coordinate
+        tags: Scoreboard-tags
+        logged_in_at: Time of login line (monotonic)"""
+
+    def __init__(self,
+                 name: str,
+                 ip: str,
+                 is_bot: bool):
+        """Init
+
+        Args:
+            name: Player's name
+            ip: Player's IP
+            is_bot: Bots never move"""
+
+        self.name:         str      = name
+        self.ip:           str      = ip
+        self.is_bot:       bool     = is_bot
+        self.x:            float    = SPAWN[0]
+        self.y:            float    = SPAWN[1]
+        self.z:            float    = SPAWN[2]
+        self.tags:         set[str] = set()
+        self.logged_in_at: float    = time.monotonic()
+
+    def walk(self) -> None:
+        """Makes a step away from spawn"""
+
+        self.x += random.uniform(0, 0.5)
+        self.z += random.uniform(-0.5, 0.5)
+
+
+class FakeServer:
+    """Prints events of the chosen scenario and answers commands from stdin
+
+    Attributes:
+        _rates: Rates of events
+        _duration: Seconds to run (0 - until 'stop')
+        _stats_path: Path to write statistics to
+        _players: Players online {name: Player}
+        _banned_ips: IPs, banned with ban-ip
+        _counter: Counter for names and entity ids
+        _commands: Number of received commands {verb: count}
+        _login_kick_latency: Seconds from login to kick, for kicked Players
+        _command_kick_latency: Seconds from forbidden command to kick
+        _forbidden_issued_at: Time of forbidden command {name: monotonic}
+        _lines: Number of printed lines
+        _stopped: Set on 'stop'
+        _lock: Lock for players and output"""
+
+    def __init__(self,
+                 rates: dict[str, float],
+                 duration: float,
+                 stats_path: str):
+        """Init
+
+        Args:
+            rates: Rates of events
+            duration: Seconds to run (0 - until 'stop')
+            stats_path: Path to write statistics to (empty - do not write)"""
+
+        self._rates:                dict[str, float]  = rates
+        self._duration:             float             = duration
+        self._stats_path:           str               = stats_path
+        self._players:              dict[str, Player] = {}
+        self._banned_ips:           set[str]          = set()
+        self._counter:              int               = 0
+        self._commands:             Counter           = Counter()
+        self._login_kick_latency:   list[float]       = []
+        self._command_kick_latency: list[float]       = []
+        self._forbidden_issued_at:  dict[str, float]  = {}
+        self._lines:                int               = 0
+        self._stopped:              threading.Event   = threading.Event()
+        self._lock:                 threading.RLock   = threading.RLock()
+
+    def run(self) -> None:
+        """Prints startup lines, then events, until duration is over or 'stop' is received"""
+
+        threading.Thread(target=self._read_commands, daemon=True).start()
+
+        self._emit('Starting minecraft server version 1.21.4')
+        self._emit('Preparing level "world"')
+        self._emit('Done (3.142s)! For help, type "help"')
+
+        started_at    = time.monotonic()
+        next_bot_wave = started_at + self._rates['bot_wave_every_sec']
+        logged_in     = 0
+        while not self._stopped.is_set():
+            now = time.monotonic()
+            if self._duration and now - started_at >= self._duration:
+                break
+
+            due = min(int(self._rates['players']), int((now - started_at) * INITIAL_LOGINS_PER_SEC) + 1)
+            for _ in range(due - logged_in):
+                self._login(is_bot=False)
+            logged_in = due
+
+            self._tick()
+            if self._rates['bot_wave_every_sec'] and now >= next_bot_wave:
+                self._bot_wave()
+                next_bot_wave = now + self._rates['bot_wave_every_sec']
+
+            time.sleep(1 / TICKS_PER_SEC)
+
+        self._emit('Stopping server')
+        self._write_stats()
+
+    def _tick(self) -> None:
+        """Generates events of a single tick"""
+
+        with self._lock:
+            for player in self._players.values():
+                if not player.is_bot:
+                    player.walk()
+
+        for _ in range(self._events_in_tick('logins_per_sec')):
+            self._logout()
+            self._login(is_bot=False)
+        for _ in range(self._events_in_tick('chat_per_sec')):
+            self._chat()
+        for _ in range(self._events_in_tick('commands_per_sec')):
+            self._command()
+
+    def _events_in_tick(self,
+                        rate_name: str) -> int:
+        """Number of events in a tick, so that on average there are rate events per second
+
+        Args:
+            rate_name: Name of the rate
+        Returns:
+            Number of events"""
+
+        expected = self._rates[rate_name] / TICKS_PER_SEC
+        events = int(expected)
+        if random.random() < expected - events:
+            events += 1
+        return events
+
+    def _login(self,
+               is_bot: bool,
+               ip: str = '') -> None:
+        """Prints lines of a login
+
+        Args:
+            is_bot: If Player is a bot
+            ip: Player's IP (random, if not set)"""
+
+        with self._lock:
+            self._counter += 1
+            name = f'{"Bot" if is_bot else "Player"}{self._counter}'
+            ip = ip or f'10.{random.randint(0, 255)}.{random.randint(0, 255)}.{random.randint(1, 254)}'
+            port = random.randint(40000, 60000)
+
+            self._emit(f'UUID of player {name} is {uuid.uuid4()}')
+            if ip in self._banned_ips:
+                self._emit(f'Disconnecting {name} (/{ip}:{port}): You are banned from this server.')
+                return
+
+            player = Player(name, ip, is_bot)
+            self._players[name] = player
+            self._emit(f'{name}[/{ip}:{port}] logged in with entity id {self._counter} '
+                       f'at ([world]{player.x}, {player.y}, {player.z})')
+            self._emit(f'{name} joined the game')
+
+    def _logout(self) -> None:
+        """Disconnects random human Player"""
+
+        with self._lock:
+            humans = [player for player in self._players.values() if not player.is_bot]
+            if not humans:
+                return
+            player = random.choice(humans)
+            del self._players[player.name]
+            self._emit(f'{player.name} lost connection: Disconnected')
+            self._emit(f'{player.name} left the game')
+
+    def _bot_wave(self) -> None:
+        """Logs in lots of bots from a single subnet within a second"""
+
+        subnet = f'203.0.{random.randint(0, 255)}'
+        for i in range(int(self._rates['bot_wave_size'])):
+            self._login(is_bot=True, ip=f'{subnet}.{i % 254 + 1}')
+
+    def _chat(self) -> None:
+        """Prints chat message of random Player. Bots repeat themselves"""
+
+        with self._lock:
+            if not self._players:
+                return
+            player = random.choice(list(self._players.values()))
+            if player.is_bot:
+                text = 'join my server play.example.com'
+            else:
+                text = ' '.join(random.choices(CHAT_WORDS, k=random.randint(1, 12)))
+            self._emit(f'[Not Secure] <{player.name}> {text}')
+
+    def _command(self) -> None:
+        """Prints command of random Player. Bots issue forbidden commands"""
+
+        with self._lock:
+            if not self._players:
+                return
+            player = random.choice(list(self._players.values()))
+            if player.is_bot or random.random() < 0.1:
+                command = random.choice(FORBIDDEN_COMMANDS)
+                self._forbidden_issued_at.setdefault(player.name, time.monotonic())
+            else:
+                command = random.choice(ALLOWED_COMMANDS)
+            self._emit(f'{player.name} issued server command: /{command}')
+
+    def _read_commands(self) -> None:
+        """Reads commands from stdin and answers them"""
+
+        for line in sys.stdin:
+            command = line.strip()
+            if command:
+                self._handle_command(command)
+            if self._stopped.is_set():
+                return
+        self._stopped.set()
+
+    def _handle_command(self,
+                        command: str) -> None:
+        """Answers command the same way, as server does
+
+        Args:
+            command: Command from stdin"""
+
+        verb = command.split(' ', 1)[0]
+        self._commands[verb] += 1
+
+        with self._lock:
+            if verb == 'stop':
+                self._stopped.set()
+
+            elif verb == 'tps':
+                self._emit('TPS from last 1m, 5m, 15m: 20.0, 20.0, 20.0')
+
+            elif verb == 'tag':
+                # tag Name add msm_tracked
+                parts = command.split()
+                player = self._players.get(parts[1]) if len(parts) == 4 else None
+                if player:
+                    if parts[2] == 'add' and parts[3] not in player.tags:
+                        player.tags.add(parts[3])
+                        self._emit(f"Added tag '{parts[3]}' to {player.name}")
+                    elif parts[2] == 'remove' and parts[3] in player.tags:
+                        player.tags.discard(parts[3])
+                        self._emit(f"Removed tag '{parts[3]}' from {player.name}")
+                    else:
+                        self._emit(f'Unable to {parts[2]} tag')
+
+            elif verb == 'execute' and '@a[tag=' in command:
+                # execute as @a[tag=msm_tracked] at @s run tp @s ~ ~ ~
+                tag = command.split('@a[tag=')[1].split(']')[0]
+                for player in self._players.values():
+                    if tag in player.tags:
+                        self._emit(f'Teleported {player.name} to {player.x:.6f}, {player.y:.6f}, {player.z:.6f}')
+
+            elif verb == 'tp':
+                # tp Name ~ ~ ~
+                parts = command.split()
+                player = self._players.get(parts[1]) if len(parts) > 1 else None
+                if player:
+                    self._emit(f'Teleported {player.name} to {player.x:.6f}, {player.y:.6f}, {player.z:.6f}')
+
+            elif verb == 'kick':
+                parts = command.split(' ', 2)
+                player = self._players.pop(parts[1], None) if len(parts) > 1 else None
+                if player:
+                    now = time.monotonic()
+                    reason = parts[2] if len(parts) > 2 else 'Kicked by an operator'
+                    self._login_kick_latency.append(now - player.logged_in_at)
+                    issued_at = self._forbidden_issued_at.pop(player.name, None)
+                    if issued_at is not None:
+                        self._command_kick_latency.append(now - issued_at)
+                    self._emit(f'Kicked {player.name}: {reason}')
+                    self._emit(f'{player.name} lost connection: {reason}')
+
+            elif verb == 'ban-ip':
+                parts = command.split(' ', 2)
+                self._banned_ips.add(parts[1])
+                self._emit(f'Banned IP {parts[1]}: {parts[2] if len(parts) > 2 else "Banned by an operator"}')
+
+            elif verb == 'pardon-ip':
+                ip = command.split()[1]
+                self._banned_ips.discard(ip)
+                self._emit(f'Unbanned IP {ip}')
+
+    def _emit(self,
+              message: str) -> None:
+        """Prints log line with Paper's prefix
+
+        Args:
+            message: Message itself"""
+
+        with self._lock:
+            sys.stdout.write(f'[{time.strftime("%H:%M:%S")} INFO]: {message}\n')
+            sys.stdout.flush()
+            self._lines += 1
+
+    def _write_stats(self) -> None:
+        """Writes statistics of commands as JSON"""
+
+        if not self._stats_path:
+            return
+
+        with self._lock:
+            stats = {
+                'lines': self._lines,
+                'commands': dict(self._commands),
+                'login_kick_latency': self._login_kick_latency,
+                'command_kick_latency': self._command_kick_latency,
+                'banned_ips': len(self._banned_ips),
+                'players_left': len(self._players),
+                'bots_left': sum(1 for player in self._players.values() if player.is_bot),
+            }
+        with open(self._stats_path, 'w', encoding='utf-8') as f:
+            json.dump(stats, f)
+
+
+def main() -> None:
+    """Parses arguments and runs server"""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scenario', choices=list(SCENARIOS), default='mixed', help='Rates of events')
+    parser.add_argument('--duration', type=float, default=0, help='Seconds to run, 0 - until "stop"')
+    parser.add_argument('--stats', default='', help='Path to JSON with statistics, written on exit')
+    parser.add_argument('--seed', type=int, default=1, help='Seed for random')
+    for rate_name in SCENARIOS['mixed']:
+        parser.add_argument(f'--{rate_name.replace("_", "-")}', type=float, help='Overrides rate of the scenario')
+    args = parser.parse_args()
+
+    rates = dict(SCENARIOS[args.scenario])
+    for rate_name in rates:
+        value = getattr(args, rate_name)
+        if value is not None:
+            rates[rate_name] = value
+
+    sys.stdin.reconfigure(encoding='utf-8')
+    sys.stdout.reconfigure(encoding='utf-8')
+    random.seed(args.seed)
+    FakeServer(rates, duration=args.duration, stats_path=args.stats).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,21 @@
+import time
 import threading
 
 from loguru import logger
 from typing import TYPE_CHECKING
 
 from settings import settings
+from metrics.registry import METRICS
 from anti_bot.cycler import Cycler
 from anti_bot.kicker import Kicker
 from anti_bot.storage import STORAGE
+from anti_bot.ip_intel import IP_INTEL
+from anti_bot.reputation import REPUTATION
+from anti_bot.poller import CoordinatesPoller
 from anti_bot.detector import Detector
+from anti_bot.spawn_zones import ZonesSnapshot
 from anti_bot.teleporter import Teleporter
+from anti_bot.commands_trie import CommandsTrie
 from anti_bot.logins_manager import LoginsManager
 from server_communicator.logs_extractor import LogsExtractor
 
@@ -18,6 +25,13 @@ if TYPE_CHECKING:
 from anti_bot.models import Coordinates
 
 
+CYCLE_SECONDS = METRICS.histogram('msm_antibot_cycle_seconds', 'Duration of AntiBot cycle')
+PHASE_SECONDS = {
+    phase: METRICS.histogram('msm_antibot_phase_seconds', 'Durations of phases of AntiBot cycle', phase=phase)
+    for phase in ('unban', 'poll', 'login_bursts', 'snapshot', 'movements', 'static', 'disconnected', 'ips')
+}
+
+
 class AntiBot:
     """Logic of kicking and banning bots
 
@@ -27,7 +41,9 @@ class AntiBot:
         _login_manager: Logic of logins for Users (what to do on login)
         _teleporter: Teleports Users
         _cycler: Checks cycles and aggressive runs
-        _detector: Detects User-events"""
+        _detector: Detects User-events
+        _forbidden_commands: Tree of commands to kick for
+        _poller: Requests coordinates of tracked Users"""
 
     def __init__(self,
                  server_comm: 'ServerCommunicator'):
@@ -43,6 +59,15 @@ class AntiBot:
         self._cycler:        Cycler              = Cycler(server_comm)
         self._detector:      Detector            = Detector()
 
+        self._forbidden_commands: CommandsTrie      = CommandsTrie(settings.antibot.KICK_FOR_COMMANDS)
+        self._poller:             CoordinatesPoller = CoordinatesPoller(
+            server_comm,
+            park_after=settings.antibot.PARK_AFTER_POLLS,
+            parked_poll_every=settings.antibot.PARKED_POLL_EVERY
+        )
+
+        REPUTATION.load_blocklist(settings.paths.IP_BLOCKLIST)
+
     def check_players(self) -> None:
         """Entrypoint into logic
 
@@ -56,36 +81,46 @@ class AntiBot:
             if STORAGE.get_tracked_users_count() == 0:
                 return
 
+            with CYCLE_SECONDS.time():
+                self._run_cycle()
+
+            if self._cycler.is_aggressive():
+                self._protect_aggressively()
+        except Exception as e:
+            logger.exception(e)
+
+    def _run_cycle(self) -> None:
+        """Runs phases of the cycle, measuring each of them"""
+
+        with PHASE_SECONDS['unban'].time():
             self.unban_ips(unban_all=False)
+        with PHASE_SECONDS['poll'].time():
             self._request_current_coordinates()
-
+        with PHASE_SECONDS['login_bursts'].time():
             self._protect_from_login_bursts()
 
-            self._untrack_moved_users()
-            self._detector.check_movements()
+        with PHASE_SECONDS['snapshot'].time():
+            snapshot = self._detector.take_snapshot(STORAGE.get_tracked_users())
+        with PHASE_SECONDS['movements'].time():
+            self._untrack_moved_users(snapshot)
+            self._detector.check_movements(snapshot)
 
-            self._protect_from_static_users()
+        with PHASE_SECONDS['static'].time():
+            self._protect_from_static_users(snapshot)
+        with PHASE_SECONDS['disconnected'].time():
             self._protect_from_disconnected_users()
+        with PHASE_SECONDS['ips'].time():
             self._protect_by_ips()
 
-            if self._cycler.is_aggressive():
-                self._protect_aggressively()
-        except Exception as e:
-            logger.exception(e)
-
     def _request_current_coordinates(self) -> None:
         """Requests current User's coordinates by executing fake teleport with command to server
 
-        Result of this teleportation will be a log with Player's coordinates, which will be picked later
-
-        Notes:
-            This command does not make player actually teleport, it seems to have affect even if player is running"""
+        Result of this teleportation will be a log with Player's coordinates, which will be picked later. All tracked
+        Users are requested with a single command, see CoordinatesPoller. Users, who have no login coordinates yet,
+        have no entity on server, so they are not polled"""
 
         tracked_users = STORAGE.get_tracked_users()
-
-        for user in tracked_users:
-            command = f'execute at {user.name} run tp {user.name} ~ ~ ~\n'
-            self._server_comm.send_to_server(command)
+        self._poller.poll([user.name for user in tracked_users if user.initial_coordinates])
 
     def _protect_from_login_bursts(self) -> None:
         """Detects and kicks users, logged in a small time-window"""
@@ -94,10 +129,14 @@ class AntiBot:
         if len(users_to_kick) > 0:
             threading.Thread(target=self._kicker.kick_due_to_login_bursts, args=(users_to_kick,)).start()
 
-    def _protect_from_static_users(self) -> None:
-        """Protects from static Users, which don't want to leave spawn or move at all"""
+    def _protect_from_static_users(self,
+                                   snapshot: ZonesSnapshot) -> None:
+        """Protects from static Users, which don't want to leave spawn or move at all
+
+        Args:
+            snapshot: Results of testing Users against spawn zones in this cycle"""
 
-        static_in_spawn_point, static_in_spawn_area = self._detector.get_static_users()
+        static_in_spawn_point, static_in_spawn_area = self._detector.get_static_users(snapshot)
         self._kicker.kick_due_to_static(static_in_spawn_point=static_in_spawn_point,
                                         static_in_spawn_area=static_in_spawn_area)
 
@@ -122,14 +161,14 @@ class AntiBot:
     def _protect_by_ips(self) -> None:
         """Searches for IPs to ban them by different criteria, and bans them"""
 
-        if STORAGE.get_tracked_ips_count() == 0:
-            return
-
-        ips_to_ban = self._detector.collect_ips_with_lots_of_kicked_users()
-        ips_to_ban = ips_to_ban + self._detector.collect_ips_with_lots_of_kicks_for_single_user()
-        if len(ips_to_ban) > 0:
-            logger.warning(f'Collected IPs to ban: {ips_to_ban}')
-        self._kicker.ban_ips(ips_to_ban)
+        started_at = time.time()
+        if STORAGE.get_tracked_ips_count() > 0:
+            ips_to_ban = self._detector.collect_ips_with_lots_of_kicked_users()
+            ips_to_ban = ips_to_ban + self._detector.collect_ips_with_lots_of_kicks_for_single_user()
+            if len(ips_to_ban) > 0:
+                logger.warning(f'Collected IPs to ban: {ips_to_ban}')
+            self._kicker.ban_ips(ips_to_ban)
+        REPUTATION.drop_offenders(marked_before=started_at)
 
     def unban_ips(self,
                   unban_all: bool = True) -> None:
@@ -140,11 +179,17 @@ class AntiBot:
 
         if unban_all:
             ips_to_unban = STORAGE.get_tracked_ips()
+            IP_INTEL.unban_all()
         else:
-            ips_to_unban = self._detector.get_ips_to_unban()
+            ips_to_unban = self._kicker.get_ips_to_unban()
 
         self._kicker.unban_ips(ips_to_unban)
 
+    def stop(self) -> None:
+        """Sends remaining ban-commands to server"""
+
+        self._kicker.stop()
+
     def add_user(self,
                  user_uuid: str | None,
                  user_name: str):
@@ -183,6 +228,16 @@ class AntiBot:
         if user:
             user.save_login_data(login_coords, ip_address)
 
+            reject_reason = REPUTATION.get_reject_reason(ip_address) if ip_address else None
+            if reject_reason:
+                self._kicker.kick_due_to_bad_reputation(user, reject_reason)
+                return
+
+            banned_subnet = IP_INTEL.get_banned_subnet(ip_address) if ip_address else None
+            if banned_subnet:
+                self._kicker.kick_due_to_banned_subnet(user, banned_subnet)
+                return
+
             if not self._login_manager.is_login_allowed(user):
                 self._kicker.kick_due_to_login_sanctions(user)
                 return
@@ -243,20 +298,46 @@ class AntiBot:
         if not user:
             logger.error(f'{user_name=} is not found! Kicking')
             self._kicker.kick_by_user_name(user_name)
+            return
 
+        in_spawn = True
         if self._detector.check_if_coords_in_spawn_point(coords):
             logger.info(f'User {user.name} still in Spawn Point')
+        elif self._detector.check_if_coords_are_in_spawn_area(coords):
+            logger.info(f'User {user.name} still in Spawn Area')
         else:
-            if self._detector.check_if_coords_are_in_spawn_area(coords):
-                logger.info(f'User {user.name} still in Spawn Area')
+            in_spawn = False
+
+        previous = user.last_know_coords
+        changed  = not previous or (previous.x, previous.y, previous.z) != (coords.x, coords.y, coords.z)
+        self._poller.on_coordinates(user_name=user.name, changed=changed, in_spawn=in_spawn)
 
         user.last_know_coords = coords
 
+    def confirm_tag(self,
+                    user_name: str,
+                    tag: str) -> None:
+        """Passes confirmation of added tag to poller
+
+        Args:
+            user_name: User, who got the tag
+            tag: Added tag"""
+
+        self._poller.on_tag_added(user_name=user_name, tag=tag)
+
     def become_aggressive(self) -> None:
         """Sets antibot to be aggressive for some period of time"""
 
         self._cycler.become_aggressive()
 
+    def is_aggressive(self) -> bool:
+        """Checks if aggressive mode is on
+
+        Returns:
+            True, in case aggressive mode is on"""
+
+        return self._cycler.is_aggressive()
+
     def _parse_coords(self,
                       coords_str) -> Coordinates | None:
         """Parses coordinates into Model
@@ -276,16 +357,20 @@ class AntiBot:
             if settings.LOGS_DEPTH != 'INFO':
                 logger.exception(e)
 
-    def _untrack_moved_users(self) -> None:
-        """Forgets User, who moved or were spawned outside spawn area"""
+    def _untrack_moved_users(self,
+                             snapshot: ZonesSnapshot) -> None:
+        """Forgets User, who moved or were spawned outside spawn area
+
+        Args:
+            snapshot: Results of testing Users against spawn zones in this cycle"""
 
         tracked_users = STORAGE.get_tracked_users()
         users_to_untrack = []
         for user in tracked_users:
-            if user.initial_coordinates:
-                if not self._detector.check_if_coords_are_in_spawn_area(user.initial_coordinates):
-                    users_to_untrack.append(user)
-                    continue
+            # None - initial coordinates were not known, when snapshot was taken
+            if snapshot.is_initial_in_area(user) is False:
+                users_to_untrack.append(user)
+                continue
 
             if user.left_spawn:
                 logger.info(f'User {user.name} left spawn')
@@ -303,10 +388,5 @@ class AntiBot:
             command: Command that User is trying to execute
             user_name: Name of the User"""
 
-        command = command.lower()
-        if command.strip() == '':
-            return
-        for forbidden_command in settings.antibot.KICK_FOR_COMMANDS:
-            if command == forbidden_command or command.startswith(forbidden_command + ' '):
-                self._kicker.kick_due_to_forbidden_command(user_name)
-                return
+        if self._forbidden_commands.is_forbidden(command):
+            self._kicker.kick_due_to_forbidden_command(user_name)
@@ -0,0 +1,141 @@
+import time
+import heapq
+import queue
+import datetime
+import threading
+
+from loguru import logger
+from typing import TYPE_CHECKING, Optional
+
+from anti_bot.models import TrackedIp
+
+if TYPE_CHECKING:
+    from server_communicator.communicator import ServerCommunicator
+
+
+class BanManager:
+    """Keeps unban deadlines of banned IPs and sends ban-commands to server from its own thread
+
+    Notes:
+        Deadlines are kept in a min-heap, so finding IPs to unban takes time, proportional to the number of due IPs,
+        not to the number of all tracked IPs. Entries are never removed from the heap directly: entry, that does not
+        match IP's current deadline anymore (IP was unbanned or banned again), is just skipped, once popped.
+        Commands are sent not faster than commands_per_sec, so server's console is not flooded, but the caller never
+        waits for them
+
+    Attributes:
+        _server_comm: Communicator to send commands with
+        _interval: Seconds between two commands
+        _deadlines: Heap of (unban time (POSIX), IP)
+        _ips: Banned IPs {IP: TrackedIp}
+        _commands: Commands to send. None stops the sender
+        _flush: If remaining commands should be sent without delays
+        _lock: Lock for heap
+        _sender: Thread, that sends commands"""
+
+    def __init__(self,
+                 server_comm: 'ServerCommunicator',
+                 commands_per_sec: float):
+        """Init
+
+        Args:
+            server_comm: Communicator to send commands with
+            commands_per_sec: Max number of commands per second (0 - no limit)"""
+
+        self._server_comm: 'ServerCommunicator'       = server_comm
+        self._interval:    float                      = 1 / commands_per_sec if commands_per_sec > 0 else 0
+        self._deadlines:   list[tuple[float, str]]    = []
+        self._ips:         dict[str, TrackedIp]       = {}
+        self._commands:    queue.Queue[Optional[str]] = queue.Queue()
+        self._flush:       bool                       = False
+        self._lock:        threading.Lock             = threading.Lock()
+
+        self._sender: threading.Thread = threading.Thread(target=self._send_loop, daemon=True)
+        self._sender.start()
+
+    def schedule_unban(self,
+                       ip: TrackedIp) -> None:
+        """Remembers deadline of just banned IP
+
+        Args:
+            ip: Banned IP with unban_me_at set"""
+
+        if not ip.unban_me_at:
+            return
+
+        with self._lock:
+            self._ips[ip.ip] = ip
+            heapq.heappush(self._deadlines, (ip.unban_me_at, ip.ip))
+
+    def pop_due(self) -> list[TrackedIp]:
+        """Pops IPs, whose bans have expired
+
+        Returns:
+            IPs to unban"""
+
+        now = datetime.datetime.now().timestamp()
+        due = []
+        with self._lock:
+            while self._deadlines and self._deadlines[0][0] < now:
+                unban_at, ip_str = heapq.heappop(self._deadlines)
+                ip = self._ips.get(ip_str)
+                if ip is None or not ip.banned or ip.unban_me_at != unban_at:
+                    continue
+                del self._ips[ip_str]
+                due.append(ip)
+        return due
+
+    def get_scheduled_count(self) -> int:
+        """Counts entries in the heap, including outdated ones
+
+        Returns:
+            Number of entries"""
+
+        with self._lock:
+            return len(self._deadlines)
+
+    def send(self,
+             command: str) -> None:
+        """Puts command into queue, without waiting
+
+        Args:
+            command: Command to send"""
+
+        self._commands.put(command)
+
+    def get_queue_size(self) -> int:
+        """Counts commands, that are not sent yet
+
+        Returns:
+            Number of commands in queue"""
+
+        return self._commands.qsize()
+
+    def stop(self,
+             timeout: float = 30) -> None:
+        """Sends remaining commands without delays and stops the sender
+
+        Args:
+            timeout: Seconds to wait for remaining commands to be sent"""
+
+        self._flush = True
+        self._commands.put(None)
+        self._sender.join(timeout=timeout)
+        if self._sender.is_alive():
+            logger.error(f'Ban-commands were not sent in {timeout} seconds, {self.get_queue_size()} are left')
+
+    def _send_loop(self) -> None:
+        """Sends commands from queue, keeping the interval between them"""
+
+        while True:
+            command = self._commands.get()
+            if command is None:
+                return
+
+            try:
+                self._server_comm.send_to_server(command)
+            except Exception as e:
+                logger.exception(e)
+
+            if self._interval and not self._flush:
+                time.sleep(self._interval)
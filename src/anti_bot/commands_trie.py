@@ -0,0 +1,108 @@
+class CommandsTrie:
+    """Token-level prefix tree of forbidden commands, compiled once from settings
+
+    Notes:
+        Command is forbidden, if its first tokens are equal to tokens of any forbidden command (so 'version grimac'
+        forbids 'version grimac 2', but not 'version'). Namespace of the command is optional: forbidden 'plugins' also
+        forbids 'bukkit:plugins' and 'minecraft:plugins', while forbidden 'bukkit:plugins' forbids only itself.
+        Known aliases of commands are replaced with the main name, so 'pl' is the same as 'plugins'. Check takes time,
+        proportional to the number of tokens in command, and does not depend on the number of forbidden commands
+
+    Attributes:
+        _root: Root node of the tree: {token: node}. Node, that ends forbidden command, has END key"""
+
+    ALIASES: dict[str, str] = {
+        'pl':            'plugins',
+        'ver':           'version',
+        'about':         'version',
+        'icanhasbukkit': 'version',
+        '?':             'help',
+    }
+    """Aliases of commands {alias: main name}"""
+
+    END: str = ''
+    """Key, that marks the end of forbidden command (can not be a token, as tokens are not empty)"""
+
+    def __init__(self,
+                 commands: list[str]):
+        """Init
+
+        Args:
+            commands: Forbidden commands"""
+
+        self._root: dict = {}
+
+        for command in commands:
+            self.add(command)
+
+    def add(self,
+            command: str) -> None:
+        """Adds forbidden command
+
+        Args:
+            command: Command (without leading slash)"""
+
+        tokens = command.lower().split()
+        if not tokens:
+            return
+
+        node = self._root
+        for token in [self._canonize(tokens[0])] + tokens[1:]:
+            node = node.setdefault(token, {})
+        node[self.END] = True
+
+    def is_forbidden(self,
+                     command: str) -> bool:
+        """Checks if command is forbidden
+
+        Args:
+            command: Command, issued by User (without leading slash)
+        Returns:
+            True, if command starts with any of forbidden commands"""
+
+        tokens = command.lower().split()
+        if not tokens:
+            return False
+
+        first_token = self._canonize(tokens[0])
+        if self._walk(first_token, tokens):
+            return True
+
+        namespace, _, name = tokens[0].rpartition(':')
+        if namespace and name:
+            return self._walk(self._canonize(name), tokens)
+        return False
+
+    def _walk(self,
+              first_token: str,
+              tokens: list[str]) -> bool:
+        """Walks the tree along command's tokens
+
+        Args:
+            first_token: Canonized name of the command
+            tokens: All tokens of the command
+        Returns:
+            True, if forbidden command ended on the way"""
+
+        node = self._root.get(first_token)
+        index = 1
+        while node is not None:
+            if self.END in node:
+                return True
+            if index == len(tokens):
+                return False
+            node = node.get(tokens[index])
+            index += 1
+        return False
+
+    def _canonize(self,
+                  name: str) -> str:
+        """Replaces alias with the main name of the command, keeping namespace
+
+        Args:
+            name: Name of the command, with or without namespace
+        Returns:
+            Canonized name"""
+
+        namespace, separator, command = name.rpartition(':')
+        return namespace + separator + self.ALIASES.get(command, command)
@@ -1,15 +1,34 @@
-import datetime
 from collections import defaultdict
 
 from loguru import logger
 
 from anti_bot.models import TrackedUser, Coordinates, TrackedIp
 from anti_bot.storage import STORAGE
+from anti_bot.spawn_zones import SpawnZones, ZonesSnapshot
 from settings import settings
 
 
 class Detector:
-    """Logic, related to detecting bots"""
+    """Logic, related to detecting bots
+
+    Attributes:
+        zones: Spawn areas and points, compiled from settings"""
+
+    def __init__(self):
+        """Init"""
+
+        self.zones: SpawnZones = SpawnZones.from_settings()
+
+    def take_snapshot(self,
+                      users: list[TrackedUser]) -> ZonesSnapshot:
+        """Tests coordinates of all Users against spawn zones at once, to use results during the cycle
+
+        Args:
+            users: Users to test
+        Returns:
+            Results of tests"""
+
+        return self.zones.take_snapshot(users)
 
     def detect_login_bursts(self) -> list[TrackedUser]:
         """Detects logins in a small time-window. Window is fixed
@@ -91,13 +110,7 @@ class Detector:
         for kicked_ip in kicked_ips:
             if kicked_ip.banned:
                 continue
-
-            kicked_users_count_on_ip = 0
-            for user in all_users:
-                if user.ip == kicked_ip.ip and user.kicked_count > 0:
-                    kicked_users_count_on_ip += 1
-
-            if kicked_users_count_on_ip >= settings.antibot.BAN_IP_IF_KICKED_USERS_NUMBER and not kicked_ip.banned:
+            if self.has_lots_of_kicked_users(kicked_ip, all_users):
                 ips_to_ban.append(kicked_ip)
 
         if ips_to_ban:
@@ -112,25 +125,55 @@ class Detector:
         for ip in kicked_ips:
             if ip.banned:
                 continue
-
-            unique_users = set(ip.kicked_user_names)
-            for user_name in unique_users:
-                user = STORAGE.get_user(user_name)
-                if user:
-                    if user.kicked_count >= settings.antibot.BAN_IP_IF_SINGLE_USER_KICKED_NUMBER and not ip.banned:
-                        ips_to_ban.append(ip)
+            if self.has_user_with_lots_of_kicks(ip):
+                ips_to_ban.append(ip)
 
         if ips_to_ban:
             logger.warning(f'Collected IPs to kick due to lots of logins for single user: {ips_to_ban}')
         return ips_to_ban
 
-    def get_static_users(self) -> tuple[list[TrackedUser], list[TrackedUser]]:
+    @staticmethod
+    def has_lots_of_kicked_users(kicked_ip: TrackedIp,
+                                 all_users: list[TrackedUser]) -> bool:
+        """Checks if there were too many kicked Users on IP
+
+        Args:
+            kicked_ip: IP to check
+            all_users: All known Users
+        Returns:
+            True, if IP should be banned"""
+
+        kicked_users_count_on_ip = 0
+        for user in all_users:
+            if user.ip == kicked_ip.ip and user.kicked_count > 0:
+                kicked_users_count_on_ip += 1
+        return kicked_users_count_on_ip >= settings.antibot.BAN_IP_IF_KICKED_USERS_NUMBER
+
+    @staticmethod
+    def has_user_with_lots_of_kicks(kicked_ip: TrackedIp) -> bool:
+        """Checks if there is a User with lots of kicks on IP
+
+        Args:
+            kicked_ip: IP to check
+        Returns:
+            True, if IP should be banned"""
+
+        for user_name in set(kicked_ip.kicked_user_names):
+            user = STORAGE.get_user(user_name)
+            if user and user.kicked_count >= settings.antibot.BAN_IP_IF_SINGLE_USER_KICKED_NUMBER:
+                return True
+        return False
+
+    def get_static_users(self,
+                         snapshot: ZonesSnapshot) -> tuple[list[TrackedUser], list[TrackedUser]]:
         """Collects Users that are considered static
 
         Notes:
             Considers Users as static if they are standing in spawn point or if they don't leave spawn area. These
             checks are based on different time window - less time is given to Users, that are standing still in
             spawn point, while Users in spawn area have more time before been considered static (aka bot)
+        Args:
+            snapshot: Results of testing Users against spawn zones in this cycle
         Returns:
             Users, static in spawn point and in spawn area"""
 
@@ -140,29 +183,31 @@ class Detector:
         tracked_users = STORAGE.get_tracked_users()
         for user in tracked_users:
 
-            if not user.last_know_coords:
+            if snapshot.is_in_area(user) is None:
                 logger.debug(f'User {user.name} does not yet have current coordinates')
                 continue
 
-            if self._check_if_user_in_spawn_point_too_long(user):
+            if self._check_if_user_in_spawn_point_too_long(user, snapshot):
                 static_in_spawn_point.append(user)
                 continue
 
-            if self._check_if_user_in_spawn_area_too_long(user):
+            if self._check_if_user_in_spawn_area_too_long(user, snapshot):
                 static_in_spawn_area.append(user)
 
         return static_in_spawn_point, static_in_spawn_area
 
     def _check_if_user_in_spawn_point_too_long(self,
-                                               user: TrackedUser) -> bool:
+                                               user: TrackedUser,
+                                               snapshot: ZonesSnapshot) -> bool:
         """Checks if User is in spawn point for too long
 
         Args:
             user: User to check
+            snapshot: Results of testing Users against spawn zones in this cycle
         Returns:
             True, if User is in spawn point for too long without moving away from it"""
 
-        if self.check_if_coords_in_spawn_point(user.last_know_coords) and not user.moved:
+        if snapshot.is_in_point(user) and not user.moved:
             time_since_login = user.get_time_since_login()
             if time_since_login > settings.antibot.KICK_STATIC_IN_SPAWN_POINT_AFTER_SEC:
                 logger.debug(f'User {user.name} in spawn point for too long and will be kicked')
@@ -172,15 +217,17 @@ class Detector:
             return False
 
     def _check_if_user_in_spawn_area_too_long(self,
-                                              user: TrackedUser) -> bool:
+                                              user: TrackedUser,
+                                              snapshot: ZonesSnapshot) -> bool:
         """Checks if User is in spawn area for too long
 
         Args:
             user: User to check
+            snapshot: Results of testing Users against spawn zones in this cycle
         Returns:
             True, if User is in spawn area for too long without leaving it"""
 
-        if self.check_if_coords_are_in_spawn_area(user.last_know_coords) and not user.left_spawn:
+        if snapshot.is_in_area(user) and not user.left_spawn:
             time_since_login = user.get_time_since_login()
             if time_since_login > settings.antibot.KICK_STATIC_IN_SPAWN_AREA_AFTER_SEC:
                 logger.debug(f'User {user.name} in spawn area for too long and will be kicked')
@@ -199,13 +246,7 @@ class Detector:
         Returns:
             True, in case coordinates (x,z) are in spawn point"""
 
-        x_spawn = settings.antibot.SPAWN_POINT_X
-        z_spawn = settings.antibot.SPAWN_POINT_Z
-        in_x = x_spawn - 1 <= coords.x <= x_spawn + 1
-        in_z = z_spawn - 1 <= coords.z <= z_spawn + 1
-        if in_x and in_z:
-            return True
-        return False
+        return self.zones.is_in_point(coords)
 
     def check_if_coords_are_in_spawn_area(self,
                                           coords: Coordinates) -> bool:
@@ -218,53 +259,36 @@ class Detector:
         Returns:
             True, in case coords are in spawn area"""
 
-        x_in = False
-        z_in = False
-        if settings.antibot.SPAWN_X_MIN <= coords.x <= settings.antibot.SPAWN_X_MAX:
-            x_in = True
-        if settings.antibot.SPAWN_Z_MIN <= coords.z <= settings.antibot.SPAWN_Z_MAX:
-            z_in = True
+        return self.zones.is_in_area(coords)
 
-        coords_in_spawn_area = x_in and z_in
-        return coords_in_spawn_area
+    def check_movements(self,
+                        snapshot: ZonesSnapshot) -> None:
+        """Checks all Users for any movements
 
-    def check_movements(self) -> None:
-        """Checks all Users for any movements"""
+        Args:
+            snapshot: Results of testing Users against spawn zones in this cycle"""
 
         tracked_users = STORAGE.get_tracked_users()
         for user in tracked_users:
-            self._check_user_movement(user)
+            self._check_user_movement(user, snapshot)
 
     def _check_user_movement(self,
-                             user: TrackedUser) -> None:
+                             user: TrackedUser,
+                             snapshot: ZonesSnapshot) -> None:
         """Checks if User moved at all and leave spawn
 
         Args:
-            user: User to check"""
+            user: User to check
+            snapshot: Results of testing Users against spawn zones in this cycle"""
 
-        if not user.last_know_coords or not user.initial_coordinates:
+        moved = snapshot.has_moved(user)
+        if moved is None:
             return
 
-        if user.initial_coordinates.x != user.last_know_coords.x \
-                or user.initial_coordinates.z != user.last_know_coords.z:
+        if moved:
             user.moved = True
             logger.debug(f'User {user.name} moved')
 
-        if not self.check_if_coords_are_in_spawn_area(user.last_know_coords):
+        if not snapshot.is_in_area(user):
             user.left_spawn = True
             logger.debug(f'User {user.name} is not in spawn are')
-
-    def get_ips_to_unban(self) -> list[TrackedIp]:
-        """Collects IPs that can be unbanned
-
-        Returns:
-            IPs that can be unbanned"""
-
-        ips_to_unban = []
-        now = datetime.datetime.now().timestamp()
-        all_ips = STORAGE.get_tracked_ips()
-        for ip in all_ips:
-            if ip.unban_me_at and ip.unban_me_at < now:
-                ips_to_unban.append(ip)
-
-        return ips_to_unban
@@ -0,0 +1,334 @@
+import time
+import ipaddress
+import threading
+
+from collections import OrderedDict
+from loguru import logger
+from typing import Any, Optional
+
+from settings import settings
+
+
+IpNetwork = ipaddress.IPv4Network | ipaddress.IPv6Network
+"""Any network"""
+
+
+class PrefixNode:
+    """Node of PrefixTree
+
+    Attributes:
+        children: Nodes for the next bit 0 and 1
+        network: Network, that ends in this node, if any
+        value: Value of the network"""
+
+    __slots__ = ('children', 'network', 'value')
+
+    def __init__(self):
+        """Init"""
+
+        self.children: list[Optional[PrefixNode]] = [None, None]
+        self.network:  Optional[IpNetwork]        = None
+        self.value:    Any                        = None
+
+
+class PrefixTree:
+    """Binary prefix tree of networks, to find the longest network, that contains an address
+
+    Notes:
+        Each bit of network's prefix is a level of the tree, so lookup takes at most 32 steps for IPv4 and 128 for IPv6,
+        no matter how many networks are stored. Single addresses are stored as /32 (/128) networks
+
+    Attributes:
+        _roots: Root nodes {IP version: node}
+        _size: Number of stored networks"""
+
+    def __init__(self):
+        """Init"""
+
+        self._roots: dict[int, PrefixNode] = {4: PrefixNode(), 6: PrefixNode()}
+        self._size:  int                   = 0
+
+    def __len__(self) -> int:
+        """Number of stored networks
+
+        Returns:
+            Number of stored networks"""
+
+        return self._size
+
+    def insert(self,
+               network: IpNetwork,
+               value: Any = True) -> None:
+        """Stores network with value, replacing value of the same network
+
+        Args:
+            network: Network to store
+            value: Value of the network"""
+
+        node = self._roots[network.version]
+        for bit in self._iter_bits(int(network.network_address), network.max_prefixlen, network.prefixlen):
+            if node.children[bit] is None:
+                node.children[bit] = PrefixNode()
+            node = node.children[bit]
+
+        if node.network is None:
+            self._size += 1
+        node.network = network
+        node.value   = value
+
+    def remove(self,
+               network: IpNetwork) -> bool:
+        """Removes network (empty branches are left, as they are cheap and are likely to be reused)
+
+        Args:
+            network: Network to remove
+        Returns:
+            True, if network was stored"""
+
+        node = self._roots[network.version]
+        for bit in self._iter_bits(int(network.network_address), network.max_prefixlen, network.prefixlen):
+            node = node.children[bit]
+            if node is None:
+                return False
+
+        if node.network is None:
+            return False
+        node.network = None
+        node.value   = None
+        self._size  -= 1
+        return True
+
+    def lookup(self,
+               address: ipaddress.IPv4Address | ipaddress.IPv6Address) -> Optional[tuple[IpNetwork, Any]]:
+        """Finds the longest stored network, that contains address
+
+        Args:
+            address: Address to search
+        Returns:
+            Network and its value or None, if address is not in any network"""
+
+        node  = self._roots[address.version]
+        found = None
+        if node.network is not None:
+            found = node.network, node.value
+
+        for bit in self._iter_bits(int(address), address.max_prefixlen, address.max_prefixlen):
+            node = node.children[bit]
+            if node is None:
+                break
+            if node.network is not None:
+                found = node.network, node.value
+        return found
+
+    def items(self) -> list[tuple[IpNetwork, Any]]:
+        """Collects all stored networks
+
+        Returns:
+            Pairs (network, value)"""
+
+        result = []
+        stack  = list(self._roots.values())
+        while stack:
+            node = stack.pop()
+            if node.network is not None:
+                result.append((node.network, node.value))
+            stack.extend(child for child in node.children if child is not None)
+        return result
+
+    @staticmethod
+    def _iter_bits(number: int,
+                   max_length: int,
+                   length: int):
+        """Iterates the highest bits of the number
+
+        Args:
+            number: Number to take bits from
+            max_length: Total number of bits
+            length: Number of bits to take
+        Yields:
+            Bits from the highest one"""
+
+        for shift in range(max_length - 1, max_length - 1 - length, -1):
+            yield (number >> shift) & 1
+
+
+class SubnetStats:
+    """Kicks, collected for a single subnet
+
+    Attributes:
+        network: Subnet
+        kicked_ips: Distinct IPs from this subnet, that were kicked, with time of the last kick {IP: timestamp}
+        kicks: Overall number of kicks from this subnet
+        ban_counter: Number of bans of this subnet"""
+
+    def __init__(self,
+                 network: IpNetwork):
+        """Init
+
+        Args:
+            network: Subnet"""
+
+        self.network:     IpNetwork        = network
+        self.kicked_ips:  dict[str, float] = {}
+        self.kicks:       int              = 0
+        self.ban_counter: int              = 0
+
+    def add_kick(self,
+                 ip: str,
+                 now: float) -> int:
+        """Counts kick of IP and forgets IPs, that were kicked too long ago
+
+        Args:
+            ip: Kicked IP
+            now: Time of kick
+        Returns:
+            Number of distinct IPs, kicked within the window"""
+
+        self.kicks += 1
+        self.kicked_ips.pop(ip, None)
+        self.kicked_ips[ip] = now
+
+        expired_before = now - settings.antibot.RANGE_BAN_WINDOW_SEC
+        for kicked_ip, kicked_at in list(self.kicked_ips.items()):
+            if kicked_at >= expired_before:
+                break
+            del self.kicked_ips[kicked_ip]
+        return len(self.kicked_ips)
+
+
+class IpIntel:
+    """Aggregates kicks per subnet and keeps bans of whole subnets
+
+    Notes:
+        Server can only ban exact IPs, so a botnet, that rotates addresses in one subnet, would be banned address by
+        address. Instead, each kick is counted for its subnet (/24 for IPv4 and /48 for IPv6 by default), and once
+        enough distinct IPs from it were kicked within a sliding window, the whole subnet is banned by AntiBot itself:
+        any login from it is kicked right away. Bans expire the same way as IP-bans do: N-th ban of subnet lasts N
+        times longer, than the first one. Only the most recently kicked subnets are remembered
+
+    Attributes:
+        _subnets: Kicks per subnet, the least recently kicked first {subnet: SubnetStats}
+        _banned: Banned subnets with unban time (POSIX) as value
+        _lock: Lock, as kicks and logins come from different threads"""
+
+    def __init__(self):
+        """Init"""
+
+        self._subnets: OrderedDict[IpNetwork, SubnetStats] = OrderedDict()
+        self._banned:  PrefixTree                          = PrefixTree()
+        self._lock:    threading.Lock                      = threading.Lock()
+
+    @staticmethod
+    def get_subnet(ip: str) -> Optional[IpNetwork]:
+        """Gets subnet, kicks from IP are aggregated in
+
+        Args:
+            ip: IP address
+        Returns:
+            Subnet or None, if IP can not be parsed"""
+
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            return None
+
+        if address.version == 4:
+            prefix = settings.antibot.RANGE_BAN_PREFIX_V4
+        else:
+            prefix = settings.antibot.RANGE_BAN_PREFIX_V6
+        return ipaddress.ip_network(f'{address}/{prefix}', strict=False)
+
+    def record_kick(self,
+                    ip: str) -> Optional[IpNetwork]:
+        """Counts kick for subnet of IP and bans subnet, if there were too many kicked IPs in it
+
+        Args:
+            ip: Kicked IP
+        Returns:
+            Subnet, if it was banned right now"""
+
+        subnet = self.get_subnet(ip)
+        if subnet is None or not settings.antibot.RANGE_BAN_AFTER_IPS:
+            return None
+
+        with self._lock:
+            stats = self._subnets.get(subnet)
+            if stats is None:
+                stats = SubnetStats(subnet)
+                self._subnets[subnet] = stats
+                while len(self._subnets) > settings.antibot.RANGE_BAN_MAX_SUBNETS:
+                    self._subnets.popitem(last=False)
+            else:
+                self._subnets.move_to_end(subnet)
+
+            if stats.add_kick(ip, time.time()) < settings.antibot.RANGE_BAN_AFTER_IPS:
+                return None
+            if self._get_ban(ipaddress.ip_address(ip)) is not None:
+                return None
+
+            stats.ban_counter += 1
+            unban_at = time.time() + self._get_ban_seconds() * stats.ban_counter
+            self._banned.insert(subnet, unban_at)
+            stats.kicked_ips.clear()
+            logger.warning(f'Banning subnet {subnet}: {stats.kicks} kicks, ban #{stats.ban_counter}')
+            return subnet
+
+    def get_banned_subnet(self,
+                          ip: str) -> Optional[IpNetwork]:
+        """Checks if IP is in banned subnet
+
+        Args:
+            ip: IP to check
+        Returns:
+            Banned subnet, that contains IP, or None"""
+
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            return None
+
+        with self._lock:
+            return self._get_ban(address)
+
+    def unban_all(self) -> None:
+        """Unbans all subnets"""
+
+        with self._lock:
+            for network, _ in self._banned.items():
+                logger.warning(f'Unbanning subnet {network}')
+                self._banned.remove(network)
+
+    def _get_ban(self,
+                 address: ipaddress.IPv4Address | ipaddress.IPv6Address) -> Optional[IpNetwork]:
+        """Searches not expired ban for address. Expired ban is dropped. Call under lock
+
+        Args:
+            address: Address to check
+        Returns:
+            Banned subnet or None"""
+
+        found = self._banned.lookup(address)
+        if found is None:
+            return None
+
+        network, unban_at = found
+        if unban_at <= time.time():
+            logger.info(f'Ban of subnet {network} expired')
+            self._banned.remove(network)
+            return None
+        return network
+
+    @staticmethod
+    def _get_ban_seconds() -> int:
+        """Gets duration of the first ban
+
+        Returns:
+            Seconds"""
+
+        return (settings.antibot.BAN_IP_FOR_HOURS * 3600
+                + settings.antibot.BAN_IP_FOR_MINUTES * 60
+                + settings.antibot.BAN_IP_FOR_SECONDS)
+
+
+IP_INTEL = IpIntel()
+"""Kicks per subnet and banned subnets. Must be a single instance"""
@@ -5,18 +5,27 @@ from loguru import logger
 from typing import TYPE_CHECKING
 
 from settings import settings
+from metrics.registry import METRICS
 from anti_bot.storage import STORAGE
 from anti_bot.models import TrackedUser, TrackedIp
+from anti_bot.reputation import REPUTATION
+from anti_bot.ban_manager import BanManager
+from anti_bot.ip_intel import IP_INTEL, IpNetwork
 
 if TYPE_CHECKING:
     from server_communicator.communicator import ServerCommunicator
 
 
+KICKS              = METRICS.counter('msm_antibot_kicks_total', 'Kicks, made by AntiBot')
+LOGIN_KICK_SECONDS = METRICS.histogram('msm_antibot_login_to_kick_seconds', 'Time from login of User to kick-command')
+
+
 class Kicker:
     """Logic related to kicking Users
 
     Attributes:
-        _server_comm: Communicator to send commands to server with"""
+        _server_comm: Communicator to send commands to server with
+        _ban_manager: Unban deadlines and queue of ban-commands"""
 
     def __init__(self,
                  server_comm: 'ServerCommunicator'):
@@ -26,6 +35,7 @@ class Kicker:
             server_comm: Communicator to send commands to server with"""
 
         self._server_comm: 'ServerCommunicator' = server_comm
+        self._ban_manager: BanManager           = BanManager(server_comm, settings.antibot.BAN_COMMANDS_PER_SEC)
 
     def kick_by_user_name(self,
                           user_name: str) -> None:
@@ -38,6 +48,7 @@ class Kicker:
         reason = 'Something went wrong, try reconnecting. If error persists let us know on discord kPefhkduWZ'
         command = f'kick {user_name} {reason}\n'
         self._server_comm.send_to_server(command)
+        self._server_comm.cancel_login_message(user_name)
 
     def kick_due_to_forbidden_command(self,
                                       user_name: str) -> None:
@@ -71,6 +82,33 @@ class Kicker:
         reason = 'You already logged in from another account. Wait a bit, till we figure it out'
         threading.Thread(target=self._kick_on_login, args=(user, reason,)).start()
 
+    def kick_due_to_banned_subnet(self,
+                                  user: TrackedUser,
+                                  subnet: IpNetwork) -> None:
+        """Kicks User on login, as User's IP is in banned subnet
+
+        Args:
+            user: User to kick
+            subnet: Banned subnet"""
+
+        logger.warning(f'User {user.name} logged in from banned subnet {subnet}')
+        self._kick_user(user, reason='Your network is banned for a while', save_ip=False)
+
+    def kick_due_to_bad_reputation(self,
+                                   user: TrackedUser,
+                                   reason: str) -> None:
+        """Kicks User on login, as User's IP is known to be bad
+
+        Args:
+            user: User to kick
+            reason: Why IP is bad"""
+
+        logger.warning(f'User {user.name} logged in from bad IP {user.ip} ({reason})')
+        self._kick_user(user,
+                        reason='Your IP is not welcome here for a while',
+                        save_ip=False,
+                        update_kick_counter=False)
+
     def kick_due_to_login_bursts(self,
                                  users_to_kick: list[TrackedUser]) -> None:
         """Kicks Users with some delay between kicks
@@ -159,6 +197,9 @@ class Kicker:
         try:
             command = f'kick {user.name} {reason}\n'
             self._server_comm.send_to_server(command)
+            KICKS.inc()
+            LOGIN_KICK_SECONDS.observe(time.time() - user.login_time.timestamp())
+            self._server_comm.cancel_login_message(user.name)
             if update_kick_counter:
                 user.kicked_event(login_again_after, add_relogin_extra)
             logger.info(f'User {user.name} has {user.kicked_count} kicks')
@@ -170,10 +211,26 @@ class Kicker:
             STORAGE.untrack_user(user)
         if save_ip:
             STORAGE.save_kicked_ip(user)
+            if user.ip:
+                REPUTATION.on_kick(STORAGE.get_tracked_ip(user.ip))
+                banned_subnet = IP_INTEL.record_kick(user.ip)
+                if banned_subnet:
+                    self._kick_tracked_in_subnet(banned_subnet)
+
+    def _kick_tracked_in_subnet(self,
+                                subnet: IpNetwork) -> None:
+        """Kicks tracked Users, that are connected from just banned subnet
+
+        Args:
+            subnet: Banned subnet"""
+
+        for user in STORAGE.get_tracked_users():
+            if user.ip and IP_INTEL.get_subnet(user.ip) == subnet:
+                self._kick_user(user, reason='Your network is banned for a while', save_ip=False)
 
     def ban_ips(self,
                 ips_to_ban: list[TrackedIp]) -> None:
-        """Bans provided IPs
+        """Bans provided IPs. Commands are sent from BanManager's thread
 
         Args:
             ips_to_ban: IPs to ban"""
@@ -181,17 +238,16 @@ class Kicker:
         for ip in ips_to_ban:
             reason = ip.get_next_ban_time()
             logger.warning(f'Banning IP: {ip.ip} {reason=}')
-            command = f'ban-ip {ip.ip} {reason}\n'
             try:
-                self._server_comm.send_to_server(command)
                 ip.save_ban()
-                time.sleep(0.05)
+                self._ban_manager.schedule_unban(ip)
+                self._ban_manager.send(f'ban-ip {ip.ip} {reason}\n')
             except Exception as e:
                 logger.exception(e)
 
     def unban_ips(self,
                   ips_to_unban: list[TrackedIp]) -> None:
-        """Unbans IPs
+        """Unbans IPs. Commands are sent from BanManager's thread
 
         Args:
             ips_to_unban: IPs to unban"""
@@ -200,15 +256,26 @@ class Kicker:
             if not ip.banned:
                 continue
             logger.warning(f'Unbanning IP: {ip.ip}')
-            command = f'pardon-ip {ip.ip}\n'
             try:
-                self._server_comm.send_to_server(command)
                 ip.save_unban()
                 STORAGE.drop_kick_counter(ip)
-                time.sleep(0.05)
+                self._ban_manager.send(f'pardon-ip {ip.ip}\n')
             except Exception as e:
                 logger.exception(e)
 
+    def get_ips_to_unban(self) -> list[TrackedIp]:
+        """Collects IPs, whose bans have expired
+
+        Returns:
+            IPs that can be unbanned"""
+
+        return self._ban_manager.pop_due()
+
+    def stop(self) -> None:
+        """Sends remaining ban-commands and stops sending"""
+
+        self._ban_manager.stop()
+
     def _wait_for_data(self,
                        user: TrackedUser) -> None:
         """Waits a bit for receiving data for user
@@ -0,0 +1,188 @@
+from loguru import logger
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from server_communicator.communicator import ServerCommunicator
+
+
+class PollState:
+    """Polling state of a single User
+
+    Attributes:
+        unchanged_polls: Number of replies in a row, in which coordinates did not change
+        parked: If User is polled rarely, as User is not moving
+        tagged: If server confirmed, that User got the tag"""
+
+    def __init__(self):
+        """Init"""
+
+        self.unchanged_polls: int  = 0
+        self.parked:          bool = False
+        self.tagged:          bool = False
+
+
+class CoordinatesPoller:
+    """Requests coordinates of all tracked Users with a single command per cycle
+
+    Notes:
+        Tracked Users get a scoreboard-tag, and a single 'execute as @a[tag=...]' makes each of them teleport to the
+        place they are standing at, so server logs their coordinates. Tags are only changed, when set of tracked Users
+        changes, so cost of a cycle does not depend on the number of Users. Users outside spawn zones, whose
+        coordinates did not change park_after replies in a row, are moved to another tag, which is polled every
+        parked_poll_every cycle, until they move again. Users in spawn zones are never parked, as static-checks need
+        their fresh coordinates on each cycle.
+
+        Tag is added only once player's entity exists (after login line), and it is re-sent on each cycle, until
+        server replies 'Added tag'. Tags are kept in player's data, and removing them from player, who is already
+        offline, fails, so tags, left from the previous sessions, are removed before adding
+
+    Attributes:
+        _server_comm: Communicator to send commands with
+        _park_after: Number of replies without changes, after which User is parked
+        _parked_poll_every: Parked Users are polled once in this number of cycles
+        _states: {User's name: PollState} for tagged Users
+        _cycle: Number of the current poll"""
+
+    TRACKED_TAG: str = 'msm_tracked'
+    PARKED_TAG:  str = 'msm_parked'
+
+    def __init__(self,
+                 server_comm: 'ServerCommunicator',
+                 park_after: int,
+                 parked_poll_every: int):
+        """Init
+
+        Args:
+            server_comm: Communicator to send commands with
+            park_after: Number of replies without changes, after which User is parked (0 - never park)
+            parked_poll_every: Parked Users are polled once in this number of cycles"""
+
+        self._server_comm:       'ServerCommunicator' = server_comm
+        self._park_after:        int                  = park_after
+        self._parked_poll_every: int                  = max(parked_poll_every, 1)
+        self._states:            dict[str, PollState] = {}
+        self._cycle:             int                  = 0
+
+    def poll(self,
+             tracked_user_names: list[str]) -> None:
+        """Synchronizes tags with tracked Users and requests their coordinates
+
+        Args:
+            tracked_user_names: Names of currently tracked Users, who have already logged in"""
+
+        self._sync_tags(tracked_user_names)
+        self._tag_unconfirmed()
+        if not self._states:
+            return
+
+        self._cycle += 1
+        self._server_comm.send_to_server(self._build_command(self.TRACKED_TAG))
+
+        if self._cycle % self._parked_poll_every == 0:
+            if any(state.parked for state in self._states.values()):
+                self._server_comm.send_to_server(self._build_command(self.PARKED_TAG))
+
+    def on_coordinates(self,
+                       user_name: str,
+                       changed: bool,
+                       in_spawn: bool) -> None:
+        """Updates polling state of User with received coordinates
+
+        Args:
+            user_name: User, whose coordinates were received
+            changed: If coordinates differ from previous ones
+            in_spawn: If coordinates are in spawn point or spawn area"""
+
+        state = self._states.get(user_name)
+        if state is None:
+            return
+
+        if changed or in_spawn:
+            state.unchanged_polls = 0
+            if state.parked:
+                logger.debug(f'User {user_name} moved or is in spawn, polling on each cycle again')
+                state.parked = False
+                self._retag(user_name, old_tag=self.PARKED_TAG, new_tag=self.TRACKED_TAG)
+            return
+
+        state.unchanged_polls += 1
+        if self._park_after and not state.parked and state.unchanged_polls >= self._park_after:
+            logger.debug(f'User {user_name} is not moving, polling every {self._parked_poll_every} cycle')
+            state.parked = True
+            self._retag(user_name, old_tag=self.TRACKED_TAG, new_tag=self.PARKED_TAG)
+
+    def on_tag_added(self,
+                     user_name: str,
+                     tag: str) -> None:
+        """Marks User as tagged, once server confirmed it
+
+        Args:
+            user_name: User, who got the tag
+            tag: Added tag"""
+
+        state = self._states.get(user_name)
+        if state is not None and tag == self.TRACKED_TAG:
+            state.tagged = True
+
+    def get_polled_count(self) -> tuple[int, int]:
+        """Counts tagged Users
+
+        Returns:
+            Number of Users, polled on each cycle, and number of parked Users"""
+
+        parked = sum(1 for state in self._states.values() if state.parked)
+        return len(self._states) - parked, parked
+
+    def _sync_tags(self,
+                   tracked_user_names: list[str]) -> None:
+        """Starts tagging newly tracked Users and removes tags from Users, that are not tracked anymore
+
+        Args:
+            tracked_user_names: Names of currently tracked Users"""
+
+        tracked = set(tracked_user_names)
+
+        for user_name in tracked.difference(self._states):
+            self._states[user_name] = PollState()
+
+        for user_name in set(self._states).difference(tracked):
+            state = self._states.pop(user_name)
+            tag = self.PARKED_TAG if state.parked else self.TRACKED_TAG
+            self._server_comm.send_to_server(f'tag {user_name} remove {tag}')
+
+    def _tag_unconfirmed(self) -> None:
+        """(Re)sends tag to Users, for whom server has not confirmed it yet"""
+
+        for user_name, state in self._states.items():
+            if state.tagged:
+                continue
+            self._server_comm.send_to_server(f'tag {user_name} remove {self.PARKED_TAG}')
+            self._server_comm.send_to_server(f'tag {user_name} remove {self.TRACKED_TAG}')
+            self._server_comm.send_to_server(f'tag {user_name} add {self.TRACKED_TAG}')
+
+    def _retag(self,
+               user_name: str,
+               old_tag: str,
+               new_tag: str) -> None:
+        """Moves User from one tag to another
+
+        Args:
+            user_name: User to retag
+            old_tag: Tag to remove
+            new_tag: Tag to add"""
+
+        self._server_comm.send_to_server(f'tag {user_name} remove {old_tag}')
+        self._server_comm.send_to_server(f'tag {user_name} add {new_tag}')
+
+    @staticmethod
+    def _build_command(tag: str) -> str:
+        """Builds command, that makes all Users with tag teleport where they stand
+
+        Notes:
+            This command does not make player actually teleport, it seems to have affect even if player is running
+        Args:
+            tag: Tag of Users to poll
+        Returns:
+            Command"""
+
+        return f'execute as @a[tag={tag}] at @s run tp @s ~ ~ ~\n'
@@ -0,0 +1,121 @@
+import os
+import time
+import ipaddress
+import threading
+
+from loguru import logger
+from typing import Optional
+
+from anti_bot.models import TrackedIp
+from anti_bot.storage import STORAGE
+from anti_bot.detector import Detector
+from anti_bot.ip_intel import PrefixTree
+
+
+class IpReputation:
+    """Known offenders and blocklisted networks, checked right on login, before User is tracked at all
+
+    Notes:
+        IP becomes an offender right after the kick, that makes it match the conditions of Detector's IP bans. So
+        between the moment IP is known to be bad and the moment it is banned, its logins are kicked within the login
+        line, instead of waiting for the next cycle. Offenders live till the next IP-check of the cycle only: by then
+        IP is either banned, or does not match the conditions anymore
+
+    Attributes:
+        BLOCKLIST: Reason for IPs from blocklist
+        OFFENDER: Reason for IPs with lots of kicks
+
+        _blocklist: Networks from blocklist file
+        _offenders: IPs with lots of kicks {IP: timestamp, when IP became an offender}
+        _lock: Lock, as kicks and logins come from different threads"""
+
+    BLOCKLIST: str = 'blocklist'
+    OFFENDER:  str = 'offender'
+
+    def __init__(self):
+        """Init"""
+
+        self._blocklist: PrefixTree       = PrefixTree()
+        self._offenders: dict[str, float] = {}
+        self._lock:      threading.Lock   = threading.Lock()
+
+    def load_blocklist(self,
+                       file_path: str) -> None:
+        """Loads blocklist: one IP or network (CIDR) per line, lines starting with # are ignored
+
+        Args:
+            file_path: ABS-path to TXT with blocklist"""
+
+        if not file_path:
+            return
+        if not os.path.exists(file_path):
+            logger.warning(f'IP blocklist is not found: {file_path}')
+            return
+
+        blocklist = PrefixTree()
+        with open(file_path, encoding='utf-8') as f:
+            for line in f:
+                line = line.split('#')[0].strip()
+                if not line:
+                    continue
+                try:
+                    blocklist.insert(ipaddress.ip_network(line, strict=False))
+                except ValueError:
+                    logger.warning(f'Skipping invalid line in IP blocklist: {line}')
+
+        with self._lock:
+            self._blocklist = blocklist
+        logger.info(f'IP blocklist loaded: {len(blocklist)} networks')
+
+    def on_kick(self,
+                tracked_ip: Optional[TrackedIp]) -> None:
+        """Updates reputation of IP after kick
+
+        Args:
+            tracked_ip: IP of kicked User"""
+
+        if tracked_ip is None or tracked_ip.banned:
+            return
+        if not Detector.has_user_with_lots_of_kicks(tracked_ip) \
+                and not Detector.has_lots_of_kicked_users(tracked_ip, STORAGE.get_all_users()):
+            return
+
+        with self._lock:
+            if tracked_ip.ip not in self._offenders:
+                logger.warning(f'IP {tracked_ip.ip} is now known offender')
+                self._offenders[tracked_ip.ip] = time.time()
+
+    def drop_offenders(self,
+                       marked_before: float) -> None:
+        """Drops offenders, that were already checked by the cycle
+
+        Args:
+            marked_before: Timestamp, when the cycle started to check IPs"""
+
+        with self._lock:
+            self._offenders = {ip: marked_at for ip, marked_at in self._offenders.items() if marked_at >= marked_before}
+
+    def get_reject_reason(self,
+                          ip: str) -> Optional[str]:
+        """Checks if login from IP should be rejected
+
+        Args:
+            ip: IP of User
+        Returns:
+            Reason or None, if IP is fine"""
+
+        with self._lock:
+            if ip in self._offenders:
+                return self.OFFENDER
+
+            try:
+                address = ipaddress.ip_address(ip)
+            except ValueError:
+                return None
+            if self._blocklist.lookup(address) is not None:
+                return self.BLOCKLIST
+            return None
+
+
+REPUTATION = IpReputation()
+"""Reputation of IPs. Must be a single instance"""
@@ -0,0 +1,261 @@
+import numpy as np
+
+from typing import Optional
+
+from settings import settings
+from anti_bot.models import TrackedUser, Coordinates
+
+
+class SpawnZones:
+    """Spawn areas and spawn points, compiled into arrays once, to test lots of coordinates in a single NumPy pass
+
+    Notes:
+        Area is any rectangle or polygon on (x, z) plane, point is a square 3x3 blocks around spawn point. Height is
+        never checked. Bounds are inclusive
+
+    Attributes:
+        _area_rects: Rectangles of areas, shape (N, 4): x_min, x_max, z_min, z_max
+        _point_rects: Rectangles around spawn points, same shape
+        _polygons: Polygons of areas, each of shape (K, 2): x, z of vertices"""
+
+    POINT_RADIUS: int = 1
+    """Distance from spawn point, at which User is still in spawn point"""
+
+    def __init__(self,
+                 areas: list[list[float]],
+                 points: list[list[float]],
+                 polygons: Optional[list[list[list[float]]]] = None):
+        """Init
+
+        Args:
+            areas: Rectangles [x_min, x_max, z_min, z_max]
+            points: Spawn points [x, z]
+            polygons: Polygons [[x, z], ...], at least 3 vertices each"""
+
+        self._area_rects:  np.ndarray       = np.array(areas, dtype=float).reshape(-1, 4)
+        self._point_rects: np.ndarray       = np.array(
+            [[x - self.POINT_RADIUS, x + self.POINT_RADIUS, z - self.POINT_RADIUS, z + self.POINT_RADIUS]
+             for x, z in points],
+            dtype=float
+        ).reshape(-1, 4)
+        self._polygons:    list[np.ndarray] = [np.array(polygon, dtype=float) for polygon in polygons or []]
+
+    @classmethod
+    def from_settings(cls) -> 'SpawnZones':
+        """Compiles zones from settings: main spawn area and point plus extra ones
+
+        Returns:
+            Compiled zones"""
+
+        antibot = settings.antibot
+        areas  = [[antibot.SPAWN_X_MIN, antibot.SPAWN_X_MAX, antibot.SPAWN_Z_MIN, antibot.SPAWN_Z_MAX]]
+        points = [[antibot.SPAWN_POINT_X, antibot.SPAWN_POINT_Z]]
+        return cls(areas=areas + antibot.EXTRA_SPAWN_AREAS,
+                   points=points + antibot.EXTRA_SPAWN_POINTS,
+                   polygons=antibot.SPAWN_POLYGONS)
+
+    def in_areas(self,
+                 xz: np.ndarray) -> np.ndarray:
+        """Tests, which coordinates are in any spawn area
+
+        Args:
+            xz: Coordinates, shape (N, 2). NaN is never in area
+        Returns:
+            Bool-array of shape (N,)"""
+
+        result = self._in_rects(xz, self._area_rects)
+        for polygon in self._polygons:
+            result |= self._in_polygon(xz, polygon)
+        return result
+
+    def in_points(self,
+                  xz: np.ndarray) -> np.ndarray:
+        """Tests, which coordinates are in any spawn point
+
+        Args:
+            xz: Coordinates, shape (N, 2). NaN is never in point
+        Returns:
+            Bool-array of shape (N,)"""
+
+        return self._in_rects(xz, self._point_rects)
+
+    def is_in_area(self,
+                   coords: Coordinates) -> bool:
+        """Tests single coordinates for being in any spawn area
+
+        Args:
+            coords: Coordinates to test
+        Returns:
+            True, if coordinates are in spawn area"""
+
+        return bool(self.in_areas(np.array([[coords.x, coords.z]], dtype=float))[0])
+
+    def is_in_point(self,
+                    coords: Coordinates) -> bool:
+        """Tests single coordinates for being in any spawn point
+
+        Args:
+            coords: Coordinates to test
+        Returns:
+            True, if coordinates are in spawn point"""
+
+        return bool(self.in_points(np.array([[coords.x, coords.z]], dtype=float))[0])
+
+    def take_snapshot(self,
+                      users: list[TrackedUser]) -> 'ZonesSnapshot':
+        """Tests coordinates of all Users at once
+
+        Args:
+            users: Users to test
+        Returns:
+            Results of tests"""
+
+        return ZonesSnapshot(self, users)
+
+    @staticmethod
+    def _in_rects(xz: np.ndarray,
+                  rects: np.ndarray) -> np.ndarray:
+        """Tests coordinates against rectangles
+
+        Args:
+            xz: Coordinates, shape (N, 2)
+            rects: Rectangles, shape (M, 4)
+        Returns:
+            Bool-array of shape (N,), True if coordinates are in any of rectangles"""
+
+        if not len(rects):
+            return np.zeros(len(xz), dtype=bool)
+
+        x = xz[:, 0, None]
+        z = xz[:, 1, None]
+        inside = (rects[:, 0] <= x) & (x <= rects[:, 1]) & (rects[:, 2] <= z) & (z <= rects[:, 3])
+        return inside.any(axis=1)
+
+    @staticmethod
+    def _in_polygon(xz: np.ndarray,
+                    polygon: np.ndarray) -> np.ndarray:
+        """Tests coordinates against polygon with ray casting along x, all points and edges at once
+
+        Args:
+            xz: Coordinates, shape (N, 2)
+            polygon: Vertices, shape (K, 2)
+        Returns:
+            Bool-array of shape (N,)"""
+
+        x = xz[:, 0, None]
+        z = xz[:, 1, None]
+        x1, z1 = polygon[:, 0], polygon[:, 1]
+        x2, z2 = np.roll(x1, -1), np.roll(z1, -1)
+
+        crosses_z = (z1 > z) != (z2 > z)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_cross = x1 + (z - z1) * (x2 - x1) / (z2 - z1)
+        crossings = crosses_z & (x < x_cross)
+        return crossings.sum(axis=1) % 2 == 1
+
+
+class ZonesSnapshot:
+    """Results of testing initial and last known coordinates of Users against spawn zones, made in one pass
+
+    Notes:
+        Coordinates are read once, when snapshot is taken, and all results are based only on them. Coordinates, that
+        were not known at that moment (or User, who was not in snapshot), give None - unknown, so they are never judged
+        by results, computed without them
+
+    Attributes:
+        _indexes: {User's name: row in arrays}
+        _initial_known: If initial coordinates were known
+        _last_known: If last known coordinates were known
+        _initial_in_area: If initial coordinates are in spawn area
+        _last_in_area: If last known coordinates are in spawn area
+        _last_in_point: If last known coordinates are in spawn point
+        _moved: If last known (x, z) differ from initial ones"""
+
+    def __init__(self,
+                 zones: SpawnZones,
+                 users: list[TrackedUser]):
+        """Init
+
+        Args:
+            zones: Compiled zones
+            users: Users to test"""
+
+        initial = np.full((len(users), 2), np.nan)
+        last    = np.full((len(users), 2), np.nan)
+        for i, user in enumerate(users):
+            initial_coordinates = user.initial_coordinates
+            last_know_coords    = user.last_know_coords
+            if initial_coordinates:
+                initial[i] = initial_coordinates.x, initial_coordinates.z
+            if last_know_coords:
+                last[i] = last_know_coords.x, last_know_coords.z
+
+        self._indexes:         dict[str, int] = {user.name: i for i, user in enumerate(users)}
+        self._initial_known:   np.ndarray     = ~np.isnan(initial).any(axis=1)
+        self._last_known:      np.ndarray     = ~np.isnan(last).any(axis=1)
+        self._initial_in_area: np.ndarray     = zones.in_areas(initial)
+        self._last_in_area:    np.ndarray     = zones.in_areas(last)
+        self._last_in_point:   np.ndarray     = zones.in_points(last)
+        self._moved:           np.ndarray     = (initial != last).any(axis=1)
+
+    def is_initial_in_area(self,
+                           user: TrackedUser) -> Optional[bool]:
+        """Checks if User logged in inside spawn area
+
+        Args:
+            user: User to check
+        Returns:
+            True, if initial coordinates are in spawn area, None if they are unknown"""
+
+        return self._get(self._initial_in_area, user, self._initial_known)
+
+    def is_in_area(self,
+                   user: TrackedUser) -> Optional[bool]:
+        """Checks if User is in spawn area
+
+        Args:
+            user: User to check
+        Returns:
+            True, if last known coordinates are in spawn area, None if they are unknown"""
+
+        return self._get(self._last_in_area, user, self._last_known)
+
+    def is_in_point(self,
+                    user: TrackedUser) -> Optional[bool]:
+        """Checks if User is in spawn point
+
+        Args:
+            user: User to check
+        Returns:
+            True, if last known coordinates are in spawn point, None if they are unknown"""
+
+        return self._get(self._last_in_point, user, self._last_known)
+
+    def has_moved(self,
+                  user: TrackedUser) -> Optional[bool]:
+        """Checks if User is not where User logged in
+
+        Args:
+            user: User to check
+        Returns:
+            True, if (x, z) differ, None if any of coordinates is unknown"""
+
+        return self._get(self._moved, user, self._initial_known & self._last_known)
+
+    def _get(self,
+             values: np.ndarray,
+             user: TrackedUser,
+             known: np.ndarray) -> Optional[bool]:
+        """Gets value for User
+
+        Args:
+            values: Array with values
+            user: User to get value for
+            known: If coordinates, value is based on, were known
+        Returns:
+            Value or None, if User was not in snapshot or coordinates were unknown"""
+
+        index = self._indexes.get(user.name)
+        if index is None or not known[index]:
+            return None
+        return bool(values[index])
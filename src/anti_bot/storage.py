@@ -76,6 +76,18 @@ class Storage:
             else:
                 logger.warning(f'User {user.name} did not have an IP!')
 
+    def get_tracked_ip(self,
+                       ip: str) -> Optional[TrackedIp]:
+        """Gets tracked IP
+
+        Args:
+            ip: IP to get
+        Returns:
+            Tracked IP, if IP had any kicks"""
+
+        with self._lock:
+            return self._tracked_ips.get(ip)
+
     def drop_kick_counter(self,
                           ip: TrackedIp) -> None:
         """Drops counters for kicks for Users on provided IP
@@ -10,6 +10,11 @@ from loguru import logger
 
 from settings import settings
 from main_comm import MainComm
+from metrics.registry import METRICS
+
+
+PROBE_SECONDS = METRICS.histogram('msm_down_detector_probe_seconds', 'Time to check connectivity')
+ONLINE        = METRICS.gauge('msm_down_detector_online', '1, if connectivity was ok on the last check')
 
 
 class DownDetector:
@@ -102,7 +107,8 @@ class DownDetector:
         Args:
             interval: Interval for making HTTP request to check network"""
 
-        time.sleep(10)
+        if self.main_comm.wait(MainComm.TRAYER_STOPPED, timeout=10):
+            return
 
         last_status = self._get_status()
         self._record_status(last_status)
@@ -127,11 +133,11 @@ class DownDetector:
                     last_change_time = datetime.datetime.now()
                     last_status = status
 
-                time.sleep(interval)
+                self.main_comm.wait(MainComm.TRAYER_STOPPED, timeout=interval)
 
             except Exception as e:
                 logger.exception(e)
-                time.sleep(interval)
+                self.main_comm.wait(MainComm.TRAYER_STOPPED, timeout=interval)
 
         time.sleep(2)
         self._conn.close()
@@ -139,18 +145,22 @@ class DownDetector:
     def _check_triggers_loop(self) -> None:
         """Checks if User pressed button in tray and requested plot, or if status should be recorded now"""
 
+        events = self.main_comm.subscribe(MainComm.DRAW_PLOT,
+                                          MainComm.RECORD_NET_STAT,
+                                          MainComm.BACKUP_REQUESTED,
+                                          MainComm.BACKUP_DONE,
+                                          MainComm.TRAYER_STOPPED)
         while self.main_comm.trayer_running:
-            if self.main_comm.draw_plot_trigger:
+            published = events.wait()
+            if MainComm.DRAW_PLOT in published:
                 self._record_status(self._get_status())
-            if self.main_comm.record_net_stat_trigger:
+            if MainComm.RECORD_NET_STAT in published:
                 self._record_status(self._get_status())
                 self.main_comm.record_net_stat_trigger = False
-            if self.main_comm.backup_now_trigger:
+            if MainComm.BACKUP_REQUESTED in published:
                 self._record_status('off')
-                while self.main_comm.backup_now_trigger:
-                    time.sleep(1)
+            if MainComm.BACKUP_DONE in published:
                 self._record_status(self._get_status())
-            time.sleep(1)
 
         self._record_status('off')
 
@@ -160,5 +170,9 @@ class DownDetector:
         Returns:
             Status as string"""
 
-        status = "online" if self._is_online() else "offline"
+        with PROBE_SECONDS.time():
+            online = self._is_online()
+        ONLINE.set(1 if online else 0)
+
+        status = "online" if online else "offline"
         return status
@@ -8,6 +8,7 @@ from typing import Optional
 from datetime import datetime
 
 from settings import settings
+from file_transfer.throttle import BackupThrottle
 
 
 class FileBackuper:
@@ -38,16 +39,21 @@ class FileBackuper:
 
         self._copy_backups_to_temp_location(self.temp_folder, backup_paths)
 
-    def zip_backup(self) -> str | None:
+    def zip_backup(self,
+                   throttle: Optional[BackupThrottle] = None) -> str | None:
         """Zips backups folders and files (copy) and deletes temp-folder (copy of backup files and folders)
 
+        Args:
+            throttle: Lowers priority of zipping and pauses it, while server lags (zips at full speed, if not provided)
         Returns:
             ABS-zip-path, if successfully zipped, to backup-file"""
 
         logger.info('Zipping backups...')
 
         try:
-            self._zip_folders(self.temp_folder, self.zip_path)
+            if throttle:
+                throttle.lower_thread_priority()
+            self._zip_folders(self.temp_folder, self.zip_path, throttle)
             logger.info('Successfully zipped backups!')
             return self.zip_path
         except Exception as e:
@@ -111,12 +117,14 @@ class FileBackuper:
 
     def _zip_folders(self,
                      temp_copy: str,
-                     zip_path: str) -> None:
+                     zip_path: str,
+                     throttle: Optional[BackupThrottle] = None) -> None:
         """Zips world with progress status
 
         Args:
             temp_copy: ABS-path to world-copy folder to zip
-            zip_path: ABS-path to where zipped folder will be saved"""
+            zip_path: ABS-path to where zipped folder will be saved
+            throttle: Pauses zipping between files, while server lags"""
 
         logger.info("Zipping all folders...")
 
@@ -130,6 +138,8 @@ class FileBackuper:
                 total=len(all_files), unit="files", desc="Zipping world"
         ) as pbar:
             for abs_path in all_files:
+                if throttle:
+                    throttle.wait_if_lagging()
                 rel_path = os.path.relpath(abs_path, temp_copy)
                 zipf.write(abs_path, rel_path)
                 pbar.update(1)
@@ -0,0 +1,88 @@
+import sys
+import time
+import ctypes
+import threading
+
+import psutil
+
+from loguru import logger
+from collections.abc import Callable
+
+from metrics.registry import METRICS
+
+
+THROTTLED_SECONDS = METRICS.counter('msm_backup_throttled_seconds_total', 'Time, zipping waited for server to catch up')
+
+
+class BackupThrottle:
+    """Keeps zipping of backup from taking CPU and disk from server
+
+    Notes:
+        Zipping thread runs at the lowest priority (background mode on Windows, nice 19 and idle IO class on Linux),
+        which affects only this thread, not the whole manager. On top of that, zipping pauses between files, while
+        server lags, but no longer than max_pause seconds in total, so backup is finished anyway
+
+    Attributes:
+        _is_lagging: Function, that tells if server lags right now
+        _pause: Seconds to wait, before checking lag again
+        _max_pause: Max seconds to wait in total
+        _paused: Seconds waited so far"""
+
+    WINDOWS_BACKGROUND_MODE: int = 0x00010000
+    """THREAD_MODE_BACKGROUND_BEGIN: lowest CPU, IO and memory priority for the current thread"""
+
+    LINUX_NICE: int = 19
+
+    def __init__(self,
+                 is_lagging: Callable[[], bool],
+                 pause: float,
+                 max_pause: float):
+        """Init
+
+        Args:
+            is_lagging: Function, that tells if server lags right now
+            pause: Seconds to wait, before checking lag again
+            max_pause: Max seconds to wait in total"""
+
+        self._is_lagging: Callable[[], bool] = is_lagging
+        self._pause:      float              = pause
+        self._max_pause:  float              = max_pause
+        self._paused:     float              = 0.0
+
+    @staticmethod
+    def lower_thread_priority() -> None:
+        """Lowers CPU and IO priority of the current thread"""
+
+        try:
+            if sys.platform == 'win32':
+                kernel32 = ctypes.windll.kernel32
+                kernel32.SetThreadPriority(kernel32.GetCurrentThread(), BackupThrottle.WINDOWS_BACKGROUND_MODE)
+            elif sys.platform.startswith('linux'):
+                # On Linux every thread has its own nice and IO priority, addressed by its native ID
+                thread_id = threading.get_native_id()
+                psutil.Process(thread_id).nice(BackupThrottle.LINUX_NICE)
+                psutil.Process(thread_id).ionice(psutil.IOPRIO_CLASS_IDLE)
+            else:
+                logger.warning(f'Lowering priority of zipping is not supported on {sys.platform}')
+        except Exception as e:
+            logger.warning(f'Was not able to lower priority of zipping: {e}')
+
+    def get_paused_seconds(self) -> float:
+        """Gets time, spent waiting for server
+
+        Returns:
+            Seconds"""
+
+        return self._paused
+
+    def wait_if_lagging(self) -> None:
+        """Waits, while server lags, unless waited too long already"""
+
+        logged = False
+        while self._paused < self._max_pause and self._is_lagging():
+            if not logged:
+                logger.info('Server lags, zipping is paused')
+                logged = True
+            time.sleep(self._pause)
+            self._paused += self._pause
+            THROTTLED_SECONDS.inc(self._pause)
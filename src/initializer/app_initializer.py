@@ -10,6 +10,7 @@ from loguru import logger
 from settings import settings
 from main_comm import MainComm
 from trayer.trayer import Trayer
+from metrics.exporter import MetricsExporter
 from down_detecror.detector import DownDetector
 from down_detecror.plot_drawer import PlotDrawer
 from server_manager import MinecraftServerManager
@@ -102,7 +103,7 @@ class AppInitializer:
             if not os.path.exists(settings.paths.MESSAGES):
                 logger.warning(f'Path in settings.paths.MESSAGES ({settings.paths.MESSAGES}) is invalid!')
 
-            if not os.path.exists(settings.paths.USERS_DATA):
+            if settings.notifications.USERS_STORAGE == 'json' and not os.path.exists(settings.paths.USERS_DATA):
                 logger.warning(f'Path in settings.paths.USERS_DATA ({settings.paths.USERS_DATA}) is invalid!')
 
         if settings.paths.BAD_WORDS:
@@ -154,6 +155,14 @@ class AppInitializer:
         # Make sure the logs folder exists
         os.makedirs("logs", exist_ok=True)
 
+        # Server's output, GC log and crash reports go into their own files, resolved now, as working dir changes later
+        if not settings.raw_log.FILE:
+            settings.raw_log.FILE = os.path.abspath(os.path.join('logs', 'minecraft.log'))
+        if not settings.health.GC_LOG_FILE:
+            settings.health.GC_LOG_FILE = os.path.abspath(os.path.join('logs', 'gc.log'))
+        if not settings.health.CRASH_REPORTS_DIR:
+            settings.health.CRASH_REPORTS_DIR = os.path.abspath(os.path.join('logs', 'crash_reports'))
+
         # Remove the default stderr logger
         logger.remove()
 
@@ -182,6 +191,16 @@ class AppInitializer:
         """Create instances of app's main components"""
 
         Trayer(self.main_comm)
+
+        if settings.metrics.ON:
+            try:
+                MetricsExporter(settings.metrics.HOST, settings.metrics.PORT).start()
+            except Exception as e:
+                logger.error('Was not able to start serving metrics')
+                logger.exception(e)
+        else:
+            logger.info('Metrics are off, you can turn them on with METRICS_ON=true')
+
         server_manager = MinecraftServerManager(self.main_comm)
         threading.Thread(target=server_manager.run,
                          daemon=False).start()
@@ -197,8 +216,9 @@ class AppInitializer:
     def run_indefinitely(self) -> None:
         """Loop to let app run"""
 
+        events = self.main_comm.subscribe(MainComm.DRAW_PLOT, MainComm.TRAYER_STOPPED)
         while self.main_comm.trayer_running:
-            time.sleep(1)
+            events.wait()
             self._check_plot_trigger()
 
     def _check_plot_trigger(self) -> None:
@@ -1,8 +1,10 @@
 from initializer.app_initializer import AppInitializer
 
 
-initializer = AppInitializer()
-initializer.check_settings()
-initializer.init_logger()
-initializer.init_components()
-initializer.run_indefinitely()
+if __name__ == '__main__':
+    # Guard is required, as toxicity workers are spawned processes, which import main module
+    initializer = AppInitializer()
+    initializer.check_settings()
+    initializer.init_logger()
+    initializer.init_components()
+    initializer.run_indefinitely()
@@ -1,9 +1,17 @@
 import datetime
+import threading
+
+from typing import Optional
 
 
 class MainComm:
     """Thread-communicator
 
+    Notes:
+        Every flag is a topic. Threads block on topics (wait, wait_cleared or a Subscription) instead of polling flags,
+        so they wake up as soon as a topic is published. Flags are still readable and writable as attributes, setting
+        one to True publishes its topic, setting it to False clears it.
+
     Attributes:
         draw_plot_trigger: Flag. When set to True, DownDetector will show plot
         backup_now_trigger: Flag. When set to True, ServerManager will execute BackUp process
@@ -11,18 +19,98 @@ class MainComm:
         trayer_running: Flag, indicating that the main thread is running
         errors: Error, to display in Trayer's status-button
         stop_server: Flag. If True – ServerManager should read this flag and stop
-        stop_trayer: Main flag to stop application"""
+        stop_trayer: Main flag to stop application
+        _condition: Guards topics and wakes up waiting threads
+        _flags: Current state of each topic
+        _versions: Number of times each topic was published"""
+
+    DRAW_PLOT:        str = 'draw_plot'
+    BACKUP_REQUESTED: str = 'backup_requested'
+    BACKUP_DONE:      str = 'backup_done'
+    RECORD_NET_STAT:  str = 'record_net_stat'
+    STOP_SERVER:      str = 'stop_server'
+    STOP_TRAYER:      str = 'stop_trayer'
+    TRAYER_STOPPED:   str = 'trayer_stopped'
+    ERROR:            str = 'error'
+
+    TOPICS: tuple[str, ...] = (DRAW_PLOT, BACKUP_REQUESTED, BACKUP_DONE, RECORD_NET_STAT, STOP_SERVER, STOP_TRAYER,
+                               TRAYER_STOPPED, ERROR)
+    """BACKUP_DONE is published, once backup_now_trigger is cleared, ERROR - on every set_error"""
 
     def __init__(self):
         """Init"""
 
-        self.draw_plot_trigger:       bool = False
-        self.backup_now_trigger:      bool = False
-        self.record_net_stat_trigger: bool = False
-        self.trayer_running:          bool = True
-        self.errors:                  str  = 'All good!'
-        self.stop_server:             bool = False
-        self.stop_trayer:             bool = False
+        self.errors: str = 'All good!'
+
+        self._condition: threading.Condition = threading.Condition()
+        self._flags:     dict[str, bool]     = {topic: False for topic in self.TOPICS}
+        self._versions:  dict[str, int]      = {topic: 0 for topic in self.TOPICS}
+
+    # Flags
+
+    @property
+    def draw_plot_trigger(self) -> bool:
+        """Flag. When set to True, DownDetector will show plot"""
+
+        return self.is_set(self.DRAW_PLOT)
+
+    @draw_plot_trigger.setter
+    def draw_plot_trigger(self, value: bool) -> None:
+        self._set_flag(self.DRAW_PLOT, value)
+
+    @property
+    def backup_now_trigger(self) -> bool:
+        """Flag. When set to True, ServerManager will execute BackUp process"""
+
+        return self.is_set(self.BACKUP_REQUESTED)
+
+    @backup_now_trigger.setter
+    def backup_now_trigger(self, value: bool) -> None:
+        with self._condition:
+            was_requested = self._flags[self.BACKUP_REQUESTED]
+            self._set_flag(self.BACKUP_REQUESTED, value)
+            if was_requested and not value:
+                self.publish(self.BACKUP_DONE)
+
+    @property
+    def record_net_stat_trigger(self) -> bool:
+        """Flag. Indicates that network status should be recorded now"""
+
+        return self.is_set(self.RECORD_NET_STAT)
+
+    @record_net_stat_trigger.setter
+    def record_net_stat_trigger(self, value: bool) -> None:
+        self._set_flag(self.RECORD_NET_STAT, value)
+
+    @property
+    def trayer_running(self) -> bool:
+        """Flag, indicating that the main thread is running"""
+
+        return not self.is_set(self.TRAYER_STOPPED)
+
+    @trayer_running.setter
+    def trayer_running(self, value: bool) -> None:
+        self._set_flag(self.TRAYER_STOPPED, not value)
+
+    @property
+    def stop_server(self) -> bool:
+        """Flag. If True – ServerManager should read this flag and stop"""
+
+        return self.is_set(self.STOP_SERVER)
+
+    @stop_server.setter
+    def stop_server(self, value: bool) -> None:
+        self._set_flag(self.STOP_SERVER, value)
+
+    @property
+    def stop_trayer(self) -> bool:
+        """Main flag to stop application"""
+
+        return self.is_set(self.STOP_TRAYER)
+
+    @stop_trayer.setter
+    def stop_trayer(self, value: bool) -> None:
+        self._set_flag(self.STOP_TRAYER, value)
 
     def set_error(self, error_text: str) -> None:
         """Sets error, that happened
@@ -33,3 +121,144 @@ class MainComm:
         error_text = (f'{datetime.datetime.now()}\n'
                       f'{error_text}')
         self.errors = str(error_text)
+        self.publish(self.ERROR)
+
+    # Topics
+
+    def publish(self,
+                topic: str) -> None:
+        """Sets topic and wakes up threads, waiting for it
+
+        Args:
+            topic: One of TOPICS"""
+
+        with self._condition:
+            self._flags[topic]     = True
+            self._versions[topic] += 1
+            self._condition.notify_all()
+
+    def clear(self,
+              topic: str) -> None:
+        """Clears topic and wakes up threads, waiting for it to be cleared
+
+        Args:
+            topic: One of TOPICS"""
+
+        with self._condition:
+            self._flags[topic] = False
+            self._condition.notify_all()
+
+    def is_set(self,
+               topic: str) -> bool:
+        """Checks if topic is set
+
+        Args:
+            topic: One of TOPICS
+        Returns:
+            True, if topic is set"""
+
+        return self._flags[topic]
+
+    def wait(self,
+             topic: str,
+             timeout: Optional[float] = None) -> bool:
+        """Blocks, until topic is set
+
+        Args:
+            topic: One of TOPICS
+            timeout: Max seconds to wait (None - no limit)
+        Returns:
+            True, if topic is set, False on timeout"""
+
+        with self._condition:
+            return self._condition.wait_for(lambda: self._flags[topic], timeout)
+
+    def wait_cleared(self,
+                     topic: str,
+                     timeout: Optional[float] = None) -> bool:
+        """Blocks, until topic is cleared
+
+        Args:
+            topic: One of TOPICS
+            timeout: Max seconds to wait (None - no limit)
+        Returns:
+            True, if topic is cleared, False on timeout"""
+
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._flags[topic], timeout)
+
+    def subscribe(self,
+                  *topics: str) -> 'Subscription':
+        """Subscribes to topics, to be woken up on each their publication
+
+        Args:
+            topics: Topics from TOPICS
+        Returns:
+            Subscription, that remembers publications it has seen"""
+
+        with self._condition:
+            return Subscription(self, {topic: self._versions[topic] for topic in topics})
+
+    def _set_flag(self,
+                  topic: str,
+                  value: bool) -> None:
+        """Publishes topic, once flag turns on, and clears it, once flag turns off
+
+        Args:
+            topic: One of TOPICS
+            value: New value of flag"""
+
+        with self._condition:
+            if value and not self._flags[topic]:
+                self.publish(topic)
+            elif not value and self._flags[topic]:
+                self.clear(topic)
+
+    def _wait_for_news(self,
+                       seen: dict[str, int],
+                       timeout: Optional[float]) -> list[str]:
+        """Blocks, until any of topics is published after the seen version
+
+        Args:
+            seen: Versions of topics, seen by subscriber, updated in place
+            timeout: Max seconds to wait (None - no limit)
+        Returns:
+            Topics, published since the previous call, empty on timeout"""
+
+        with self._condition:
+            self._condition.wait_for(lambda: any(self._versions[topic] != seen[topic] for topic in seen), timeout)
+            published = [topic for topic in seen if self._versions[topic] != seen[topic]]
+            for topic in published:
+                seen[topic] = self._versions[topic]
+            return published
+
+
+class Subscription:
+    """Publications of topics, that one thread waits for
+
+    Attributes:
+        _main_comm: Communicator with topics
+        _seen: Version of each topic, that was already returned by wait"""
+
+    def __init__(self,
+                 main_comm: MainComm,
+                 seen: dict[str, int]):
+        """Init
+
+        Args:
+            main_comm: Communicator with topics
+            seen: Current version of each subscribed topic"""
+
+        self._main_comm: MainComm       = main_comm
+        self._seen:      dict[str, int] = seen
+
+    def wait(self,
+             timeout: Optional[float] = None) -> list[str]:
+        """Blocks, until any of subscribed topics is published (returns at once, if it was published since last call)
+
+        Args:
+            timeout: Max seconds to wait (None - no limit)
+        Returns:
+            Topics, published since the previous call, empty on timeout"""
+
+        return self._main_comm._wait_for_news(self._seen, timeout)
@@ -0,0 +1,84 @@
+import threading
+
+from loguru import logger
+from typing import Optional
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from metrics.registry import MetricsRegistry, METRICS
+
+
+class MetricsExporter:
+    """Serves metrics in Prometheus text format over HTTP: GET /metrics
+
+    Attributes:
+        _registry: Metrics to serve
+        _host: Host to listen on
+        _port: Port to listen on
+        _server: HTTP-server, once started"""
+
+    PATH: str = '/metrics'
+
+    def __init__(self,
+                 host: str,
+                 port: int,
+                 registry: MetricsRegistry = METRICS):
+        """Init
+
+        Args:
+            host: Host to listen on
+            port: Port to listen on (0 - any free port)
+            registry: Metrics to serve"""
+
+        self._registry: MetricsRegistry               = registry
+        self._host:     str                           = host
+        self._port:     int                           = port
+        self._server:   Optional[ThreadingHTTPServer] = None
+
+    def start(self) -> None:
+        """Starts serving in background thread"""
+
+        registry = self._registry
+        path     = self.PATH
+
+        class Handler(BaseHTTPRequestHandler):
+            """Handler for scrapes"""
+
+            def do_GET(self):
+                """Responds with metrics"""
+
+                if self.path.split('?')[0] != path:
+                    self.send_error(404)
+                    return
+
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                """Scrapes are not logged"""
+
+        self._server = ThreadingHTTPServer((self._host, self._port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        logger.info(f'Metrics are available at http://{self._host}:{self.get_port()}{self.PATH}')
+
+    def get_port(self) -> int:
+        """Gets port, server listens on
+
+        Returns:
+            Port"""
+
+        if self._server is None:
+            return self._port
+        return self._server.server_address[1]
+
+    def stop(self) -> None:
+        """Stops serving"""
+
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -0,0 +1,403 @@
+import time
+import threading
+
+from contextlib import contextmanager
+from collections.abc import Callable, Iterator
+from typing import Optional
+
+
+class Counter:
+    """Value, that only grows
+
+    Attributes:
+        _value: Current value
+        _lock: Lock, as metrics are updated from different threads"""
+
+    TYPE: str = 'counter'
+
+    def __init__(self):
+        """Init"""
+
+        self._value: float          = 0
+        self._lock:  threading.Lock = threading.Lock()
+
+    def inc(self,
+            amount: float = 1) -> None:
+        """Increases value
+
+        Args:
+            amount: Amount to add"""
+
+        with self._lock:
+            self._value += amount
+
+    def get(self) -> float:
+        """Gets current value
+
+        Returns:
+            Current value"""
+
+        return self._value
+
+    def render(self,
+               name: str,
+               labels: str) -> list[str]:
+        """Renders value in Prometheus text format
+
+        Args:
+            name: Name of the metric
+            labels: Rendered labels, ex: '{phase="poll"}' or empty string
+        Returns:
+            Lines of exposition"""
+
+        return [f'{name}{labels} {self._value}']
+
+
+class Gauge(Counter):
+    """Value, that can go up and down, or is read from a function on each scrape
+
+    Attributes:
+        _function: Function to read value from, instead of stored value"""
+
+    TYPE: str = 'gauge'
+
+    def __init__(self):
+        """Init"""
+
+        super().__init__()
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self,
+            value: float) -> None:
+        """Sets value
+
+        Args:
+            value: New value"""
+
+        self._value = value
+
+    def dec(self,
+            amount: float = 1) -> None:
+        """Decreases value
+
+        Args:
+            amount: Amount to subtract"""
+
+        self.inc(-amount)
+
+    def set_function(self,
+                     function: Optional[Callable[[], float]]) -> None:
+        """Makes gauge read its value from function, so nothing is done on hot path
+
+        Args:
+            function: Function without arguments, or None to use stored value again"""
+
+        self._function = function
+
+    def get(self) -> float:
+        """Gets current value
+
+        Returns:
+            Current value"""
+
+        function = self._function
+        if function is None:
+            return self._value
+        try:
+            return function()
+        except Exception:
+            return float('nan')
+
+    def render(self,
+               name: str,
+               labels: str) -> list[str]:
+        """Renders value in Prometheus text format
+
+        Args:
+            name: Name of the metric
+            labels: Rendered labels
+        Returns:
+            Lines of exposition"""
+
+        return [f'{name}{labels} {self.get()}']
+
+
+class Histogram:
+    """Latency histogram with HDR-like buckets: fixed memory, O(1) record and relative error of about 6%
+
+    Notes:
+        Values are recorded in microseconds. Each power of two is split into SUB_BUCKETS linear buckets, so the width of
+        a bucket is never more than 1/SUB_BUCKETS of its value. Values above MAX_MICROS are recorded into the last
+        bucket. For Prometheus, buckets are folded into cumulative EXPORT_BOUNDS
+
+    Attributes:
+        _counts: Number of values per bucket
+        _count: Number of values
+        _sum: Sum of values, seconds
+        _max: Max value, seconds
+        _lock: Lock, as metrics are updated from different threads"""
+
+    TYPE: str = 'histogram'
+
+    SUB_BUCKETS: int = 16
+    """Buckets per power of two"""
+
+    MAX_MICROS: int = 2 ** 32
+    """Max value to distinguish, about 71 minutes"""
+
+    EXPORT_BOUNDS: tuple[float, ...] = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+                                        0.5, 1, 2.5, 5, 10, 30, 60, 300, 1800)
+    """Upper bounds (seconds) of buckets, exported to Prometheus"""
+
+    def __init__(self):
+        """Init"""
+
+        self._counts: list[int]      = [0] * (self._get_index(self.MAX_MICROS) + 1)
+        self._count:  int            = 0
+        self._sum:    float          = 0
+        self._max:    float          = 0
+        self._lock:   threading.Lock = threading.Lock()
+
+    def observe(self,
+                seconds: float) -> None:
+        """Records value
+
+        Args:
+            seconds: Value, usually duration in seconds"""
+
+        index = self._get_index(min(max(int(seconds * 1_000_000), 0), self.MAX_MICROS))
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._sum   += seconds
+            if seconds > self._max:
+                self._max = seconds
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Records duration of with-block"""
+
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started_at)
+
+    def get_count(self) -> int:
+        """Gets number of recorded values
+
+        Returns:
+            Number of values"""
+
+        return self._count
+
+    def get_percentile(self,
+                       percent: float) -> float:
+        """Gets percentile of recorded values
+
+        Args:
+            percent: Percentile, 0-100
+        Returns:
+            Upper bound of bucket with percentile (seconds), not more than max recorded value. 0, if nothing recorded"""
+
+        with self._lock:
+            if not self._count:
+                return 0
+            rank = max(1, round(self._count * percent / 100))
+            seen = 0
+            for index, count in enumerate(self._counts):
+                seen += count
+                if seen >= rank:
+                    return min(self._get_upper_micros(index) / 1_000_000, self._max)
+            return self._max
+
+    def render(self,
+               name: str,
+               labels: str) -> list[str]:
+        """Renders histogram in Prometheus text format
+
+        Args:
+            name: Name of the metric
+            labels: Rendered labels
+        Returns:
+            Lines of exposition"""
+
+        with self._lock:
+            counts = list(self._counts)
+            total, total_sum = self._count, self._sum
+
+        cumulative = [0] * len(self.EXPORT_BOUNDS)
+        for index, count in enumerate(counts):
+            if not count:
+                continue
+            upper = self._get_upper_micros(index) / 1_000_000
+            for bound_index, bound in enumerate(self.EXPORT_BOUNDS):
+                if upper <= bound:
+                    cumulative[bound_index] += count
+                    break
+
+        lines = []
+        running = 0
+        label_prefix = labels[:-1] + ',' if labels else '{'
+        for bound, count in zip(self.EXPORT_BOUNDS, cumulative):
+            running += count
+            lines.append(f'{name}_bucket{label_prefix}le="{bound}"}} {running}')
+        lines.append(f'{name}_bucket{label_prefix}le="+Inf"}} {total}')
+        lines.append(f'{name}_sum{labels} {total_sum}')
+        lines.append(f'{name}_count{labels} {total}')
+        return lines
+
+    @classmethod
+    def _get_index(cls,
+                   micros: int) -> int:
+        """Gets bucket of value
+
+        Args:
+            micros: Value in microseconds, 0..MAX_MICROS
+        Returns:
+            Index of bucket"""
+
+        if micros < cls.SUB_BUCKETS:
+            return micros
+        shift = micros.bit_length() - cls.SUB_BUCKETS.bit_length()
+        return cls.SUB_BUCKETS * (shift + 1) + (micros >> shift) - cls.SUB_BUCKETS
+
+    @classmethod
+    def _get_upper_micros(cls,
+                          index: int) -> int:
+        """Gets the biggest value of bucket
+
+        Args:
+            index: Index of bucket
+        Returns:
+            Value in microseconds"""
+
+        if index < cls.SUB_BUCKETS:
+            return index
+        shift, sub_bucket = divmod(index - cls.SUB_BUCKETS, cls.SUB_BUCKETS)
+        return ((cls.SUB_BUCKETS + sub_bucket + 1) << shift) - 1
+
+
+Metric = Counter | Gauge | Histogram
+"""Any metric"""
+
+
+class MetricsRegistry:
+    """Keeps metrics and renders them in Prometheus text format
+
+    Notes:
+        Metrics are got or created by name and labels. Hot paths should keep the metric in a module-level constant,
+        so there is no lookup on each update
+
+    Attributes:
+        _families: {name: (type of metric, help, {labels: metric})}
+        _lock: Lock for families"""
+
+    def __init__(self):
+        """Init"""
+
+        self._families: dict[str, tuple[type, str, dict[tuple[tuple[str, str], ...], Metric]]] = {}
+        self._lock:     threading.Lock                                                        = threading.Lock()
+
+    def counter(self,
+                name: str,
+                description: str,
+                **labels: str) -> Counter:
+        """Gets or creates counter
+
+        Args:
+            name: Name of the metric
+            description: Help for the metric
+            labels: Labels of the metric
+        Returns:
+            Counter"""
+
+        return self._get_or_create(Counter, name, description, labels)
+
+    def gauge(self,
+              name: str,
+              description: str,
+              **labels: str) -> Gauge:
+        """Gets or creates gauge
+
+        Args:
+            name: Name of the metric
+            description: Help for the metric
+            labels: Labels of the metric
+        Returns:
+            Gauge"""
+
+        return self._get_or_create(Gauge, name, description, labels)
+
+    def histogram(self,
+                  name: str,
+                  description: str,
+                  **labels: str) -> Histogram:
+        """Gets or creates histogram
+
+        Args:
+            name: Name of the metric
+            description: Help for the metric
+            labels: Labels of the metric
+        Returns:
+            Histogram"""
+
+        return self._get_or_create(Histogram, name, description, labels)
+
+    def render(self) -> str:
+        """Renders all metrics in Prometheus text format
+
+        Returns:
+            Exposition"""
+
+        with self._lock:
+            families = [(name, kind, description, list(metrics.items()))
+                        for name, (kind, description, metrics) in sorted(self._families.items())]
+
+        lines = []
+        for name, kind, description, metrics in families:
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} {kind.TYPE}')
+            for labels, metric in metrics:
+                rendered_labels = ''
+                if labels:
+                    rendered_labels = '{' + ','.join(f'{key}="{value}"' for key, value in labels) + '}'
+                lines.extend(metric.render(name, rendered_labels))
+        return '\n'.join(lines) + '\n'
+
+    def _get_or_create(self,
+                       kind: type,
+                       name: str,
+                       description: str,
+                       labels: dict[str, str]) -> Metric:
+        """Gets or creates metric
+
+        Args:
+            kind: Class of the metric
+            name: Name of the metric
+            description: Help for the metric
+            labels: Labels of the metric
+        Returns:
+            Metric
+        Raises:
+            ValueError: If metric with the same name, but of another type, already exists"""
+
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            family = self._families.get(name)
+            if family is None:
+                family = kind, description, {}
+                self._families[name] = family
+            elif family[0] is not kind:
+                raise ValueError(f'Metric {name} is already registered as {family[0].TYPE}')
+
+            metrics = family[2]
+            metric = metrics.get(key)
+            if metric is None:
+                metric = kind()
+                metrics[key] = metric
+            return metric
+
+
+METRICS = MetricsRegistry()
+"""Metrics of the app. Must be a single instance"""
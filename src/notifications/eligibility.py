@@ -0,0 +1,121 @@
+import threading
+
+from typing import Optional
+
+from notifications.models import NotificationsCatalogue, Notification, User
+
+
+class EligibilityIndex:
+    """Keeps for each User a pointer to the first announcement, that User has not yet seen max_views times
+
+    Notes:
+        Every announcement before the pointer is exhausted for that User. As times_seen only grows, pointer only moves
+        forward, and it is advanced only when announcement under the pointer gets exhausted. So selection of
+        announcement for login is O(1), while each User walks the whole list at most once per catalogue. Pointers are
+        dropped when catalogue is replaced (file with notifications was changed)
+
+    Attributes:
+        _catalogue: Catalogue, for which pointers were calculated
+        _pointers: {User.name: index of the first not exhausted announcement}
+        _lock: Lock for pointers"""
+
+    def __init__(self):
+        """Init"""
+
+        self._catalogue: Optional[NotificationsCatalogue] = None
+        self._pointers:  dict[str, int]                   = {}
+        self._lock:      threading.Lock                   = threading.Lock()
+
+    def get_next_announcement(self,
+                              catalogue: NotificationsCatalogue,
+                              user: User) -> Notification | None:
+        """Gets the first announcement, that User has not yet seen max_views times
+
+        Args:
+            catalogue: Current catalogue with notifications
+            user: User to get announcement for
+        Returns:
+            Announcement or None, if User has seen all of them"""
+
+        with self._lock:
+            self._check_catalogue(catalogue)
+
+            pointer = self._pointers.get(user.name)
+            if pointer is None:
+                pointer = self._find_next(catalogue, user, start=0)
+                self._pointers[user.name] = pointer
+
+            if pointer < len(catalogue.announcements):
+                return catalogue.announcements[pointer]
+            return None
+
+    def on_view(self,
+                catalogue: NotificationsCatalogue,
+                user: User,
+                notification: Notification) -> None:
+        """Moves pointer forward, in case shown notification is now exhausted for User
+
+        Args:
+            catalogue: Catalogue, notification was selected from
+            user: User, that have seen notification
+            notification: Notification, that was shown to User"""
+
+        with self._lock:
+            if catalogue is not self._catalogue:
+                return
+
+            pointer = self._pointers.get(user.name)
+            if pointer is None or pointer >= len(catalogue.announcements):
+                return
+
+            if catalogue.announcements[pointer].id != notification.id:
+                return
+
+            if self._is_exhausted(notification, user):
+                self._pointers[user.name] = self._find_next(catalogue, user, start=pointer + 1)
+
+    def _check_catalogue(self,
+                         catalogue: NotificationsCatalogue) -> None:
+        """Drops all pointers, if catalogue was replaced
+
+        Args:
+            catalogue: Current catalogue"""
+
+        if catalogue is not self._catalogue:
+            self._catalogue = catalogue
+            self._pointers  = {}
+
+    def _find_next(self,
+                   catalogue: NotificationsCatalogue,
+                   user: User,
+                   start: int) -> int:
+        """Finds index of the first not exhausted announcement, starting from start
+
+        Args:
+            catalogue: Catalogue with announcements
+            user: User to check announcements for
+            start: Index to start from
+        Returns:
+            Index of announcement, or len(announcements), if all of them are exhausted"""
+
+        announcements = catalogue.announcements
+        index = start
+        while index < len(announcements) and self._is_exhausted(announcements[index], user):
+            index += 1
+        return index
+
+    @staticmethod
+    def _is_exhausted(announcement: Notification,
+                      user: User) -> bool:
+        """Checks if User has seen announcement max_views times
+
+        Args:
+            announcement: Announcement to check
+            user: User to check
+        Returns:
+            True, if announcement should not be shown to User anymore"""
+
+        user_announcement = user.seen_announcements.get(announcement.id)
+        if user_announcement is None:
+            return False
+        return user_announcement.times_seen >= announcement.max_views
@@ -1,24 +1,47 @@
 import os
-import json
 import random
 import threading
 
 from loguru import logger
+from typing import Optional
 
 from settings import settings
-from notifications.models import NotificationsCatalogue, UsersCatalogue, User, Notification
+from metrics.registry import METRICS
+from notifications.models import NotificationsCatalogue, User, Notification
+from notifications.eligibility import EligibilityIndex
+from notifications.storage import MessagesStorage, JsonUsersStorage, SqliteUsersStorage
+
+
+SELECT_SECONDS = METRICS.histogram('msm_notification_seconds', 'Time of notifications I/O', operation='select')
+FLUSH_SECONDS  = METRICS.histogram('msm_notification_seconds', 'Time of notifications I/O', operation='flush')
 
 
 class Notificator:
-    """Notifies Users with messages inside Minecraft"""
+    """Notifies Users with messages inside Minecraft
+
+    Notes:
+        Notifications are kept in memory, file with them is reloaded only when it changes on disk. Users' data is
+        either kept in memory and written into JSON in background every FLUSH_INTERVAL_SEC and on stop, or is kept
+        in SQLite (see USERS_STORAGE in settings)
+
+    Attributes:
+        activated: If notificator is working
+        _messages: Storage with notifications
+        _users: Storage with Users and their seen notifications
+        _eligibility: Per-User pointers to the next announcement to show
+        _lock: Lock, so notification is selected and counted for each login atomically"""
 
     def __init__(self):
         """Init
 
         Checks activation status"""
 
-        self.activated:  bool           = False
-        self._file_lock: threading.Lock = threading.Lock()
+        self.activated: bool                                            = False
+        self._messages: Optional[MessagesStorage]                       = None
+        self._users:    Optional[JsonUsersStorage | SqliteUsersStorage] = None
+        self._lock:     threading.Lock                                  = threading.Lock()
+
+        self._eligibility: EligibilityIndex = EligibilityIndex()
 
         if settings.notifications.ACTIVATED:
             self.activated = self._check_files()
@@ -26,6 +49,9 @@ class Notificator:
             logger.warning('Notificator disabled')
             self.activated = False
 
+        if self.activated:
+            self._init_storages()
+
     def _check_files(self) -> bool:
         """Checks if there are files for notifications
 
@@ -33,7 +59,10 @@ class Notificator:
             True, if files for notifications were found"""
 
         notification_file_ok = os.path.exists(settings.paths.MESSAGES)
-        user_data_file_ok    = os.path.exists(settings.paths.USERS_DATA)
+        if settings.notifications.USERS_STORAGE == 'sqlite':
+            user_data_file_ok = True
+        else:
+            user_data_file_ok = os.path.exists(settings.paths.USERS_DATA)
         if notification_file_ok and user_data_file_ok:
             logger.info('Notifications file found. Notificator activated')
             return True
@@ -43,7 +72,7 @@ class Notificator:
 
     def get_login_message(self,
                           user_name: str) -> str:
-        """Selects login message for Player and updates Player's data in JSON
+        """Selects login message for Player and updates Player's data in memory (written on disk on the next flush)
 
         Args:
             user_name: User to get message for
@@ -54,12 +83,13 @@ class Notificator:
             return ''
 
         try:
-            notifications = NotificationsCatalogue(self._load_data(settings.paths.MESSAGES))
-            all_users     = UsersCatalogue(self._load_data(settings.paths.USERS_DATA))
-            current_user  = self._get_or_create_user(all_users, user_name)
-            notification  = self._select_notification(notifications, current_user)
-            self._update_user_data(notification, current_user)
-            self._save_data(settings.paths.USERS_DATA, data=all_users.to_dict())
+            with SELECT_SECONDS.time():
+                notifications = self._messages.get_catalogue()
+                with self._lock:
+                    current_user = self._users.get_or_create_user(user_name)
+                    notification = self._select_notification(notifications, current_user)
+                    self._update_user_data(notification, current_user)
+                    self._eligibility.on_view(notifications, current_user, notification)
 
             return notification.get_formatted_text()
 
@@ -67,43 +97,47 @@ class Notificator:
             logger.exception(e)
             return ''
 
-    def _get_or_create_user(self,
-                            users: UsersCatalogue,
-                            user_name: str) -> User:
-        """Gets User from JSON with data or creates new one, if User is not yet in JSON
+    def flush(self) -> None:
+        """Writes pending changes of Users' data on disk"""
 
-        Args:
-            users: All Users from JSON
-            user_name: Current User to search or create
-        Returns:
-            User model"""
+        if self._users:
+            with FLUSH_SECONDS.time():
+                self._users.flush()
+
+    def stop(self) -> None:
+        """Stops background flushing and writes pending changes of Users' data on disk"""
+
+        if self._users:
+            self._users.stop()
+
+    def _init_storages(self) -> None:
+        """Loads notifications and Users into memory and starts background flushing"""
 
-        if user_name not in users.users:
-            user = self._create_new_user(user_name)
-            users.users[user_name] = user
+        self._messages = MessagesStorage(settings.paths.MESSAGES)
+        if settings.notifications.USERS_STORAGE == 'sqlite':
+            self._users = self._init_sqlite_storage()
         else:
-            user = users.users.get(user_name)
-        return user
+            self._users = JsonUsersStorage(settings.paths.USERS_DATA)
 
-    def _create_new_user(self,
-                         user_name: str) -> User:
-        """Create new User model
+        if settings.notifications.FLUSH_INTERVAL_SEC > 0:
+            self._users.start_flushing(settings.notifications.FLUSH_INTERVAL_SEC)
+
+    def _init_sqlite_storage(self) -> SqliteUsersStorage:
+        """Creates SQLite storage for Users' data. Migrates Users from JSON, in case DB is empty and JSON exists
 
-        Args:
-            user_name: User to create model for
         Returns:
-            User model"""
+            SQLite storage"""
 
-        user = User(
-            name=user_name,
-            data=[]
-        )
-        return user
+        storage = SqliteUsersStorage(settings.paths.DB)
+        if storage.is_empty() and settings.paths.USERS_DATA and os.path.exists(settings.paths.USERS_DATA):
+            logger.info(f'Migrating Users\' notifications data from {settings.paths.USERS_DATA} into DB')
+            storage.import_from_json(settings.paths.USERS_DATA)
+        return storage
 
     def _select_notification(self,
                              notifications: NotificationsCatalogue,
                              current_user: User) -> Notification:
-        """Selects notification. Prioritizes Notifications for random texts
+        """Selects notification. Prioritizes announcements over random texts
 
         Args:
             notifications: All notifications
@@ -111,13 +145,9 @@ class Notificator:
         Returns:
             Notification model"""
 
-        for notification in notifications.announcements:
-            if notification.id in current_user.seen_announcements:
-                user_announcement = current_user.seen_announcements[notification.id]
-                if notification.max_views > user_announcement.times_seen:
-                    return notification
-            else:
-                return notification
+        announcement = self._eligibility.get_next_announcement(notifications, current_user)
+        if announcement:
+            return announcement
 
         return random.choice(notifications.random_texts)
 
@@ -135,36 +165,4 @@ class Notificator:
         if notification.max_views == 0:
             return
 
-        if notification.id in user.seen_announcements:
-            user.seen_announcements[notification.id].times_seen += 1
-        else:
-            user.add_new_seen_notification(notification)
-
-    def _load_data(self,
-                   filepath: str) -> list | dict:
-        """Reads raw-data from disk (expected to be Users and their data and Notifications)
-
-        Args:
-            filepath: Path to file to read data from
-        Returns:
-            List or Dict (json.load applied) - list for Notifications and dict for Users (and seen notifications)"""
-
-        with self._file_lock:
-            if not os.path.exists(filepath):
-                return {}
-            with open(filepath, encoding='utf-8') as f:
-                return json.load(f)
-
-    def _save_data(self,
-                   filepath: str,
-                   data: dict | list) -> None:
-        """Saves data to dict
-
-        Args:
-            filepath: Where to save
-            data: What to save (list for Notifications and dict for Users (and seen notifications))"""
-
-        with self._file_lock:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                # indent=4 makes the file human-readable for manual edits
-                json.dump(data, f, indent=4, ensure_ascii=False)
+        self._users.record_view(user, notification)
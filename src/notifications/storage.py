@@ -0,0 +1,389 @@
+import os
+import json
+import sqlite3
+import tempfile
+import threading
+
+from loguru import logger
+from typing import Optional
+
+from notifications.models import NotificationsCatalogue, UsersCatalogue, User, Notification
+
+
+class MessagesStorage:
+    """Keeps NotificationsCatalogue in memory and reloads it only when file with messages changes on disk
+
+    Attributes:
+        _file_path: ABS-path to JSON with notifications
+        _catalogue: Currently loaded catalogue
+        _file_stamp: (mtime_ns, size) of the file at the moment of the last load
+        _lock: Lock for reloading"""
+
+    def __init__(self,
+                 file_path: str):
+        """Init
+
+        Args:
+            file_path: ABS-path to JSON with notifications"""
+
+        self._file_path:  str                       = file_path
+        self._catalogue:  NotificationsCatalogue    = NotificationsCatalogue([])
+        self._file_stamp: Optional[tuple[int, int]] = None
+        self._lock:       threading.Lock            = threading.Lock()
+
+    def get_catalogue(self) -> NotificationsCatalogue:
+        """Gets catalogue, reloading it from disk in case file was changed since the last load
+
+        Returns:
+            Actual NotificationsCatalogue"""
+
+        with self._lock:
+            current_stamp = self._get_file_stamp()
+            if current_stamp != self._file_stamp:
+                self._reload(current_stamp)
+            return self._catalogue
+
+    def _get_file_stamp(self) -> Optional[tuple[int, int]]:
+        """Reads modification time and size of the file
+
+        Returns:
+            (mtime_ns, size) or None, if file is missing"""
+
+        try:
+            stat = os.stat(self._file_path)
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    def _reload(self,
+                file_stamp: Optional[tuple[int, int]]) -> None:
+        """Reads notifications from disk
+
+        Notes:
+            In case file can not be parsed (ex: admin is in the middle of editing it), previous catalogue is kept
+        Args:
+            file_stamp: Stamp of the file, that is being loaded"""
+
+        try:
+            data = []
+            if file_stamp is not None:
+                with open(self._file_path, encoding='utf-8') as f:
+                    data = json.load(f)
+            self._catalogue = NotificationsCatalogue(data)
+            logger.info(f'Notifications loaded: {len(self._catalogue.announcements)} announcements, '
+                        f'{len(self._catalogue.random_texts)} random texts')
+        except Exception as e:
+            logger.error(f'Was not able to reload notifications from {self._file_path}, keeping previous ones')
+            logger.exception(e)
+        finally:
+            self._file_stamp = file_stamp
+
+
+class JsonUsersStorage:
+    """Keeps Users and their seen notifications in memory and writes them on disk in background (write-behind)
+
+    Notes:
+        Only Users, that were changed since the last flush, are serialized again. Serialized Users are cached, and the
+        file is written atomically (temp-file + rename), so it is never left half-written. File is read only once,
+        so any manual edits of it, made while app is running, will be overwritten
+
+    Attributes:
+        _file_path: ABS-path to JSON with Users' data
+        _users: All Users
+        _serialized_users: Cache with already serialized Users {User.name: JSON-string}
+        _dirty_users: Names of Users, changed since the last flush
+        _lock: Lock for in-memory data
+        _flush_lock: Lock, so only one flush writes file at a time
+        _stop_event: Stops background flushing"""
+
+    def __init__(self,
+                 file_path: str):
+        """Init
+
+        Args:
+            file_path: ABS-path to JSON with Users' data"""
+
+        self._file_path:        str             = file_path
+        self._users:            UsersCatalogue  = UsersCatalogue(self._load())
+        self._serialized_users: dict[str, str]  = {}
+        self._dirty_users:      set[str]        = set()
+        self._lock:             threading.Lock  = threading.Lock()
+        self._flush_lock:       threading.Lock  = threading.Lock()
+        self._stop_event:       threading.Event = threading.Event()
+
+        for user_name, user in self._users.users.items():
+            self._serialized_users[user_name] = self._serialize_user(user)
+
+    def get_or_create_user(self,
+                           user_name: str) -> User:
+        """Gets User or creates new one, if there is no such User yet
+
+        Args:
+            user_name: Name of the User
+        Returns:
+            User model"""
+
+        with self._lock:
+            user = self._users.users.get(user_name)
+            if user is None:
+                user = User(name=user_name, data=[])
+                self._users.users[user_name] = user
+            return user
+
+    def record_view(self,
+                    user: User,
+                    notification: Notification) -> None:
+        """Increments counter of views of the notification for User and marks User to be written on the next flush
+
+        Args:
+            user: User, that have seen notification
+            notification: Notification, that was shown to User"""
+
+        with self._lock:
+            if notification.id in user.seen_announcements:
+                user.seen_announcements[notification.id].times_seen += 1
+            else:
+                user.add_new_seen_notification(notification)
+            self._dirty_users.add(user.name)
+
+    def flush(self) -> None:
+        """Writes Users on disk, in case any of them were changed since the last flush"""
+
+        with self._flush_lock:
+            with self._lock:
+                if not self._dirty_users:
+                    return
+                dirty_users = self._dirty_users
+                self._dirty_users = set()
+                for user_name in dirty_users:
+                    self._serialized_users[user_name] = self._serialize_user(self._users.users[user_name])
+                serialized_users = list(self._serialized_users.items())
+
+            try:
+                self._write_atomically(serialized_users)
+                logger.debug(f'Flushed notifications data for {len(dirty_users)} Users')
+            except Exception as e:
+                logger.error(f'Was not able to save Users data into {self._file_path}')
+                logger.exception(e)
+                with self._lock:
+                    self._dirty_users.update(dirty_users)
+
+    def start_flushing(self,
+                       interval_sec: int) -> None:
+        """Starts background thread, which flushes changes every interval_sec
+
+        Args:
+            interval_sec: Seconds between flushes"""
+
+        threading.Thread(target=self._flush_loop, args=(interval_sec,), daemon=True).start()
+
+    def stop(self) -> None:
+        """Stops background flushing and writes all pending changes"""
+
+        self._stop_event.set()
+        self.flush()
+
+    def _flush_loop(self,
+                    interval_sec: int) -> None:
+        """Flushes changes periodically, till stopped
+
+        Args:
+            interval_sec: Seconds between flushes"""
+
+        while not self._stop_event.wait(interval_sec):
+            self.flush()
+
+    def _load(self) -> dict:
+        """Reads Users' data from disk
+
+        Returns:
+            Raw data, or empty dict in case there is no file"""
+
+        if not os.path.exists(self._file_path):
+            return {}
+        with open(self._file_path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def _serialize_user(self,
+                        user: User) -> str:
+        """Serializes single User as a JSON-list of seen notifications
+
+        Args:
+            user: User to serialize
+        Returns:
+            JSON-string"""
+
+        notifications_list = []
+        for notification_id, notification in user.seen_announcements.items():
+            notifications_list.append({'id': notification_id, 'times_seen': notification.times_seen})
+        return json.dumps(notifications_list, ensure_ascii=False)
+
+    def _write_atomically(self,
+                          serialized_users: list[tuple[str, str]]) -> None:
+        """Writes Users into temp-file next to the target and replaces target with it
+
+        Notes:
+            Each User takes a single line, so file stays readable for manual edits
+        Args:
+            serialized_users: Pairs (User.name, serialized User)"""
+
+        lines = []
+        for user_name, serialized_user in serialized_users:
+            lines.append(f'    {json.dumps(user_name, ensure_ascii=False)}: {serialized_user}')
+
+        target_dir = os.path.dirname(os.path.abspath(self._file_path))
+        with tempfile.NamedTemporaryFile('w',
+                                         encoding='utf-8',
+                                         dir=target_dir,
+                                         suffix='.tmp',
+                                         delete=False) as f:
+            f.write('{\n' + ',\n'.join(lines) + '\n}\n')
+            temp_path = f.name
+
+        try:
+            os.replace(temp_path, self._file_path)
+        except Exception:
+            os.remove(temp_path)
+            raise
+
+
+class SqliteUsersStorage:
+    """Keeps counters of seen notifications in SQLite table, keyed by (User, notification)
+
+    Notes:
+        Each view is a single upsert, and a single User is read by primary-key index, so cost of login does not depend
+        on the number of Users. Interface is the same as in JsonUsersStorage
+
+    Attributes:
+        _conn: Connection to DB
+        _lock: Lock for connection, as it is shared between threads"""
+
+    def __init__(self,
+                 db_path: str):
+        """Init
+
+        Args:
+            db_path: ABS-path to SQLite DB (will be created, if missing)"""
+
+        self._conn: sqlite3.Connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock: threading.Lock     = threading.Lock()
+
+        self._init_db()
+
+    def _init_db(self) -> None:
+        """Creates table for Users' notifications"""
+
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS user_notifications (
+                    user_name TEXT NOT NULL,
+                    notification_id TEXT NOT NULL,
+                    times_seen INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (user_name, notification_id)
+                )
+            """)
+            self._conn.commit()
+
+    def is_empty(self) -> bool:
+        """Checks if there are any records in table
+
+        Returns:
+            True, if table has no records"""
+
+        with self._lock:
+            row = self._conn.execute('SELECT 1 FROM user_notifications LIMIT 1').fetchone()
+        return row is None
+
+    def get_or_create_user(self,
+                           user_name: str) -> User:
+        """Reads single User from DB. User without records is simply a User with no seen notifications
+
+        Args:
+            user_name: Name of the User
+        Returns:
+            User model"""
+
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT notification_id, times_seen FROM user_notifications WHERE user_name = ?',
+                (user_name,)
+            ).fetchall()
+
+        data = [{'id': notification_id, 'times_seen': times_seen} for notification_id, times_seen in rows]
+        return User(name=user_name, data=data)
+
+    def record_view(self,
+                    user: User,
+                    notification: Notification) -> None:
+        """Increments counter of views of the notification for User, both in model and in DB
+
+        Args:
+            user: User, that have seen notification
+            notification: Notification, that was shown to User"""
+
+        if notification.id in user.seen_announcements:
+            user.seen_announcements[notification.id].times_seen += 1
+        else:
+            user.add_new_seen_notification(notification)
+
+        with self._lock:
+            self._conn.execute("""
+                INSERT INTO user_notifications (user_name, notification_id, times_seen) VALUES (?, ?, 1)
+                ON CONFLICT (user_name, notification_id) DO UPDATE SET times_seen = times_seen + 1
+            """, (user.name, notification.id))
+            self._conn.commit()
+
+    def import_from_json(self,
+                         json_path: str) -> int:
+        """Migrates Users' data from JSON, used by JsonUsersStorage
+
+        Notes:
+            Safe to run several times: for existing records the biggest counter is kept
+        Args:
+            json_path: ABS-path to JSON with Users' data
+        Returns:
+            Number of imported records"""
+
+        with open(json_path, encoding='utf-8') as f:
+            users = UsersCatalogue(json.load(f))
+
+        records = []
+        for user_name, user in users.users.items():
+            for notification_id, user_notification in user.seen_announcements.items():
+                records.append((user_name, notification_id, user_notification.times_seen))
+
+        with self._lock:
+            self._conn.executemany("""
+                INSERT INTO user_notifications (user_name, notification_id, times_seen) VALUES (?, ?, ?)
+                ON CONFLICT (user_name, notification_id) DO UPDATE SET times_seen = MAX(times_seen, excluded.times_seen)
+            """, records)
+            self._conn.commit()
+
+        logger.info(f'Imported {len(records)} notification records of {len(users.users)} Users from {json_path}')
+        return len(records)
+
+    def flush(self) -> None:
+        """Does nothing, as each view is committed immediately. Exists for compatibility with JsonUsersStorage"""
+
+    def start_flushing(self,
+                       interval_sec: int) -> None:
+        """Does nothing, as each view is committed immediately. Exists for compatibility with JsonUsersStorage
+
+        Args:
+            interval_sec: Not used"""
+
+    def stop(self) -> None:
+        """Closes connection to DB"""
+
+        with self._lock:
+            self._conn.close()
+
+
+if __name__ == '__main__':
+    from settings import settings
+
+    storage = SqliteUsersStorage(settings.paths.DB)
+    storage.import_from_json(settings.paths.USERS_DATA)
+    storage.stop()
@@ -1,16 +1,32 @@
+import os
+import time
 import threading
 import subprocess
 
 from loguru import logger
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 from queue import Queue, Empty
+from collections import deque
 
 from settings import settings
+from metrics.registry import METRICS
 from anti_bot.anti_bot import AntiBot
 from notifications.notificator import Notificator
 from toxicity_manager.manager import ToxicityManager
+from server_communicator.scheduler import DelayedJobsScheduler
+from server_communicator.raw_log_sink import RawLogSink
 from server_communicator.logs_extractor import LogsExtractor
 
+if TYPE_CHECKING:
+    from server_health.startup import StartupTracker
+    from server_health.supervisor import ServerSupervisor
+    from server_health.tps_tracker import TpsTracker
+
+
+LINES        = METRICS.counter('msm_server_lines_total', 'Lines, read from server')
+LINE_SECONDS = METRICS.histogram('msm_server_line_seconds', 'Time to process a single line from server')
+QUEUE_DEPTH  = METRICS.gauge('msm_server_queue_depth', 'Lines from server, waiting to be processed')
+
 
 class ServerCommunicator:
     """Communicates with java-server to get logs from it and write commands into it
@@ -18,28 +34,56 @@ class ServerCommunicator:
     Attributes:
         server_proc: Process with Minecraft-Server
         notificator: Instance of Notificator to get notifications for Users from
+        tps_tracker: Tracker of server's TPS, gets every line of output
+        startup_tracker: Detects readiness of server, gets every line of output
+        supervisor: Tells crash from stop by command, gets every line of output
+        last_output_at: Time (monotonic) of the last line from server
+        _recent_output: The latest lines of server's output, for crash reports
         _output_queue: Queue to store Minecraft-Server's output
-        _stop_event: Thread-communicator"""
+        _stop_event: Thread-communicator
+        _scheduler: Single thread, that sends delayed login messages
+        _raw_log: File with server's output"""
 
     def __init__(self,
                  server_proc: subprocess.Popen,
                  antibot: Optional[AntiBot] = None,
-                 toxicity: Optional[ToxicityManager] = None):
+                 toxicity: Optional[ToxicityManager] = None,
+                 notificator: Optional[Notificator] = None):
         """Init
 
         Args:
             server_proc: Process with java-server
             antibot: Instance of AntiBot to track bots
-            toxicity: Instance of toxicity manager"""
+            toxicity: Instance of toxicity manager
+            notificator: Instance of Notificator to reuse (new one will be created, if not provided)"""
 
         self.server_proc:  subprocess.Popen  = server_proc
-        self.notificator:  Notificator       = Notificator()
+        self.notificator:  Notificator       = notificator or Notificator()
         self.antibot:      Optional[AntiBot] = antibot
 
-        self.toxicity: Optional[ToxicityManager] = toxicity
+        self.toxicity:    Optional[ToxicityManager] = toxicity
+        self.tps_tracker: Optional['TpsTracker']    = None
+
+        self.startup_tracker: Optional['StartupTracker']   = None
+        self.supervisor:      Optional['ServerSupervisor'] = None
+
+        self.last_output_at: float = time.monotonic()
+        self._recent_output: deque = deque(maxlen=settings.health.CRASH_REPORT_LINES)
+
+        self._output_queue: Queue                = Queue(maxsize=10000)
+        self._stop_event:   threading.Event      = threading.Event()
+        self._scheduler:    DelayedJobsScheduler = DelayedJobsScheduler()
+        self._raw_log:      RawLogSink           = RawLogSink(
+            settings.raw_log.FILE or os.path.abspath(os.path.join('logs', 'minecraft.log')),
+            mode=settings.raw_log.MODE,
+            max_bytes=settings.raw_log.MAX_MB * 2 ** 20,
+            backups=settings.raw_log.BACKUPS,
+            buffer_size=settings.raw_log.BUFFER_KB * 2 ** 10,
+            flush_interval=settings.raw_log.FLUSH_SEC,
+            sample_every=settings.raw_log.SAMPLE_EVERY
+        )
 
-        self._output_queue: Queue           = Queue(maxsize=10000)
-        self._stop_event:   threading.Event = threading.Event()
+        QUEUE_DEPTH.set_function(self._output_queue.qsize)
 
     def start_communication(self):
         """Entry point to launch both threads"""
@@ -50,6 +94,17 @@ class ServerCommunicator:
         # Thread 2: Consumer (Processes data)
         threading.Thread(target=self._processor_loop, daemon=True).start()
 
+        # Thread 3: Delayed login messages
+        self._scheduler.start()
+
+    def get_recent_output(self) -> list[str]:
+        """Gets the latest lines of server's output
+
+        Returns:
+            Lines, the oldest first"""
+
+        return [line.decode('utf-8', errors='replace').rstrip() for line in list(self._recent_output)]
+
     def _reader_loop(self) -> None:
         """Loop, responsible for reading Server's output and putting it into queue"""
 
@@ -58,12 +113,15 @@ class ServerCommunicator:
 
         try:
             for line_bytes in iter(self.server_proc.stdout.readline, b''):
+                self.last_output_at = time.monotonic()
+                self._recent_output.append(line_bytes)
                 self._output_queue.put_nowait(line_bytes)
         except Exception as e:
             logger.error(f"Reader thread error: {e}")
         finally:
             self.server_proc.stdout.close()
             self._stop_event.set()
+            self._scheduler.stop()
             logger.warning("Minecraft output reader finished.")
 
     def _processor_loop(self) -> None:
@@ -73,9 +131,13 @@ class ServerCommunicator:
             line_bytes = None
             try:
                 line_bytes = self._output_queue.get(timeout=1.0)
+                started_at = time.perf_counter()
+                self._raw_log.write(line_bytes)
                 line_string = self._read_output_line(line_bytes)
                 if line_string:
                     self._process_line(line_string)
+                LINES.inc()
+                LINE_SECONDS.observe(time.perf_counter() - started_at)
             except Empty:
                 continue
             except Exception as e:
@@ -84,6 +146,8 @@ class ServerCommunicator:
                 if line_bytes is not None:
                     self._output_queue.task_done()
 
+        self._raw_log.close()
+
     def _read_output_line(self,
                           line_bytes: bytes) -> str | None:
         """Reads output from server
@@ -106,10 +170,20 @@ class ServerCommunicator:
         Args:
             line: Line from server's output"""
 
-        logger.opt(colors=True).info("<green>[MINECRAFT]</green> {}", line)
+        if settings.raw_log.ECHO:
+            logger.info('[MINECRAFT] {}', line)
         if self.notificator.activated:
             self._check_login_event(line)
 
+        if self.tps_tracker:
+            self.tps_tracker.check_line(line)
+
+        if self.startup_tracker:
+            self.startup_tracker.check_line(line)
+
+        if self.supervisor:
+            self.supervisor.check_line(line)
+
         if settings.antibot.ON:
             self._check_antibot_events(line)
 
@@ -138,6 +212,10 @@ class ServerCommunicator:
                 logger.debug(f'Parsed {updated_coords=}')
                 self.antibot.update_last_know_coords(user_name=user_name, coordinates_str=updated_coords)
 
+            if "Added tag '" in clean_line:
+                tag, user_name = LogsExtractor.extract_added_tag(clean_line)
+                self.antibot.confirm_tag(user_name=user_name, tag=tag)
+
             if settings.antibot.AGGRESSIVE_COMMAND in clean_line:
                 for root_user in settings.antibot.ACCEPT_FROM_USERS:
                     if root_user in clean_line:
@@ -158,8 +236,10 @@ class ServerCommunicator:
 
     def _check_login_event(self,
                            clean_line: str) -> None:
-        """Checks if Player logged in and initiates login message, and extracts data for antibot
+        """Checks if Player logged in and schedules login message, and extracts data for antibot
 
+        Notes:
+            Fast re-login replaces pending welcome message, and disconnect cancels it
         Args:
             clean_line: Output from server to check if this is a login event"""
 
@@ -170,18 +250,33 @@ class ServerCommunicator:
                     logger.info(f"Scheduling welcome message for {user_name} "
                                 f"in {settings.notifications.START_MESSAGE_DELAY}s")
 
-                    timer = threading.Timer(
-                        interval=settings.notifications.START_MESSAGE_DELAY,
-                        function=self._send_login_message,
-                        args=[user_name]
-                    )
-                    timer.start()
+                    self._scheduler.schedule(user_name,
+                                             settings.notifications.START_MESSAGE_DELAY,
+                                             self._send_login_message,
+                                             user_name)
 
                     self._save_login_coords(clean_line, user_name)
 
+            elif " lost connection: " in clean_line:
+                user_name = LogsExtractor.extract_disconnected_user_name(clean_line)
+                if user_name:
+                    self.cancel_login_message(user_name)
+                    if self.toxicity:
+                        self.toxicity.on_disconnect(user_name)
+
         except Exception as e:
             logger.exception(e)
 
+    def cancel_login_message(self,
+                             user_name: str) -> None:
+        """Cancels pending login message for User (ex: User was kicked or disconnected before it was sent)
+
+        Args:
+            user_name: User to cancel message for"""
+
+        if self._scheduler.cancel(user_name):
+            logger.debug(f'Welcome message for {user_name} cancelled')
+
     def _save_login_coords(self,
                            clean_line: str,
                            user_name: str) -> None:
@@ -54,6 +54,24 @@ class LogsExtractor:
 
         return username
 
+    @staticmethod
+    def extract_disconnected_user_name(clean_line: str) -> str:
+        """Extracts UserName from disconnect-log
+
+        Args:
+            clean_line: Output from server
+        Returns:
+            UserName"""
+
+        # [19:25:45 INFO]: Name lost connection: Disconnected
+        after_prefix = clean_line.split("]: ")[-1]
+        # Name lost connection: Disconnected
+
+        username = after_prefix.split(" lost connection: ")[0].strip()
+        # Name
+
+        return username
+
     @staticmethod
     def extract_login_coords_and_ip(clean_line: str) -> tuple[str, str]:
         """Extracts login coordinates and IP address
@@ -131,6 +149,29 @@ class LogsExtractor:
             logger.exception(e)
             return '', ''
 
+    @staticmethod
+    def extract_added_tag(clean_line: str) -> tuple[str, str]:
+        """Extracts tag and user_name from reply to tag-command
+
+        Args:
+            clean_line: Log from server
+        Returns:
+            Tag and user_name"""
+
+        # [13:32:32 INFO]: Added tag 'msm_tracked' to Name
+        try:
+            message_itself = clean_line.split("]: ")[-1]
+            # Added tag 'msm_tracked' to Name
+
+            tag       = message_itself.split("'")[1]
+            user_name = message_itself.split("' to ")[-1].strip().rstrip(']')
+            # msm_tracked, Name
+
+            return tag, user_name
+        except Exception as e:
+            logger.exception(e)
+            return '', ''
+
     @staticmethod
     def parse_coordinates(coords_str: str) -> tuple[int, int, int]:
         """Parses string with 3 coordinates into 3 numbers
@@ -0,0 +1,189 @@
+import os
+import threading
+
+from loguru import logger
+from typing import BinaryIO, Optional
+
+
+class RawLogSink:
+    """Writes server's output as is into its own rotating file, apart from manager's logs
+
+    Notes:
+        Lines are appended as bytes, without decoding or markup, into a buffered file, which is flushed once buffer is
+        full or every flush_interval seconds (from a background thread), so under load there is a write-syscall per
+        buffer, not per line. Once file reaches max_bytes, it is renamed to file.1 (file.1 to file.2 and so on, up to
+        backups files) and a new one is started.
+
+        Modes:
+            all: every line is written
+            filtered: only lines with any of KEEP_PATTERNS (logins, disconnects, commands, chat, warnings and errors)
+            sampled: same as filtered, plus every sample_every-th of other lines
+            off: nothing is written
+
+    Attributes:
+        _path: ABS-path to the current file
+        _mode: One of MODES
+        _max_bytes: Size of file to rotate at
+        _backups: Number of rotated files to keep
+        _buffer_size: Size of write buffer
+        _sample_every: Every N-th of other lines is written in sampled mode
+        _skipped: Lines, skipped since the last sampled one
+        _file: Opened file
+        _size: Current size of the file
+        _lock: Lock, as flushing is done from background thread
+        _stop_event: Stops flushing thread"""
+
+    MODES: tuple[str, ...] = ('all', 'filtered', 'sampled', 'off')
+
+    KEEP_PATTERNS: tuple[bytes, ...] = (
+        b'logged in with entity id',
+        b'lost connection',
+        b'issued server command',
+        b'UUID of player',
+        b'> ',
+        b'WARN',
+        b'ERROR',
+        b'Exception',
+        b'Done (',
+        b'Stopping',
+    )
+    """Lines with any of these are always written in filtered and sampled modes"""
+
+    def __init__(self,
+                 path: str,
+                 mode: str = 'all',
+                 max_bytes: int = 50 * 2 ** 20,
+                 backups: int = 5,
+                 buffer_size: int = 256 * 2 ** 10,
+                 flush_interval: float = 2,
+                 sample_every: int = 100):
+        """Init
+
+        Args:
+            path: ABS-path to the file
+            mode: One of MODES
+            max_bytes: Size of file to rotate at
+            backups: Number of rotated files to keep (0 - file is just truncated on rotation)
+            buffer_size: Size of write buffer
+            flush_interval: Seconds between background flushes
+            sample_every: Every N-th of other lines is written in sampled mode
+        Raises:
+            ValueError: In case mode is unknown"""
+
+        if mode not in self.MODES:
+            raise ValueError(f'Unknown mode of raw log: {mode}, expected one of {self.MODES}')
+
+        self._path:         str                = path
+        self._mode:         str                = mode
+        self._max_bytes:    int                = max_bytes
+        self._backups:      int                = backups
+        self._buffer_size:  int                = buffer_size
+        self._sample_every: int                = max(sample_every, 1)
+        self._skipped:      int                = 0
+        self._file:         Optional[BinaryIO] = None
+        self._size:         int                = 0
+        self._lock:         threading.Lock     = threading.Lock()
+        self._stop_event:   threading.Event    = threading.Event()
+
+        if self._mode != 'off':
+            self._open()
+            threading.Thread(target=self._flush_loop, args=(flush_interval,), daemon=True).start()
+
+    def write(self,
+              line: bytes) -> None:
+        """Writes line of server's output, if mode lets it
+
+        Args:
+            line: Line as read from server, with line break"""
+
+        if self._mode == 'off' or not self._should_keep(line):
+            return
+
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(line)
+            self._size += len(line)
+            if self._size >= self._max_bytes:
+                self._rotate()
+
+    def flush(self) -> None:
+        """Writes buffer on disk"""
+
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self) -> None:
+        """Writes buffer on disk and closes file"""
+
+        self._stop_event.set()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _should_keep(self,
+                     line: bytes) -> bool:
+        """Checks if line should be written in current mode
+
+        Args:
+            line: Line from server
+        Returns:
+            True, if line should be written"""
+
+        if self._mode == 'all':
+            return True
+
+        for pattern in self.KEEP_PATTERNS:
+            if pattern in line:
+                return True
+
+        if self._mode == 'sampled':
+            self._skipped += 1
+            if self._skipped >= self._sample_every:
+                self._skipped = 0
+                return True
+        return False
+
+    def _open(self) -> None:
+        """Opens file for appending"""
+
+        try:
+            os.makedirs(os.path.dirname(self._path) or '.', exist_ok=True)
+            self._file = open(self._path, 'ab', buffering=self._buffer_size)
+            self._size = self._file.tell()
+        except Exception as e:
+            logger.error(f'Was not able to open raw log {self._path}, server output will not be written')
+            logger.exception(e)
+            self._file = None
+
+    def _rotate(self) -> None:
+        """Shifts rotated files and starts new file. Call under lock"""
+
+        self._file.close()
+        try:
+            if self._backups:
+                for index in range(self._backups - 1, 0, -1):
+                    older = f'{self._path}.{index}'
+                    if os.path.exists(older):
+                        os.replace(older, f'{self._path}.{index + 1}')
+                os.replace(self._path, f'{self._path}.1')
+            else:
+                os.remove(self._path)
+        except Exception as e:
+            logger.exception(e)
+        self._open()
+
+    def _flush_loop(self,
+                    interval: float) -> None:
+        """Flushes buffer periodically, so file is not far behind, when server is quiet
+
+        Args:
+            interval: Seconds between flushes"""
+
+        while not self._stop_event.wait(interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.exception(e)
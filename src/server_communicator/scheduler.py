@@ -0,0 +1,171 @@
+import time
+import heapq
+import itertools
+import threading
+
+from loguru import logger
+from collections.abc import Callable
+
+
+class DelayedJob:
+    """Job, that should be executed after some delay
+
+    Attributes:
+        key: Unique key of the job (ex: name of the User to send welcome message to)
+        due_at: Monotonic time, when job should be executed
+        sequence: Sequence number, to distinguish replaced jobs with the same key
+        function: Function to call
+        args: Arguments for the function"""
+
+    def __init__(self,
+                 key: str,
+                 due_at: float,
+                 sequence: int,
+                 function: Callable,
+                 args: tuple):
+        """Init
+
+        Args:
+            key: Unique key of the job
+            due_at: Monotonic time, when job should be executed
+            sequence: Sequence number of the job
+            function: Function to call
+            args: Arguments for the function"""
+
+        self.key:      str      = key
+        self.due_at:   float    = due_at
+        self.sequence: int      = sequence
+        self.function: Callable = function
+        self.args:     tuple    = args
+
+
+class DelayedJobsScheduler:
+    """Executes delayed jobs on a single thread, instead of starting a Timer-thread for each of them
+
+    Notes:
+        Jobs are kept in a min-heap by due time. Only one job per key can be pending: scheduling a job with a key, that
+        is already pending, replaces previous job. Replaced and cancelled jobs are left in heap and skipped when popped
+
+    Attributes:
+        _heap: Min-heap with (due_at, sequence, key)
+        _jobs: Pending jobs {key: DelayedJob}
+        _sequence: Counter for jobs' sequence numbers
+        _condition: Condition to wake up scheduler thread, when jobs change
+        _running: If scheduler thread should keep running"""
+
+    def __init__(self):
+        """Init"""
+
+        self._heap:      list[tuple[float, int, str]] = []
+        self._jobs:      dict[str, DelayedJob]        = {}
+        self._sequence:  itertools.count              = itertools.count()
+        self._condition: threading.Condition          = threading.Condition()
+        self._running:   bool                         = False
+
+    def start(self) -> None:
+        """Starts scheduler thread"""
+
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def stop(self) -> None:
+        """Stops scheduler thread. Pending jobs are dropped"""
+
+        with self._condition:
+            self._running = False
+            self._jobs.clear()
+            self._heap.clear()
+            self._condition.notify()
+
+    def schedule(self,
+                 key: str,
+                 delay_sec: float,
+                 function: Callable,
+                 *args) -> None:
+        """Schedules function to be called after delay. Replaces pending job with the same key
+
+        Args:
+            key: Unique key of the job
+            delay_sec: Delay in seconds
+            function: Function to call
+            args: Arguments for the function"""
+
+        with self._condition:
+            if key in self._jobs:
+                logger.debug(f'Replacing pending job {key}')
+            job = DelayedJob(key=key,
+                             due_at=time.monotonic() + delay_sec,
+                             sequence=next(self._sequence),
+                             function=function,
+                             args=args)
+            self._jobs[key] = job
+            heapq.heappush(self._heap, (job.due_at, job.sequence, key))
+            self._condition.notify()
+
+    def cancel(self,
+               key: str) -> bool:
+        """Cancels pending job
+
+        Args:
+            key: Key of the job to cancel
+        Returns:
+            True, if there was a pending job with this key"""
+
+        with self._condition:
+            return self._jobs.pop(key, None) is not None
+
+    def get_pending_count(self) -> int:
+        """Counts pending jobs
+
+        Returns:
+            Number of pending jobs"""
+
+        with self._condition:
+            return len(self._jobs)
+
+    def _run(self) -> None:
+        """Scheduler loop: waits for the closest job and executes it"""
+
+        while True:
+            job = self._wait_for_due_job()
+            if job is None:
+                return
+
+            try:
+                job.function(*job.args)
+            except Exception as e:
+                logger.error(f'Delayed job {job.key} failed')
+                logger.exception(e)
+
+    def _wait_for_due_job(self) -> DelayedJob | None:
+        """Waits till the closest job is due and takes it out of pending jobs
+
+        Returns:
+            Job to execute or None, if scheduler was stopped"""
+
+        with self._condition:
+            while self._running:
+                if not self._heap:
+                    self._condition.wait()
+                    continue
+
+                due_at, sequence, key = self._heap[0]
+                job = self._jobs.get(key)
+                if job is None or job.sequence != sequence:
+                    # Job was cancelled or replaced
+                    heapq.heappop(self._heap)
+                    continue
+
+                wait_for = due_at - time.monotonic()
+                if wait_for > 0:
+                    self._condition.wait(wait_for)
+                    continue
+
+                heapq.heappop(self._heap)
+                del self._jobs[key]
+                return job
+
+            return None
@@ -0,0 +1,417 @@
+import os
+import re
+import math
+import time
+import sqlite3
+import datetime
+import threading
+
+from loguru import logger
+from collections import deque
+from typing import BinaryIO, Optional
+
+from metrics.registry import METRICS, Histogram
+
+
+PAUSE_SECONDS    = METRICS.histogram('msm_gc_pause_seconds', 'Stop-the-world pauses of server GC')
+HEAP_AFTER_BYTES = METRICS.gauge('msm_gc_heap_after_bytes', 'Heap occupancy of server after the latest GC')
+ALLOC_RATE       = METRICS.gauge('msm_gc_alloc_bytes_per_second', 'Allocation rate of server between GCs')
+
+UNITS: dict[str, int] = {'B': 1, 'K': 2 ** 10, 'M': 2 ** 20, 'G': 2 ** 30}
+"""Multipliers of sizes in GC log"""
+
+
+class GcRollup:
+    """Aggregates of GC pauses over a window of time
+
+    Attributes:
+        pauses: Pause durations, seconds, with percentiles
+        pause_seconds: Sum of pause durations
+        allocated_bytes: Bytes allocated between GCs
+        allocating_seconds: Seconds, during which allocated_bytes were allocated
+        heap_after_bytes: Heap occupancy after each of the latest GCs
+        heap_total_bytes: The biggest committed heap
+        humongous: Number of GCs, caused by humongous allocations"""
+
+    def __init__(self):
+        """Init"""
+
+        self.pauses:             Histogram = Histogram()
+        self.pause_seconds:      float     = 0.0
+        self.allocated_bytes:    int       = 0
+        self.allocating_seconds: float     = 0.0
+        self.heap_after_bytes:   deque     = deque(maxlen=4096)
+        self.heap_total_bytes:   int       = 0
+        self.humongous:          int       = 0
+
+    def get_alloc_rate(self) -> float:
+        """Gets allocation rate
+
+        Returns:
+            Bytes per second"""
+
+        if not self.allocating_seconds:
+            return 0.0
+        return self.allocated_bytes / self.allocating_seconds
+
+
+class GcLogParser:
+    """Parses unified GC log of JVM (-Xlog:gc*) line by line and keeps aggregates over the whole run and current window
+
+    Notes:
+        Only stop-the-world pauses of G1 and Parallel are counted ('GC(12) Pause Young (Normal) (G1 Evacuation Pause)
+        512M->128M(1024M) 5.123ms'), lines must be decorated with uptime. Allocation rate is heap growth between the
+        end of one GC and the start of the next one, divided by uptime between them.
+
+    Attributes:
+        _total: Aggregates over the whole run
+        _window: Aggregates since the latest rollup
+        _region_bytes: Size of G1 region, if logged
+        _last_uptime: Uptime of the latest pause
+        _last_heap_after: Heap occupancy after the latest pause"""
+
+    PAUSE_PATTERN: re.Pattern = re.compile(
+        r'\[(?P<uptime>\d+[.,]\d+)s\].*GC\(\d+\) Pause (?P<kind>.+?) '
+        r'(?P<before>\d+)(?P<before_unit>[BKMG])->(?P<after>\d+)(?P<after_unit>[BKMG])'
+        r'\((?P<total>\d+)(?P<total_unit>[BKMG])\) (?P<ms>\d+[.,]\d+)ms'
+    )
+    """JVM may print decimal comma, depending on locale"""
+
+    REGION_PATTERN: re.Pattern = re.compile(r'Heap [Rr]egion [Ss]ize: (?P<size>\d+)(?P<unit>[BKMG])')
+
+    def __init__(self):
+        """Init"""
+
+        self._total:           GcRollup        = GcRollup()
+        self._window:          GcRollup        = GcRollup()
+        self._region_bytes:    Optional[int]   = None
+        self._last_uptime:     Optional[float] = None
+        self._last_heap_after: Optional[int]   = None
+
+    def parse_line(self,
+                   line: str) -> None:
+        """Parses line of GC log
+
+        Args:
+            line: Line of GC log"""
+
+        if 'Pause' in line:
+            match = self.PAUSE_PATTERN.search(line)
+            if match:
+                self._add_pause(match)
+
+        elif 'egion' in line:
+            match = self.REGION_PATTERN.search(line)
+            if match:
+                self._region_bytes = int(match.group('size')) * UNITS[match.group('unit')]
+
+    def pop_window(self) -> GcRollup:
+        """Gets aggregates since the previous call and starts a new window
+
+        Returns:
+            Aggregates of the window"""
+
+        window, self._window = self._window, GcRollup()
+        return window
+
+    def get_total(self) -> GcRollup:
+        """Gets aggregates over the whole run
+
+        Returns:
+            Aggregates"""
+
+        return self._total
+
+    def get_region_bytes(self) -> Optional[int]:
+        """Gets size of G1 region
+
+        Returns:
+            Size of region or None, if it was not logged"""
+
+        return self._region_bytes
+
+    def _add_pause(self,
+                   match: re.Match) -> None:
+        """Adds pause into aggregates
+
+        Args:
+            match: Match of PAUSE_PATTERN"""
+
+        uptime  = float(match.group('uptime').replace(',', '.'))
+        seconds = float(match.group('ms').replace(',', '.')) / 1000
+        before  = int(match.group('before')) * UNITS[match.group('before_unit')]
+        after   = int(match.group('after')) * UNITS[match.group('after_unit')]
+        total   = int(match.group('total')) * UNITS[match.group('total_unit')]
+
+        allocated, allocating_seconds = 0, 0.0
+        if self._last_uptime is not None and uptime > self._last_uptime and before >= self._last_heap_after:
+            allocated          = before - self._last_heap_after
+            allocating_seconds = uptime - self._last_uptime
+            ALLOC_RATE.set(allocated / allocating_seconds)
+        self._last_uptime     = uptime
+        self._last_heap_after = after
+
+        for rollup in (self._total, self._window):
+            rollup.pauses.observe(seconds)
+            rollup.pause_seconds      += seconds
+            rollup.allocated_bytes    += allocated
+            rollup.allocating_seconds += allocating_seconds
+            rollup.heap_after_bytes.append(after)
+            rollup.heap_total_bytes    = max(rollup.heap_total_bytes, total)
+            if 'Humongous' in match.group('kind'):
+                rollup.humongous += 1
+
+        PAUSE_SECONDS.observe(seconds)
+        HEAP_AFTER_BYTES.set(after)
+
+
+class GcAdvisor:
+    """Makes recommendations on JVM flags from observed GC
+
+    Notes:
+        Heap is recommended at 3-4 times the live set (90th percentile of heap after GC), G1 works best with about
+        2048 regions, and server has 50 ms per tick, so pauses above it cost ticks"""
+
+    TICK_MS: float = 50
+    """Time budget of a single tick"""
+
+    @staticmethod
+    def get_report(parser: GcLogParser,
+                   max_pause_ms: float) -> str:
+        """Makes report with recommendations
+
+        Args:
+            parser: Parser, that has read GC log
+            max_pause_ms: Current value of -XX:MaxGCPauseMillis
+        Returns:
+            Human-readable report"""
+
+        total = parser.get_total()
+        count = total.pauses.get_count()
+        if count == 0:
+            return 'GC report: no pauses observed yet'
+
+        heap_after = sorted(total.heap_after_bytes)
+        live_bytes = heap_after[min(len(heap_after) - 1, int(len(heap_after) * 0.9))]
+        p50_ms     = total.pauses.get_percentile(50) * 1000
+        p99_ms     = total.pauses.get_percentile(99) * 1000
+        max_ms     = total.pauses.get_percentile(100) * 1000
+
+        lines = [
+            f'GC report ({count} pauses): p50 {p50_ms:.1f} ms, p99 {p99_ms:.1f} ms, max {max_ms:.1f} ms, '
+            f'allocation {total.get_alloc_rate() / 2 ** 20:.1f} MB/s, '
+            f'live set ~{live_bytes / 2 ** 20:.0f} MB of {total.heap_total_bytes / 2 ** 20:.0f} MB heap'
+        ]
+
+        heap_gb = max(1, math.ceil(live_bytes * 3.5 / 2 ** 30))
+        if total.heap_total_bytes < live_bytes * 3:
+            lines.append(f'Heap: live set takes over a third of heap, GC runs too often - raise MAX_MEM to {heap_gb}G')
+        elif total.heap_total_bytes > live_bytes * 6 and heap_gb * 2 ** 30 < total.heap_total_bytes:
+            lines.append(f'Heap: live set is small, MAX_MEM of {heap_gb}G would be enough and makes pauses shorter')
+        else:
+            lines.append('Heap: size fits live set')
+
+        region_bytes = 2 ** max(20, min(25, math.ceil(math.log2(max(total.heap_total_bytes, 1) / 2048))))
+        if total.humongous and region_bytes <= (parser.get_region_bytes() or 0):
+            region_bytes = min(region_bytes * 2, 32 * 2 ** 20)
+        current = parser.get_region_bytes()
+        if current != region_bytes:
+            reason = f', {total.humongous} GCs were caused by humongous allocations' if total.humongous else ''
+            lines.append(f'Region: -XX:G1HeapRegionSize={region_bytes // 2 ** 20}M '
+                         f'(now {current // 2 ** 20 if current else "?"}M){reason}')
+        else:
+            lines.append('Region: size fits heap')
+
+        if p99_ms > max_pause_ms:
+            lines.append(f'MaxGCPauseMillis: p99 pause is above target of {max_pause_ms:.0f} ms, G1 does not keep '
+                         f'up - give it more heap rather than lower target')
+        elif p99_ms > GcAdvisor.TICK_MS:
+            lines.append(f'MaxGCPauseMillis: p99 pause is above a tick ({GcAdvisor.TICK_MS:.0f} ms), '
+                         f'-XX:MaxGCPauseMillis={max(int(GcAdvisor.TICK_MS), int(p50_ms * 2))} would cost fewer ticks')
+        elif p99_ms * 4 < max_pause_ms:
+            lines.append(f'MaxGCPauseMillis: pauses are far below target, '
+                         f'-XX:MaxGCPauseMillis={GcAdvisor.TICK_MS:.0f} keeps them within a tick')
+        else:
+            lines.append('MaxGCPauseMillis: target fits observed pauses')
+
+        return '\n'.join(lines)
+
+
+class GcLogTailer:
+    """Follows GC log as server writes it, parses new lines and stores rollups in DB
+
+    Notes:
+        JVM rotates the log by renaming it and starting a new file at the same path, which is detected by the file
+        getting smaller than the read position, or being replaced. Log, left from the previous run, is skipped, as it
+        was not written since tailer started
+
+    Attributes:
+        _path: ABS-path to GC log
+        _db_path: ABS-path to DB to store rollups in (empty - rollups are not stored)
+        _interval: Seconds between reads
+        _rollup_interval: Seconds between rollups
+        _parser: Parser of lines
+        _file: Opened log
+        _file_id: Device and inode of opened log
+        _started_at: Time of creation, older logs are ignored
+        _stop_event: Stops tailing
+        _thread: Tailing thread"""
+
+    def __init__(self,
+                 path: str,
+                 db_path: str,
+                 interval: float = 1,
+                 rollup_interval: float = 60):
+        """Init
+
+        Args:
+            path: ABS-path to GC log
+            db_path: ABS-path to DB to store rollups in (empty - rollups are not stored)
+            interval: Seconds between reads
+            rollup_interval: Seconds between rollups"""
+
+        self._path:            str                        = path
+        self._db_path:         str                        = db_path
+        self._interval:        float                      = interval
+        self._rollup_interval: float                      = rollup_interval
+        self._parser:          GcLogParser                = GcLogParser()
+        self._file:            Optional[BinaryIO]         = None
+        self._file_id:         Optional[tuple[int, int]]  = None
+        self._started_at:      float                      = time.time()
+        self._stop_event:      threading.Event            = threading.Event()
+        self._thread:          Optional[threading.Thread] = None
+
+    @staticmethod
+    def get_java_flag(path: str) -> str:
+        """Makes flag, that turns GC logging on
+
+        Args:
+            path: ABS-path to GC log
+        Returns:
+            Flag for java"""
+
+        # Path is quoted, as ':' separates parts of the flag and Windows paths have it
+        return f'-Xlog:gc*:file="{path}":uptime,level,tags:filecount=5,filesize=20M'
+
+    def get_parser(self) -> GcLogParser:
+        """Gets parser with aggregates
+
+        Returns:
+            Parser"""
+
+        return self._parser
+
+    def start(self) -> None:
+        """Starts tailing in background"""
+
+        self._thread = threading.Thread(target=self._tail_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Reads the rest of the log, stores the last rollup and closes the log"""
+
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=10)
+        self.read_new_lines()
+        self._store_rollup(self._parser.pop_window())
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def read_new_lines(self) -> None:
+        """Parses lines, written since the previous read"""
+
+        self._reopen_if_rotated()
+        if self._file is None:
+            return
+
+        while True:
+            position = self._file.tell()
+            line     = self._file.readline()
+            if not line:
+                break
+            if not line.endswith(b'\n'):
+                # Line is not written completely yet
+                self._file.seek(position)
+                break
+            self._parser.parse_line(line.decode('utf-8', errors='replace'))
+
+    def _reopen_if_rotated(self) -> None:
+        """Opens log, once it appears, and reopens it after rotation"""
+
+        try:
+            stat = os.stat(self._path)
+        except FileNotFoundError:
+            return
+        if stat.st_mtime < self._started_at:
+            return
+
+        file_id = (stat.st_dev, stat.st_ino)
+        if self._file is not None and file_id == self._file_id and stat.st_size >= self._file.tell():
+            return
+
+        if self._file is not None:
+            # The rest of the rotated file is lost, which is fine for statistics
+            self._file.close()
+        self._file    = open(self._path, 'rb')
+        self._file_id = file_id
+
+    def _tail_loop(self) -> None:
+        """Reads new lines and stores rollups till stopped"""
+
+        since_rollup = 0.0
+        while not self._stop_event.wait(self._interval):
+            try:
+                self.read_new_lines()
+                since_rollup += self._interval
+                if since_rollup >= self._rollup_interval:
+                    since_rollup = 0.0
+                    self._store_rollup(self._parser.pop_window())
+            except Exception as e:
+                logger.exception(e)
+
+    def _store_rollup(self,
+                      rollup: GcRollup) -> None:
+        """Stores rollup in DB
+
+        Args:
+            rollup: Aggregates of a window"""
+
+        count = rollup.pauses.get_count()
+        if not count or not self._db_path:
+            return
+
+        row = (
+            datetime.datetime.now().isoformat(),
+            count,
+            rollup.pause_seconds * 1000,
+            rollup.pauses.get_percentile(50) * 1000,
+            rollup.pauses.get_percentile(99) * 1000,
+            rollup.pauses.get_percentile(100) * 1000,
+            rollup.get_alloc_rate(),
+            sum(rollup.heap_after_bytes) // len(rollup.heap_after_bytes),
+            max(rollup.heap_after_bytes),
+            rollup.heap_total_bytes,
+        )
+        try:
+            with sqlite3.connect(self._db_path) as conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS gc_rollups (
+                        timestamp TEXT NOT NULL,
+                        pauses INTEGER NOT NULL,
+                        pause_ms_total REAL NOT NULL,
+                        pause_ms_p50 REAL NOT NULL,
+                        pause_ms_p99 REAL NOT NULL,
+                        pause_ms_max REAL NOT NULL,
+                        alloc_bytes_per_sec REAL NOT NULL,
+                        heap_after_bytes_avg INTEGER NOT NULL,
+                        heap_after_bytes_max INTEGER NOT NULL,
+                        heap_total_bytes INTEGER NOT NULL
+                    )
+                """)
+                conn.execute('INSERT INTO gc_rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', row)
+            conn.close()
+        except Exception as e:
+            logger.error('Was not able to save GC rollup')
+            logger.exception(e)
@@ -0,0 +1,326 @@
+import sys
+import time
+import sqlite3
+import datetime
+import threading
+
+import psutil
+
+from array import array
+from loguru import logger
+from typing import Optional
+from collections.abc import Callable
+
+from main_comm import MainComm
+from metrics.registry import METRICS
+
+
+CPU_PERCENT = METRICS.gauge('msm_jvm_cpu_percent', 'CPU of server process, 100 is a single core')
+RSS_BYTES   = METRICS.gauge('msm_jvm_rss_bytes', 'Resident memory of server process')
+THREADS     = METRICS.gauge('msm_jvm_threads', 'Threads of server process')
+STALLED     = METRICS.gauge('msm_jvm_stalled', '1, if server seems to be stalled right now')
+STALLS      = METRICS.counter('msm_jvm_stalls_total', 'Stalls of server, detected by JvmMonitor')
+
+
+class SamplesRing:
+    """Fixed-size ring of samples, kept in flat arrays of numbers, so it costs a few bytes per sample
+
+    Attributes:
+        _capacity: Max number of samples
+        _timestamps: POSIX-time of samples
+        _cpu: CPU percent of samples
+        _rss: RSS of samples, bytes
+        _threads: Number of threads of samples
+        _next: Index to write the next sample into
+        _size: Number of stored samples"""
+
+    def __init__(self,
+                 capacity: int):
+        """Init
+
+        Args:
+            capacity: Max number of samples"""
+
+        self._capacity:   int   = max(capacity, 1)
+        self._timestamps: array = array('d', [0.0]) * self._capacity
+        self._cpu:        array = array('d', [0.0]) * self._capacity
+        self._rss:        array = array('q', [0]) * self._capacity
+        self._threads:    array = array('l', [0]) * self._capacity
+        self._next:       int   = 0
+        self._size:       int   = 0
+
+    def __len__(self) -> int:
+        """Number of stored samples
+
+        Returns:
+            Number of stored samples"""
+
+        return self._size
+
+    def append(self,
+               timestamp: float,
+               cpu: float,
+               rss: int,
+               threads: int) -> None:
+        """Stores sample, replacing the oldest one, if ring is full
+
+        Args:
+            timestamp: POSIX-time of sample
+            cpu: CPU percent
+            rss: RSS, bytes
+            threads: Number of threads"""
+
+        index = self._next
+        self._timestamps[index] = timestamp
+        self._cpu[index]        = cpu
+        self._rss[index]        = rss
+        self._threads[index]    = threads
+
+        self._next = (index + 1) % self._capacity
+        self._size = min(self._size + 1, self._capacity)
+
+    def get_last(self,
+                 count: int) -> list[tuple[float, float, int, int]]:
+        """Gets the latest samples
+
+        Args:
+            count: Max number of samples
+        Returns:
+            Samples (timestamp, cpu, rss, threads), the oldest first"""
+
+        count  = min(count, self._size)
+        result = []
+        for offset in range(count, 0, -1):
+            index = (self._next - offset) % self._capacity
+            result.append((self._timestamps[index], self._cpu[index], self._rss[index], self._threads[index]))
+        return result
+
+
+class JvmMonitor:
+    """Samples CPU, memory and threads of server's process in background and detects stalls
+
+    Notes:
+        Stall is either silence in server's output for stall_seconds while process keeps CPU busy (stuck tick loop or
+        GC storm), or RSS above max_rss_bytes. RSS includes memory outside Java-heap, so it is an upper estimate of
+        heap usage. Stall is reported once per episode into MainComm, and is always visible in metrics
+
+    Attributes:
+        _pid: PID of started process (java itself or .bat, that starts java)
+        _main_comm: Communicator to report errors into
+        _get_last_output_at: Function, that returns time (monotonic) of the last line from server
+        _interval: Seconds between samples
+        _stall_seconds: Seconds of silence, which are suspicious
+        _stall_cpu_percent: CPU, above which silent server is stalled
+        _max_rss_bytes: RSS, above which server is about to run out of memory (0 - not checked)
+        _db_path: ABS-path to DB to store samples in
+        _db_batch: Samples are written into DB in batches of this size
+        _ring: The latest samples
+        _pending: Samples, not yet written into DB
+        _process: Process of java, once found
+        _stalled: If stall is going on right now
+        _stop_event: Stops sampling"""
+
+    def __init__(self,
+                 pid: int,
+                 main_comm: MainComm,
+                 get_last_output_at: Callable[[], float],
+                 interval: float,
+                 ring_size: int,
+                 stall_seconds: float,
+                 stall_cpu_percent: float,
+                 max_rss_bytes: int,
+                 db_path: str,
+                 db_batch: int):
+        """Init
+
+        Args:
+            pid: PID of started process (java itself or .bat, that starts java)
+            main_comm: Communicator to report errors into
+            get_last_output_at: Function, that returns time (monotonic) of the last line from server
+            interval: Seconds between samples
+            ring_size: Number of samples to keep in memory
+            stall_seconds: Seconds of silence, which are suspicious
+            stall_cpu_percent: CPU, above which silent server is stalled (100 is a single core)
+            max_rss_bytes: RSS, above which server is about to run out of memory (0 - not checked)
+            db_path: ABS-path to DB to store samples in (empty - samples are kept in memory only)
+            db_batch: Samples are written into DB in batches of this size"""
+
+        self._pid:                int                                = pid
+        self._main_comm:          MainComm                           = main_comm
+        self._get_last_output_at: Callable[[], float]                = get_last_output_at
+        self._interval:           float                              = interval
+        self._stall_seconds:      float                              = stall_seconds
+        self._stall_cpu_percent:  float                              = stall_cpu_percent
+        self._max_rss_bytes:      int                                = max_rss_bytes
+        self._db_path:            str                                = db_path
+        self._db_batch:           int                                = max(db_batch, 1)
+        self._ring:               SamplesRing                        = SamplesRing(ring_size)
+        self._pending:            list[tuple[str, float, int, int]]  = []
+        self._process:            Optional[psutil.Process]           = None
+        self._stalled:            bool                               = False
+        self._stop_event:         threading.Event                    = threading.Event()
+
+    @staticmethod
+    def raise_priority(pid: int) -> None:
+        """Raises priority of server's process: high priority class on Windows, nice -5 elsewhere
+
+        Args:
+            pid: PID of the process"""
+
+        try:
+            process = psutil.Process(pid)
+            if sys.platform == 'win32':
+                process.nice(psutil.HIGH_PRIORITY_CLASS)
+            else:
+                process.nice(-5)
+        except psutil.AccessDenied:
+            logger.warning('Not enough rights to raise priority of server process, running with default one')
+        except Exception as e:
+            logger.exception(e)
+
+    def start(self) -> None:
+        """Starts sampling in background"""
+
+        threading.Thread(target=self._sample_loop, daemon=True).start()
+
+    def stop(self) -> None:
+        """Stops sampling and writes pending samples into DB"""
+
+        self._stop_event.set()
+        self._write_pending()
+        STALLED.set(0)
+
+    def get_samples(self,
+                    count: int) -> list[tuple[float, float, int, int]]:
+        """Gets the latest samples
+
+        Args:
+            count: Max number of samples
+        Returns:
+            Samples (timestamp, cpu, rss, threads), the oldest first"""
+
+        return self._ring.get_last(count)
+
+    def is_stalled(self) -> bool:
+        """Checks if stall is going on
+
+        Returns:
+            True, if server seems to be stalled right now"""
+
+        return self._stalled
+
+    def sample(self) -> None:
+        """Takes a single sample and checks it for stall"""
+
+        process = self._find_java()
+        if process is None:
+            return
+
+        try:
+            with process.oneshot():
+                cpu     = process.cpu_percent(None)
+                rss     = process.memory_info().rss
+                threads = process.num_threads()
+        except psutil.NoSuchProcess:
+            self._process = None
+            return
+
+        now = time.time()
+        self._ring.append(now, cpu, rss, threads)
+        self._pending.append((datetime.datetime.fromtimestamp(now).isoformat(), cpu, rss, threads))
+        if len(self._pending) >= self._db_batch:
+            self._write_pending()
+
+        CPU_PERCENT.set(cpu)
+        RSS_BYTES.set(rss)
+        THREADS.set(threads)
+        self._check_stall(cpu, rss)
+
+    def _sample_loop(self) -> None:
+        """Samples till stopped"""
+
+        while not self._stop_event.wait(self._interval):
+            try:
+                self.sample()
+            except Exception as e:
+                logger.exception(e)
+
+    def _check_stall(self,
+                     cpu: float,
+                     rss: int) -> None:
+        """Detects beginning and end of stall
+
+        Args:
+            cpu: CPU percent of the sample
+            rss: RSS of the sample"""
+
+        silence = time.monotonic() - self._get_last_output_at()
+        reason  = ''
+        if silence >= self._stall_seconds and cpu >= self._stall_cpu_percent:
+            reason = f'No output from server for {silence:.0f}s with CPU at {cpu:.0f}%'
+        elif self._max_rss_bytes and rss >= self._max_rss_bytes:
+            reason = f'Server uses {rss / 2 ** 30:.1f}G of memory, heap is about to run out'
+
+        if reason and not self._stalled:
+            logger.error(f'Server seems to be stalled: {reason}')
+            self._main_comm.set_error(f'Server seems to be stalled: {reason}')
+            STALLS.inc()
+        elif not reason and self._stalled:
+            logger.info('Server is not stalled anymore')
+
+        self._stalled = bool(reason)
+        STALLED.set(1 if reason else 0)
+
+    def _find_java(self) -> Optional[psutil.Process]:
+        """Finds process of java: started process itself or its child (when started through .bat)
+
+        Notes:
+            Until java is started by the launcher, the launcher itself is sampled, and java is searched again on the
+            next sample
+        Returns:
+            Process or None, if process is gone"""
+
+        if self._process is not None:
+            return self._process
+
+        try:
+            started = psutil.Process(self._pid)
+            candidates = [started] + started.children(recursive=True)
+        except psutil.NoSuchProcess:
+            return None
+
+        for candidate in candidates:
+            try:
+                if 'java' in candidate.name().lower():
+                    self._process = candidate
+                    # The first call of cpu_percent only starts measuring
+                    self._process.cpu_percent(None)
+                    return self._process
+            except psutil.Error:
+                continue
+        return started
+
+    def _write_pending(self) -> None:
+        """Writes pending samples into DB"""
+
+        if not self._pending or not self._db_path:
+            self._pending = []
+            return
+
+        pending, self._pending = self._pending, []
+        try:
+            with sqlite3.connect(self._db_path) as conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS jvm_samples (
+                        timestamp TEXT NOT NULL,
+                        cpu REAL NOT NULL,
+                        rss INTEGER NOT NULL,
+                        threads INTEGER NOT NULL
+                    )
+                """)
+                conn.executemany('INSERT INTO jvm_samples (timestamp, cpu, rss, threads) VALUES (?, ?, ?, ?)',
+                                 pending)
+            conn.close()
+        except Exception as e:
+            logger.error('Was not able to save samples of server process')
+            logger.exception(e)
@@ -0,0 +1,203 @@
+import os
+import re
+import time
+import sqlite3
+import datetime
+import threading
+
+from loguru import logger
+from typing import Optional
+
+from metrics.registry import METRICS
+
+
+STARTUP_SECONDS = METRICS.histogram('msm_server_startup_seconds', 'Time from start of server to "Done" in its logs')
+
+
+class CdsArchive:
+    """AppCDS archive of server's classes: JVM maps classes from it instead of loading and verifying them on each start
+
+    Notes:
+        There is no archive on the first run, so java is started with -XX:ArchiveClassesAtExit and dumps classes,
+        loaded during the run, once it stops (on backup restart). Next starts use it with -XX:SharedArchiveFile. Once
+        server's jar is updated, archive is outdated and is recreated the same way. Needs Java 13+, JVM silently runs
+        without archive, if it does not fit (e.g. after Java update), which is fixed by deleting the archive
+
+    Attributes:
+        _path: ABS-path to archive
+        _jar_path: ABS-path to server's jar"""
+
+    def __init__(self,
+                 path: str,
+                 jar_path: str):
+        """Init
+
+        Args:
+            path: ABS-path to archive
+            jar_path: ABS-path to server's jar"""
+
+        self._path:     str = path
+        self._jar_path: str = jar_path
+
+    def is_usable(self) -> bool:
+        """Checks if archive exists and was made after the current jar
+
+        Returns:
+            True, if archive can be used"""
+
+        try:
+            return os.path.getsize(self._path) > 0 and os.path.getmtime(self._path) >= os.path.getmtime(self._jar_path)
+        except OSError:
+            return False
+
+    def get_java_flags(self) -> list[str]:
+        """Makes flags to use archive, or to dump it, if it is missing or outdated
+
+        Returns:
+            Flags for java"""
+
+        if self.is_usable():
+            logger.info(f'Starting server with class-data archive {self._path}')
+            return [f'-XX:SharedArchiveFile={self._path}']
+
+        logger.info(f'Class-data archive will be written to {self._path} once server stops')
+        try:
+            os.remove(self._path)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.exception(e)
+        return [f'-XX:ArchiveClassesAtExit={self._path}']
+
+
+class StartupTracker:
+    """Detects, when server is ready to accept players, and records how long it took
+
+    Notes:
+        Server is ready, once it prints 'Done (12.345s)! For help, type "help"'. Startups are recorded with usage of
+        class-data archive, to compare starts with and without it
+
+    Attributes:
+        _ready_event: Set, once server is ready
+        _db_path: ABS-path to DB to record startups in (empty - not recorded)
+        _with_cds: If server was started with class-data archive
+        _started_at: Time (monotonic), when server was started
+        _startup_seconds: Seconds from start to readiness, once ready"""
+
+    DONE_PATTERN: re.Pattern = re.compile(r'Done \((\d+[.,]\d+)s\)!')
+    """Number is time of server's own startup, without JVM's one"""
+
+    def __init__(self,
+                 ready_event: threading.Event,
+                 db_path: str,
+                 with_cds: bool):
+        """Init
+
+        Args:
+            ready_event: Set, once server is ready
+            db_path: ABS-path to DB to record startups in (empty - not recorded)
+            with_cds: If server was started with class-data archive"""
+
+        self._ready_event:     threading.Event = ready_event
+        self._db_path:         str             = db_path
+        self._with_cds:        bool            = with_cds
+        self._started_at:      float           = time.monotonic()
+        self._startup_seconds: Optional[float] = None
+
+    def get_startup_seconds(self) -> Optional[float]:
+        """Gets time of startup
+
+        Returns:
+            Seconds from start to readiness or None, if server is not ready yet"""
+
+        return self._startup_seconds
+
+    def check_line(self,
+                   line: str) -> None:
+        """Checks line of server's output for readiness
+
+        Args:
+            line: Line from server's output"""
+
+        if self._startup_seconds is not None or 'Done (' not in line:
+            return
+
+        match = self.DONE_PATTERN.search(line)
+        if not match:
+            return
+
+        self._startup_seconds = time.monotonic() - self._started_at
+        server_seconds        = float(match.group(1).replace(',', '.'))
+        self._ready_event.set()
+        STARTUP_SECONDS.observe(self._startup_seconds)
+
+        previous = self.get_average_seconds(with_cds=not self._with_cds)
+        compared = f', {previous:.1f}s on average {"without" if self._with_cds else "with"} archive' if previous else ''
+        logger.info(f'Server is ready in {self._startup_seconds:.1f}s (server itself took {server_seconds:.1f}s, '
+                    f'class-data archive {"used" if self._with_cds else "not used"}{compared})')
+        self._record(server_seconds)
+
+    def get_average_seconds(self,
+                            with_cds: bool,
+                            last: int = 10) -> Optional[float]:
+        """Gets average time of the latest recorded startups
+
+        Args:
+            with_cds: If startups with class-data archive should be taken, or without
+            last: Number of the latest startups to take
+        Returns:
+            Average seconds or None, if there were no such startups"""
+
+        if not self._db_path:
+            return None
+
+        try:
+            with sqlite3.connect(self._db_path) as conn:
+                self._create_table(conn)
+                row = conn.execute(
+                    'SELECT AVG(seconds) FROM '
+                    '(SELECT seconds FROM server_startups WHERE with_cds = ? ORDER BY timestamp DESC LIMIT ?)',
+                    (int(with_cds), last)
+                ).fetchone()
+            conn.close()
+            return row[0]
+        except Exception as e:
+            logger.exception(e)
+            return None
+
+    def _record(self,
+                server_seconds: float) -> None:
+        """Records startup in DB
+
+        Args:
+            server_seconds: Time of startup, reported by server itself"""
+
+        if not self._db_path:
+            return
+
+        try:
+            with sqlite3.connect(self._db_path) as conn:
+                self._create_table(conn)
+                conn.execute('INSERT INTO server_startups VALUES (?, ?, ?, ?)',
+                             (datetime.datetime.now().isoformat(), self._startup_seconds, server_seconds,
+                              int(self._with_cds)))
+            conn.close()
+        except Exception as e:
+            logger.error('Was not able to record server startup')
+            logger.exception(e)
+
+    @staticmethod
+    def _create_table(conn: sqlite3.Connection) -> None:
+        """Creates table for startups, if there is none
+
+        Args:
+            conn: Connection to DB"""
+
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS server_startups (
+                timestamp TEXT NOT NULL,
+                seconds REAL NOT NULL,
+                server_seconds REAL NOT NULL,
+                with_cds INTEGER NOT NULL
+            )
+        """)
@@ -0,0 +1,194 @@
+import os
+import time
+import datetime
+import threading
+import subprocess
+
+from loguru import logger
+from collections import deque
+from typing import Optional
+
+from main_comm import MainComm
+from metrics.registry import METRICS
+
+
+CRASHES = METRICS.counter('msm_server_crashes_total', 'Unexpected exits of server process')
+
+
+class ServerSupervisor:
+    """Watches server's process and decides, when to restart it, if it exits unexpectedly
+
+    Notes:
+        Watcher thread waits for the process (Popen.wait) and raises the flag, unless exit was expected (manager
+        stopped server itself). Restarts are delayed with exponential backoff by crashes within crash_loop_window
+        seconds, and once there are crash_loop_count of them, server is crashing in a loop, which a restart will not
+        fix, so it is left stopped. Every crash is written into a report with the latest lines of server's output.
+        Exit with code 0 after 'Stopping server' line is a stop with command (ex: /stop of an op), not a crash.
+
+    Attributes:
+        _main_comm: Communicator to report crashes into
+        _reports_dir: ABS-path to folder for crash reports
+        _backoff: Delay before the first restart, seconds, doubled with every next crash
+        _max_backoff: Max delay before restart, seconds
+        _crash_loop_window: Seconds, within which crashes are counted
+        _crash_loop_count: Crashes within window to stop restarting
+        _crashes: Times (monotonic) of the latest crashes
+        _proc: Process being watched
+        _started_at: Time (monotonic), when watched process was started
+        _exit_code: Exit code of crashed process
+        _expected: If manager is stopping server itself
+        _stopping: If server printed, that it is stopping
+        _crashed: Set, once watched process exits unexpectedly"""
+
+    STOPPING_LINE: str = 'Stopping server'
+    """Printed by server, once it starts stopping after /stop"""
+
+    def __init__(self,
+                 main_comm: MainComm,
+                 reports_dir: str,
+                 backoff: float,
+                 max_backoff: float,
+                 crash_loop_window: float,
+                 crash_loop_count: int):
+        """Init
+
+        Args:
+            main_comm: Communicator to report crashes into
+            reports_dir: ABS-path to folder for crash reports
+            backoff: Delay before the first restart, seconds, doubled with every next crash
+            max_backoff: Max delay before restart, seconds
+            crash_loop_window: Seconds, within which crashes are counted
+            crash_loop_count: Crashes within window to stop restarting"""
+
+        self._main_comm:         MainComm                   = main_comm
+        self._reports_dir:       str                        = reports_dir
+        self._backoff:           float                      = backoff
+        self._max_backoff:       float                      = max_backoff
+        self._crash_loop_window: float                      = crash_loop_window
+        self._crash_loop_count:  int                        = crash_loop_count
+        self._crashes:           deque[float]               = deque()
+        self._proc:              Optional[subprocess.Popen] = None
+        self._started_at:        float                      = time.monotonic()
+        self._exit_code:         Optional[int]              = None
+        self._expected:          bool                       = False
+        self._stopping:          bool                       = False
+        self._crashed:           threading.Event            = threading.Event()
+
+    def watch(self,
+              proc: subprocess.Popen) -> None:
+        """Starts watching newly started process
+
+        Args:
+            proc: Server's process"""
+
+        self._proc       = proc
+        self._started_at = time.monotonic()
+        self._exit_code  = None
+        self._expected   = False
+        self._stopping   = False
+        self._crashed.clear()
+        threading.Thread(target=self._wait, args=(proc,), daemon=True).start()
+
+    def expect_exit(self) -> None:
+        """Marks the upcoming exit of server as intended"""
+
+        self._expected = True
+
+    def check_line(self,
+                   line: str) -> None:
+        """Checks line of server's output for server stopping by itself
+
+        Args:
+            line: Line from server's output"""
+
+        if self.STOPPING_LINE in line:
+            self._stopping = True
+
+    def has_crashed(self) -> bool:
+        """Checks if server exited unexpectedly
+
+        Returns:
+            True, if server has crashed"""
+
+        return self._crashed.is_set()
+
+    def handle_crash(self,
+                     recent_output: list[str]) -> Optional[float]:
+        """Writes crash report and decides, when to restart server
+
+        Args:
+            recent_output: The latest lines of server's output
+        Returns:
+            Seconds to wait before restart, or None, if server is crashing in a loop and should stay stopped"""
+
+        self._crashed.clear()
+        now = time.monotonic()
+        self._crashes.append(now)
+        while self._crashes and now - self._crashes[0] > self._crash_loop_window:
+            self._crashes.popleft()
+
+        crashes     = len(self._crashes)
+        report_path = self._write_report(recent_output)
+        if crashes >= self._crash_loop_count:
+            error = (f'Server crashed {crashes} times in {self._crash_loop_window / 60:.0f} minutes, '
+                     f'it will not be restarted. Report: {report_path}')
+            logger.error(error)
+            self._main_comm.set_error(error)
+            return None
+
+        delay = min(self._backoff * 2 ** (crashes - 1), self._max_backoff)
+        error = f'Server crashed with code {self._exit_code}, restarting in {delay:.0f}s. Report: {report_path}'
+        logger.error(error)
+        self._main_comm.set_error(error)
+        return delay
+
+    def _wait(self,
+              proc: subprocess.Popen) -> None:
+        """Waits for process to exit and raises crash-flag, unless exit was expected
+
+        Args:
+            proc: Server's process"""
+
+        try:
+            exit_code = proc.wait()
+        except Exception as e:
+            logger.exception(e)
+            return
+
+        if proc is not self._proc or self._expected:
+            return
+
+        if exit_code == 0 and self._stopping:
+            logger.info('Server was stopped with command, it will not be restarted')
+            return
+
+        self._exit_code = exit_code
+        CRASHES.inc()
+        logger.error(f'Server exited unexpectedly with code {exit_code}')
+        self._crashed.set()
+
+    def _write_report(self,
+                      recent_output: list[str]) -> str:
+        """Writes crash report
+
+        Args:
+            recent_output: The latest lines of server's output
+        Returns:
+            ABS-path to report"""
+
+        now  = datetime.datetime.now()
+        path = os.path.join(self._reports_dir, f'crash_{now.strftime("%Y-%m-%d_%H-%M-%S")}.txt')
+        try:
+            os.makedirs(self._reports_dir, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write(f'Time: {now}\n'
+                           f'Exit code: {self._exit_code}\n'
+                           f'Uptime: {time.monotonic() - self._started_at:.0f}s\n'
+                           f'Crashes in the last {self._crash_loop_window / 60:.0f} minutes: {len(self._crashes)}\n'
+                           f'\nThe latest {len(recent_output)} lines of output:\n')
+                file.write('\n'.join(recent_output))
+                file.write('\n')
+        except Exception as e:
+            logger.error('Was not able to write crash report')
+            logger.exception(e)
+        return path
@@ -0,0 +1,211 @@
+import re
+import time
+import threading
+
+from loguru import logger
+from collections import deque
+from typing import TYPE_CHECKING, Optional
+
+from metrics.registry import METRICS
+
+if TYPE_CHECKING:
+    from server_communicator.communicator import ServerCommunicator
+
+
+TPS          = METRICS.gauge('msm_server_tps', 'Ticks per second of server, 20 is normal')
+MSPT         = METRICS.gauge('msm_server_mspt', 'Milliseconds per tick of server, above 50 is lag')
+TICKS_BEHIND = METRICS.counter('msm_server_ticks_behind_total', 'Ticks, skipped by server (Can\'t keep up!)')
+
+
+class TpsTracker:
+    """Tracks how fast server ticks: periodically asks server for TPS and MSPT and parses its answers and warnings
+
+    Notes:
+        Paper answers 'tps' with 'TPS from last 1m, 5m, 15m: 20.0, 20.0, 20.0' and 'mspt' with a header and a line of
+        avg/min/max triples. Vanilla (1.20.3+) answers 'tick query' with 'Average time per tick: 1.2ms'. 'Can't keep
+        up!' warning is printed by every server, once it skips ticks, without asking.
+
+        Once TPS stays below low_tps for low_tps_probes answers in a row, AntiBot (if running) is switched into
+        aggressive mode, as lag is what bot floods cause. After that TPS has to recover above low_tps, before the mode
+        can be turned on again, so a server, that is just slow, does not keep it on forever.
+
+        check_line() is called for every line of server's output, so it checks cheap substrings before any regex.
+
+    Attributes:
+        _server_comm: Communicator to send probes into and get AntiBot from
+        _commands: Commands to probe server with
+        _interval: Seconds between probes
+        _low_tps: TPS, below which server is lagging
+        _low_tps_probes: Number of lagging answers in a row to turn aggressive mode on (0 - never)
+        _series: The latest answers (monotonic time, TPS, MSPT), MSPT or TPS is None, if answer did not have it
+        _lagging_in_row: Number of the latest answers in a row, below low_tps
+        _armed: If aggressive mode may be turned on (TPS recovered since it was turned on the last time)
+        _awaiting_mspt: If the previous line was header of Paper's MSPT answer
+        _behind_at: Time (monotonic) of the latest 'Can't keep up!' warning
+        _stop_event: Stops probing"""
+
+    TPS_PATTERN: re.Pattern = re.compile(r'TPS from last 1m, 5m, 15m: \*?(\d+(?:\.\d+)?)')
+    """First number is TPS over the last minute, '*' is added by Paper, when TPS is above 20"""
+
+    MSPT_HEADER: str = 'Server tick times'
+    """Paper prints MSPT numbers on the line after this one"""
+
+    MSPT_PATTERN: re.Pattern = re.compile(r'(\d+(?:\.\d+)?)/\d+(?:\.\d+)?/\d+(?:\.\d+)?')
+    """First avg/min/max triple is MSPT over the last 5 seconds"""
+
+    VANILLA_MSPT_PATTERN: re.Pattern = re.compile(r'Average time per tick: (\d+(?:\.\d+)?)ms')
+
+    CANT_KEEP_UP_PATTERN: re.Pattern = re.compile(r"Can't keep up!.*?(\d+)ms or (\d+) ticks behind")
+
+    COLOR_PATTERN: re.Pattern = re.compile(r'§.')
+    """Paper may color numbers in its answers"""
+
+    def __init__(self,
+                 server_comm: 'ServerCommunicator',
+                 commands: list[str],
+                 interval: float,
+                 low_tps: float,
+                 low_tps_probes: int,
+                 series_size: int):
+        """Init
+
+        Args:
+            server_comm: Communicator to send probes into and get AntiBot from
+            commands: Commands to probe server with
+            interval: Seconds between probes
+            low_tps: TPS, below which server is lagging
+            low_tps_probes: Number of lagging answers in a row to turn aggressive mode on (0 - never)
+            series_size: Number of the latest answers to keep"""
+
+        self._server_comm:    'ServerCommunicator' = server_comm
+        self._commands:       list[str]            = commands
+        self._interval:       float                = interval
+        self._low_tps:        float                = low_tps
+        self._low_tps_probes: int                  = low_tps_probes
+        self._lagging_in_row: int                  = 0
+        self._armed:          bool                 = True
+        self._awaiting_mspt:  bool                 = False
+        self._behind_at:      Optional[float]      = None
+        self._stop_event:     threading.Event      = threading.Event()
+
+        self._series: deque[tuple[float, Optional[float], Optional[float]]] = deque(maxlen=series_size)
+
+    def start(self) -> None:
+        """Starts probing in background"""
+
+        threading.Thread(target=self._probe_loop, daemon=True).start()
+
+    def stop(self) -> None:
+        """Stops probing"""
+
+        self._stop_event.set()
+
+    def get_series(self) -> list[tuple[float, Optional[float], Optional[float]]]:
+        """Gets the latest answers
+
+        Returns:
+            Answers (monotonic time, TPS, MSPT), the oldest first"""
+
+        return list(self._series)
+
+    def get_tps(self) -> Optional[float]:
+        """Gets the latest known TPS
+
+        Returns:
+            TPS or None, if server did not tell it yet"""
+
+        for _, tps, _ in reversed(self._series):
+            if tps is not None:
+                return tps
+        return None
+
+    def is_lagging(self) -> bool:
+        """Checks if server lags: the latest TPS is low, or server skipped ticks since the previous probe
+
+        Returns:
+            True, if server lags"""
+
+        tps = self.get_tps()
+        if tps is not None and tps < self._low_tps:
+            return True
+        return self._behind_at is not None and time.monotonic() - self._behind_at < self._interval
+
+    def check_line(self,
+                   line: str) -> None:
+        """Checks line of server's output for answers to probes and lag warnings
+
+        Args:
+            line: Line from server's output"""
+
+        if self._awaiting_mspt:
+            self._awaiting_mspt = False
+            match = self.MSPT_PATTERN.search(self.COLOR_PATTERN.sub('', line))
+            if match:
+                self._record(mspt=float(match.group(1)))
+                return
+
+        if 'TPS from last' in line:
+            match = self.TPS_PATTERN.search(self.COLOR_PATTERN.sub('', line))
+            if match:
+                self._record(tps=float(match.group(1)))
+
+        elif self.MSPT_HEADER in line:
+            self._awaiting_mspt = True
+
+        elif 'Average time per tick' in line:
+            match = self.VANILLA_MSPT_PATTERN.search(line)
+            if match:
+                # Vanilla tells only MSPT, and server can't tick faster than 20 per second
+                mspt = float(match.group(1))
+                self._record(tps=min(20.0, 1000 / mspt) if mspt else 20.0, mspt=mspt)
+
+        elif "Can't keep up!" in line:
+            match = self.CANT_KEEP_UP_PATTERN.search(line)
+            if match:
+                self._behind_at = time.monotonic()
+                TICKS_BEHIND.inc(int(match.group(2)))
+                logger.warning(f'Server is lagging, {match.group(2)} ticks behind')
+
+    def _record(self,
+                tps: Optional[float] = None,
+                mspt: Optional[float] = None) -> None:
+        """Stores answer and switches AntiBot into aggressive mode, if server lags long enough
+
+        Args:
+            tps: TPS from answer
+            mspt: MSPT from answer"""
+
+        self._series.append((time.monotonic(), tps, mspt))
+        if mspt is not None:
+            MSPT.set(mspt)
+        if tps is None:
+            return
+
+        TPS.set(tps)
+        if tps >= self._low_tps:
+            self._lagging_in_row = 0
+            self._armed          = True
+            return
+
+        self._lagging_in_row += 1
+        logger.warning(f'Server is lagging, TPS is {tps}')
+        if not self._low_tps_probes or not self._armed or self._lagging_in_row < self._low_tps_probes:
+            return
+
+        antibot = self._server_comm.antibot
+        if antibot and not antibot.is_aggressive():
+            logger.warning(f'TPS was below {self._low_tps} {self._lagging_in_row} times in a row, '
+                           f'turning aggressive mode on')
+            antibot.become_aggressive()
+            self._lagging_in_row = 0
+            self._armed          = False
+
+    def _probe_loop(self) -> None:
+        """Sends probes till stopped"""
+
+        while not self._stop_event.wait(self._interval):
+            for command in self._commands:
+                try:
+                    self._server_comm.send_to_server(f'{command}\n')
+                except Exception as e:
+                    logger.exception(e)
@@ -8,14 +8,27 @@ from datetime import datetime
 
 from settings import settings
 from main_comm import MainComm
+from metrics.registry import METRICS
 from anti_bot.anti_bot import AntiBot
 from file_transfer.backuper import FileBackuper
 from file_transfer.sender import HttpFileSender
 from file_transfer.cleaner import BackupsCleaner
+from file_transfer.throttle import BackupThrottle
 from initializer.logo_printer import LogoPrinter
 from notifications.notificator import Notificator
 from server_communicator.communicator import ServerCommunicator
 from toxicity_manager.manager import ToxicityManager
+from server_health.jvm_monitor import JvmMonitor
+from server_health.tps_tracker import TpsTracker
+from server_health.gc_log import GcLogTailer, GcAdvisor
+from server_health.supervisor import ServerSupervisor
+from server_health.startup import CdsArchive, StartupTracker
+
+
+BACKUP_SECONDS = {
+    stage: METRICS.histogram('msm_backup_seconds', 'Durations of stages of world backup', stage=stage)
+    for stage in ('copy', 'zip', 'send')
+}
 
 
 class MinecraftServerManager:
@@ -28,12 +41,23 @@ class MinecraftServerManager:
         Args:
             main_comm: Instance of thread-communicator"""
 
-        self.notificator:  Notificator               = Notificator()
-        self.main_comm:    MainComm                  = main_comm
-        self._server_proc: subprocess.Popen | None   = None
-        self._running:     bool                      = False
-        self._server_comm: ServerCommunicator | None = None
-        self._anti_bot:    AntiBot | None            = None
+        self.notificator:   Notificator               = Notificator()
+        self.main_comm:     MainComm                  = main_comm
+        self._server_proc:  subprocess.Popen | None   = None
+        self._running:      bool                      = False
+        self._server_comm:  ServerCommunicator | None = None
+        self._anti_bot:     AntiBot | None            = None
+        self._jvm_monitor:  JvmMonitor | None         = None
+        self._gc_log:       GcLogTailer | None        = None
+        self._server_ready: threading.Event           = threading.Event()
+        self._supervisor:   ServerSupervisor          = ServerSupervisor(
+            main_comm,
+            reports_dir=settings.health.CRASH_REPORTS_DIR,
+            backoff=settings.health.RESTART_BACKOFF_SEC,
+            max_backoff=settings.health.RESTART_MAX_BACKOFF_SEC,
+            crash_loop_window=settings.health.CRASH_LOOP_WINDOW_SEC,
+            crash_loop_count=settings.health.CRASH_LOOP_COUNT
+        )
 
     def run(self) -> None:
         """Main loop"""
@@ -41,7 +65,13 @@ class MinecraftServerManager:
         self._running = True
         self._start_server()
 
+        # Woken up at once on these, otherwise AntiBot is run every 2 seconds
+        events = self.main_comm.subscribe(MainComm.STOP_SERVER, MainComm.BACKUP_REQUESTED)
         while self._running and not self.main_comm.stop_server:
+            if settings.health.RESTART_ON_CRASH and self._supervisor.has_crashed():
+                self._recover_from_crash()
+                continue
+
             if self._check_backup_triggers():
                 self._backup_world()
                 self._restart_server()
@@ -49,7 +79,7 @@ class MinecraftServerManager:
 
             if self._anti_bot:
                 self._anti_bot.check_players()
-            time.sleep(2)
+            events.wait(timeout=2)
         self._stop()
 
     def _check_backup_triggers(self) -> bool:
@@ -86,7 +116,8 @@ class MinecraftServerManager:
             self._stop_server()
 
             backuper = FileBackuper()
-            backuper.copy_backups_to_temp_folder(settings.paths.TO_BACKUP)
+            with BACKUP_SECONDS['copy'].time():
+                backuper.copy_backups_to_temp_folder(settings.paths.TO_BACKUP)
             logger.info("Main backup sequence completed")
             threading.Thread(target=self._zip_and_send_world, args=(backuper,)).start()
         except Exception as e:
@@ -137,6 +168,24 @@ class MinecraftServerManager:
             "bufsize": 0,          # Line buffered: Much faster than 0
         }
 
+        gc_flags = []
+        if settings.health.GC_LOG_ON and not settings.paths.START_BAT:
+            self._gc_log = GcLogTailer(settings.health.GC_LOG_FILE,
+                                       db_path=settings.paths.DB,
+                                       rollup_interval=settings.health.GC_ROLLUP_SEC)
+            gc_flags = [GcLogTailer.get_java_flag(settings.health.GC_LOG_FILE)]
+
+        cds_flags = []
+        with_cds  = False
+        if settings.health.CDS_ON and not settings.paths.START_BAT:
+            archive_path = settings.health.CDS_ARCHIVE or f'{os.path.splitext(settings.paths.SERVER_JAR)[0]}.jsa'
+            archive      = CdsArchive(archive_path, settings.paths.SERVER_JAR)
+            with_cds     = archive.is_usable()
+            cds_flags    = archive.get_java_flags()
+
+        # Created before server, so startup is measured from its very start
+        startup_tracker = StartupTracker(self._server_ready, settings.paths.DB, with_cds)
+
         if settings.paths.START_BAT:
             logger.info("Starting server via .bat file...")
             self._server_proc = subprocess.Popen([settings.paths.START_BAT], **common_params)
@@ -146,6 +195,8 @@ class MinecraftServerManager:
                     "java",
                     *encoding_flags,
                     *(aikar_flags if settings.LOW_CPU else []),
+                    *gc_flags,
+                    *cds_flags,
                     f"-Xms{settings.MIN_MEM}G",
                     f"-Xmx{settings.MAX_MEM}G",
                     "-jar", f"{settings.paths.SERVER_JAR}",
@@ -154,13 +205,31 @@ class MinecraftServerManager:
                 **common_params
             )
 
-        import psutil
-        p = psutil.Process(self._server_proc.pid)
-        p.nice(psutil.HIGH_PRIORITY_CLASS)
+        self._supervisor.watch(self._server_proc)
+        JvmMonitor.raise_priority(self._server_proc.pid)
+        if self._gc_log:
+            self._gc_log.start()
 
-        self._server_comm = ServerCommunicator(self._server_proc)
+        self._server_comm = ServerCommunicator(self._server_proc, notificator=self.notificator)
+        self._server_comm.startup_tracker = startup_tracker
+        self._server_comm.supervisor      = self._supervisor
         self._server_comm.start_communication()
 
+        if settings.health.ON:
+            self._jvm_monitor = JvmMonitor(
+                self._server_proc.pid,
+                self.main_comm,
+                lambda: self._server_comm.last_output_at,
+                interval=settings.health.SAMPLE_SEC,
+                ring_size=settings.health.RING_SIZE,
+                stall_seconds=settings.health.STALL_SEC,
+                stall_cpu_percent=settings.health.STALL_CPU_PERCENT,
+                max_rss_bytes=self._get_max_rss_bytes(),
+                db_path=settings.paths.DB,
+                db_batch=settings.health.DB_BATCH
+            )
+            self._jvm_monitor.start()
+
         if settings.antibot.ON:
             logger.info('Antibot started')
             self._anti_bot = AntiBot(self._server_comm)
@@ -172,10 +241,20 @@ class MinecraftServerManager:
             toxicity = ToxicityManager(self._server_comm)
             self._server_comm.toxicity = toxicity
 
+        if settings.health.TPS_ON:
+            tps_tracker = TpsTracker(self._server_comm,
+                                     commands=settings.health.TPS_COMMANDS,
+                                     interval=settings.health.TPS_PROBE_SEC,
+                                     low_tps=settings.health.LOW_TPS,
+                                     low_tps_probes=settings.health.LOW_TPS_PROBES,
+                                     series_size=settings.health.TPS_SERIES_SIZE)
+            self._server_comm.tps_tracker = tps_tracker
+            tps_tracker.start()
+
         logger.info("Server started")
 
     def _restart_server(self) -> None:
-        """Restarts server after backing up world"""
+        """Restarts server after backing up world or crash"""
 
         try:
             self._start_server()
@@ -186,16 +265,48 @@ class MinecraftServerManager:
             time.sleep(10)
             quit()
 
-    def _stop_server(self) -> None:
-        """Gracefully stop the server"""
+    def _recover_from_crash(self) -> None:
+        """Cleans up after crashed server and starts it again after backoff, unless it is crashing in a loop"""
 
-        try:
+        delay = self._supervisor.handle_crash(self._server_comm.get_recent_output() if self._server_comm else [])
+        self._stop_server(crashed=True)
+        if delay is None:
+            self._running = False
+            return
+
+        if self.main_comm.wait(MainComm.STOP_SERVER, timeout=delay):
+            return
+
+        logger.info('Restarting server after crash...')
+        self._restart_server()
+        if self._anti_bot:
+            # Server keeps bans in its own files, while manager would not unban them anymore
             self._anti_bot.unban_ips(unban_all=True)
+
+    def _stop_server(self,
+                     crashed: bool = False) -> None:
+        """Gracefully stop the server
+
+        Args:
+            crashed: If server has already exited by itself, so only manager's components are stopped"""
+
+        self._supervisor.expect_exit()
+        self._server_ready.clear()
+        try:
+            if not crashed:
+                self._anti_bot.unban_ips(unban_all=True)
+            self._anti_bot.stop()
         except Exception as e:
             logger.error('Was not able to unban IPs!')
             logger.exception(e)
 
-        if self._server_proc and self._server_proc.stdin:
+        if self._jvm_monitor:
+            self._jvm_monitor.stop()
+            self._jvm_monitor = None
+        if self._server_comm and self._server_comm.tps_tracker:
+            self._server_comm.tps_tracker.stop()
+
+        if self._server_proc and self._server_proc.stdin and not crashed:
             try:
                 command = "say Server is restarting, 5 minutes max...\n"
                 self._server_comm.send_to_server(command)
@@ -218,8 +329,19 @@ class MinecraftServerManager:
                 self._server_proc = None
                 logger.info("Server handle cleared.")
         else:
+            self._server_proc = None
             logger.info("Server process not running.")
 
+        if self._gc_log:
+            self._gc_log.stop()
+            # G1's default target, also set by Aikar's flags
+            logger.info(GcAdvisor.get_report(self._gc_log.get_parser(), max_pause_ms=200))
+            self._gc_log = None
+
+        if self._server_comm and self._server_comm.toxicity:
+            self._server_comm.toxicity.stop()
+        self.notificator.flush()
+
     def _zip_and_send_world(self,
                             backuper: FileBackuper) -> None:
         """Zips world-copy, send it to remote storage (if configured), deletes world-copy and cleans old backups
@@ -231,12 +353,22 @@ class MinecraftServerManager:
 
         logger.info(
             f'Backup post-sequence initiated. '
-            f'Waiting {settings.backups.WAIT_BEFORE_BACKUP} seconds to let server start...'
+            f'Waiting for server to get ready (up to {settings.backups.WAIT_BEFORE_BACKUP} seconds)...'
         )
-        time.sleep(settings.backups.WAIT_BEFORE_BACKUP)
+        if self._server_ready.wait(timeout=settings.backups.WAIT_BEFORE_BACKUP):
+            logger.info('Server is ready, zipping backup')
+        else:
+            logger.warning(f'Server did not get ready in {settings.backups.WAIT_BEFORE_BACKUP} seconds, zipping anyway')
+
+        throttle = None
+        if settings.backups.ZIP_LOW_PRIORITY:
+            throttle = BackupThrottle(self._is_server_lagging,
+                                      pause=settings.backups.ZIP_THROTTLE_PAUSE_SEC,
+                                      max_pause=settings.backups.ZIP_MAX_THROTTLE_SEC)
 
         try:
-            zipped_backup_path = backuper.zip_backup()
+            with BACKUP_SECONDS['zip'].time():
+                zipped_backup_path = backuper.zip_backup(throttle)
             if zipped_backup_path:
                 logger.info('Deleting temp-copy')
                 backuper.delete_temp_folder()
@@ -255,6 +387,26 @@ class MinecraftServerManager:
             self.main_comm.backup_now_trigger = False
             logger.info('Backup post-sequence completed')
 
+    def _is_server_lagging(self) -> bool:
+        """Checks if server lags, by its TPS
+
+        Returns:
+            True, if server lags (False, if TPS is not tracked)"""
+
+        server_comm = self._server_comm
+        return bool(server_comm and server_comm.tps_tracker and server_comm.tps_tracker.is_lagging())
+
+    @staticmethod
+    def _get_max_rss_bytes() -> int:
+        """Gets memory of server's process, above which it is about to run out of heap
+
+        Returns:
+            Bytes (0 - not checked: MAX_MEM is not applied, if server is started with START_BAT)"""
+
+        if settings.paths.START_BAT or not settings.MAX_MEM:
+            return 0
+        return int(settings.MAX_MEM * settings.health.MEM_ALERT_RATIO * 2 ** 30)
+
     def _send_backup(self,
                      file_path: str) -> None:
         """Send world backup over HTTP"""
@@ -263,9 +415,10 @@ class MinecraftServerManager:
         attempt = 0
         sent    = False
         sender  = HttpFileSender(file_path)
-        while attempt < settings.backups.SEND_ATTEMPTS + 1 and not sent:
-            sent = sender.send()
-            attempt += 1
+        with BACKUP_SECONDS['send'].time():
+            while attempt < settings.backups.SEND_ATTEMPTS + 1 and not sent:
+                sent = sender.send()
+                attempt += 1
 
         if sent:
             logger.info(f'World was sent successfully on attempt #{attempt}')
@@ -278,4 +431,5 @@ class MinecraftServerManager:
         logger.info("Stopping manager...")
         self._running = False
         self._stop_server()
+        self.notificator.stop()
         logger.info("Manager stopped")
@@ -1,10 +1,11 @@
 from loguru import logger
 from pprint import pformat
+from typing import Literal
 
 from pydantic import SecretStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
-from utils.other import find_my_file
+from utils.other import find_my_file, LOCATOR
 
 
 CONFIG_FILE_NAME: str = 'config.env'
@@ -15,7 +16,10 @@ class NotificationsSettings(BaseSettings):
 
     Attributes:
         ACTIVATED: If notificator should be activated, direct flag
-        START_MESSAGE_DELAY: Delay in seconds to show login notification, after Player logged in"""
+        START_MESSAGE_DELAY: Delay in seconds to show login notification, after Player logged in
+        FLUSH_INTERVAL_SEC: How often to write changed Users' data on disk, in seconds (0 - only on stop)
+        USERS_STORAGE: Where to keep Users' data: 'json' (PATH_USERS_DATA) or 'sqlite' (PATH_DB). On first start with
+            'sqlite', data from PATH_USERS_DATA is migrated into DB automatically"""
 
     model_config = SettingsConfigDict(
         env_prefix='NOTIFICATION_',
@@ -23,8 +27,10 @@ class NotificationsSettings(BaseSettings):
         extra='ignore'
     )
 
-    ACTIVATED:           bool = True
-    START_MESSAGE_DELAY: int  = 5
+    ACTIVATED:           bool                      = True
+    START_MESSAGE_DELAY: int                       = 5
+    FLUSH_INTERVAL_SEC:  int                       = 30
+    USERS_STORAGE:       Literal['json', 'sqlite'] = 'json'
 
 
 class PathsSettings(BaseSettings):
@@ -38,7 +44,10 @@ class PathsSettings(BaseSettings):
         SERVER_JAR: ABS-Path to .jar with server, if START_BAT not set
         DB: ABS-Path to DB that will be created locally for app's data
         MESSAGES: ABS-path to JSON with messages-data
-        USERS_DATA: ABS-path to JSON with Users' data"""
+        USERS_DATA: ABS-path to JSON with Users' data
+        BAD_WORDS: ABS-path to TXT with bad words, one per line
+        LEMMA_CACHE: ABS-path to JSON with cached lemmas of chat words, to start with warm cache (optional)
+        IP_BLOCKLIST: ABS-path to TXT with IPs or networks (CIDR) to kick on login, one per line (optional)"""
 
     model_config = SettingsConfigDict(
         env_prefix='PATH_',
@@ -46,15 +55,17 @@ class PathsSettings(BaseSettings):
         extra='ignore'
     )
 
-    SERVER_DIR: str       = ''
-    TO_BACKUP:  list[str] = ['']
-    BACKUP_DIR: str       = ''
-    START_BAT:  str       = ''
-    SERVER_JAR: str       = ''
-    DB:         str       = 'my_shiny.db'
-    MESSAGES:   str       = ''
-    USERS_DATA: str       = ''
-    BAD_WORDS:  str       = ''
+    SERVER_DIR:   str       = ''
+    TO_BACKUP:    list[str] = ['']
+    BACKUP_DIR:   str       = ''
+    START_BAT:    str       = ''
+    SERVER_JAR:   str       = ''
+    DB:           str       = 'my_shiny.db'
+    MESSAGES:     str       = ''
+    USERS_DATA:   str       = ''
+    BAD_WORDS:    str       = ''
+    LEMMA_CACHE:  str       = ''
+    IP_BLOCKLIST: str       = ''
 
 
 class BackupSettings(BaseSettings):
@@ -64,7 +75,10 @@ class BackupSettings(BaseSettings):
         BACKUP_TIME: Time for backing up world as string in format HH:mm
         BACK_UP_DAYS: Backups, made more days ago, will be automatically deleted
         BACKUP_INTERVAL_DAYS: Interval between each backup in days (back up every x day)
-        WAIT_BEFORE_BACKUP: Seconds to wait before zipping and sending backup, to let server restart
+        WAIT_BEFORE_BACKUP: Max seconds to wait for restarted server to get ready (Done in logs), before zipping backup
+        ZIP_LOW_PRIORITY: If zipping should run at the lowest CPU and IO priority and pause, while server lags
+        ZIP_THROTTLE_PAUSE_SEC: Seconds to pause zipping for, before checking server's lag again
+        ZIP_MAX_THROTTLE_SEC: Max seconds to pause zipping for in total, so backup is finished anyway
 
         WORLD_SENDER_ON: True, if world backup should be sent over HTTP somewhere (you need to launch receiver there)
         SEND_ATTEMPTS: Number of attempts to send world backup
@@ -85,6 +99,10 @@ class BackupSettings(BaseSettings):
     BACKUP_INTERVAL_DAYS: int = 3
     WAIT_BEFORE_BACKUP:   int = 180
 
+    ZIP_LOW_PRIORITY:       bool  = True
+    ZIP_THROTTLE_PAUSE_SEC: float = 5
+    ZIP_MAX_THROTTLE_SEC:   float = 600
+
     WORLD_SENDER_ON: bool = True
     SEND_ATTEMPTS:   int  = 5
 
@@ -140,7 +158,12 @@ class AntiBotSettings(BaseSettings):
         AGGRESSIVE_BAN_IP_AFTER_IP_KICKED_TIMES: How many kicks should IP get to get banned (entire IP will be banned)
         AGGRESSIVE_RUN_EVERY: RUN_EVERY will be reduced to this number, while aggressive mode is on
 
-        KICK_FOR_COMMANDS: Commands to kick for
+        PARK_AFTER_POLLS: Tracked User outside spawn zones, whose coordinates did not change this many polls in a row,
+            is polled rarely (0 - poll all tracked Users on each cycle)
+        PARKED_POLL_EVERY: Rarely polled Users are polled once in this number of cycles
+
+        KICK_FOR_COMMANDS: Commands to kick for. Command without namespace also covers its namespaced variants
+            (ex: 'plugins' covers 'bukkit:plugins'), and known aliases are the same command (ex: 'pl' and 'plugins')
 
         KICK_STATIC_IN_SPAWN_POINT_AFTER_SEC: After this many seconds user will be kicked if not moved from spawn point
         KICK_STATIC_IN_SPAWN_AREA_AFTER_SEC: After this many seconds user will be kicked if not left spawn area
@@ -153,6 +176,14 @@ class AntiBotSettings(BaseSettings):
         BAN_IP_FOR_SECONDS: IP will be banned for this number of seconds
         BAN_IP_FOR_MINUTES: IP will be banned for this number of minutes
         BAN_IP_FOR_HOURS: IP will be banned for this number of hours
+        BAN_COMMANDS_PER_SEC: Max number of ban-ip and pardon-ip commands, sent to server per second
+
+        RANGE_BAN_AFTER_IPS: Whole subnet will be banned, once this number of distinct IPs from it were kicked within
+            RANGE_BAN_WINDOW_SEC (0 - never ban subnets). Logins from banned subnet are kicked right away
+        RANGE_BAN_WINDOW_SEC: Kicked IPs older than this number of seconds are not counted for subnet
+        RANGE_BAN_MAX_SUBNETS: Max number of subnets to keep kicks for. The least recently kicked ones are forgotten
+        RANGE_BAN_PREFIX_V4: Prefix length of IPv4 subnet to aggregate kicks in
+        RANGE_BAN_PREFIX_V6: Prefix length of IPv6 subnet to aggregate kicks in
 
         SPAWN_X_MIN: Min X of spawn area
         SPAWN_X_MAX: Max X of spawn area
@@ -161,7 +192,11 @@ class AntiBotSettings(BaseSettings):
 
         SPAWN_POINT_X: X of spawn point
         SPAWN_POINT_Y: Y of the spawn point
-        SPAWN_POINT_Z: Z of spawn point"""
+        SPAWN_POINT_Z: Z of spawn point
+
+        EXTRA_SPAWN_AREAS: More spawn areas as rectangles: [[x_min, x_max, z_min, z_max], ...]
+        EXTRA_SPAWN_POINTS: More spawn points: [[x, z], ...]
+        SPAWN_POLYGONS: Spawn areas of any shape, as polygons: [[[x, z], [x, z], [x, z], ...], ...]"""
 
     model_config = SettingsConfigDict(
         env_prefix='AB_',
@@ -184,6 +219,9 @@ class AntiBotSettings(BaseSettings):
     AGGRESSIVE_BAN_IP_AFTER_IP_KICKED_TIMES: int       = 3
     AGGRESSIVE_RUN_EVERY:                    int       = 1
 
+    PARK_AFTER_POLLS:  int = 3
+    PARKED_POLL_EVERY: int = 3
+
     KICK_FOR_COMMANDS: list[str] = ['plugins',
                                     'pl',
                                     'version grimac',
@@ -209,6 +247,14 @@ class AntiBotSettings(BaseSettings):
     BAN_IP_FOR_MINUTES:                  int = 30
     BAN_IP_FOR_HOURS:                    int = 0
 
+    BAN_COMMANDS_PER_SEC: float = 20
+
+    RANGE_BAN_AFTER_IPS:   int = 0
+    RANGE_BAN_WINDOW_SEC:  int = 600
+    RANGE_BAN_MAX_SUBNETS: int = 10000
+    RANGE_BAN_PREFIX_V4:   int = 24
+    RANGE_BAN_PREFIX_V6:   int = 48
+
     SPAWN_X_MIN:         int = 5552
     SPAWN_X_MAX:         int = 5562
     SPAWN_Z_MIN:         int = -4586
@@ -218,6 +264,165 @@ class AntiBotSettings(BaseSettings):
     SPAWN_POINT_Y:       int = 87
     SPAWN_POINT_Z:       int = -4583
 
+    EXTRA_SPAWN_AREAS:  list[list[int]]         = []
+    EXTRA_SPAWN_POINTS: list[list[int]]         = []
+    SPAWN_POLYGONS:     list[list[list[float]]] = []
+
+
+class ToxicitySettings(BaseSettings):
+    """Settings for ToxicityManager
+
+    Attributes:
+        LEMMA_CACHE_SIZE: Max number of chat words to keep lemmas for (0 - lemmatize each word every time)
+        WORKERS: Number of processes to check messages in (0 - single thread inside app's process)
+        QUEUE_SIZE: Max number of messages, waiting to be checked. Messages above it are not checked
+        MAX_BATCH: Max number of messages of a single Player, waiting to be checked. The oldest ones above it are joined
+        CHAT_RATE_PER_SEC: Messages per second, Player can send in the long run. Messages above it are spam, they are
+            checked for profanity joined, MAX_BATCH at once
+        CHAT_BURST: Messages, Player can send at once
+        HOLD_SEC: Messages above rate limit are checked joined at least this often, even if Player stopped flooding
+        HOLD_MAX: Max number of messages above rate limit, held for all Players. The longest held ones are dropped
+        DUPLICATES_WINDOW: Number of the last messages of Player, repeating any of which is spam
+        PUNISH_SPAM: If Player should be punished (once per spam-wave), not only ignored"""
+
+    model_config = SettingsConfigDict(
+        env_prefix='TOXICITY_',
+        env_file=(find_my_file(CONFIG_FILE_NAME)),
+        extra='ignore'
+    )
+
+    LEMMA_CACHE_SIZE: int = 50_000
+    WORKERS:          int = 1
+    QUEUE_SIZE:       int = 1000
+    MAX_BATCH:        int = 20
+
+    CHAT_RATE_PER_SEC: float = 1
+    CHAT_BURST:        int   = 5
+    HOLD_SEC:          float = 10
+    HOLD_MAX:          int   = 1000
+    DUPLICATES_WINDOW: int   = 5
+    PUNISH_SPAM:       bool  = False
+
+
+class RawLogSettings(BaseSettings):
+    """Settings for the file with server's output (manager's own logs are written separately)
+
+    Attributes:
+        MODE: all - every line, filtered - only logins, disconnects, commands, chat, warnings and errors,
+            sampled - filtered plus every SAMPLE_EVERY-th of other lines, off - nothing
+        FILE: ABS-path to the file (logs/minecraft.log near manager's logs, if empty)
+        MAX_MB: File is rotated, once it reaches this size
+        BACKUPS: Number of rotated files to keep
+        BUFFER_KB: Size of write buffer
+        FLUSH_SEC: Buffer is written on disk at least this often
+        SAMPLE_EVERY: Every N-th of other lines is written in sampled mode
+        ECHO: If server's output should also be printed in manager's logs (costs CPU and disk under load)"""
+
+    model_config = SettingsConfigDict(
+        env_prefix='RAW_LOG_',
+        env_file=(find_my_file(CONFIG_FILE_NAME)),
+        extra='ignore'
+    )
+
+    MODE:         Literal['all', 'filtered', 'sampled', 'off'] = 'all'
+    FILE:         str                                          = ''
+    MAX_MB:       int                                          = 50
+    BACKUPS:      int                                          = 5
+    BUFFER_KB:    int                                          = 256
+    FLUSH_SEC:    float                                        = 2
+    SAMPLE_EVERY: int                                          = 100
+    ECHO:         bool                                         = False
+
+
+class MetricsSettings(BaseSettings):
+    """Settings for metrics
+
+    Attributes:
+        ON: If metrics should be served in Prometheus text format
+        HOST: Host to serve metrics on
+        PORT: Port to serve metrics on, metrics are at http://HOST:PORT/metrics"""
+
+    model_config = SettingsConfigDict(
+        env_prefix='METRICS_',
+        env_file=(find_my_file(CONFIG_FILE_NAME)),
+        extra='ignore'
+    )
+
+    ON:   bool = False
+    HOST: str  = '127.0.0.1'
+    PORT: int  = 9108
+
+
+class HealthSettings(BaseSettings):
+    """Settings for monitoring of server's process
+
+    Attributes:
+        ON: If CPU, memory and threads of server's process should be sampled and checked for stalls
+        SAMPLE_SEC: Seconds between samples
+        RING_SIZE: Number of the latest samples to keep in memory
+        DB_BATCH: Samples are written into DB in batches of this size
+        STALL_SEC: Server is stalled, if it prints nothing for this long while CPU is above STALL_CPU_PERCENT
+        STALL_CPU_PERCENT: CPU of server's process, 100 is a single core
+        MEM_ALERT_RATIO: Server is about to run out of memory, if its RSS is above MAX_MEM * this ratio. RSS includes
+            memory outside Java-heap, so ratio should be above 1 (0 - not checked). Not checked, if START_BAT is used
+        TPS_ON: If server should be asked for its TPS and MSPT
+        TPS_COMMANDS: Commands to ask server with: ['tps', 'mspt'] for Paper, ['tick query'] for vanilla 1.20.3+
+        TPS_PROBE_SEC: Seconds between asking
+        TPS_SERIES_SIZE: Number of the latest answers to keep in memory
+        LOW_TPS: Server is lagging, if its TPS is below this
+        LOW_TPS_PROBES: AntiBot turns aggressive mode on, once server lags this many answers in a row (0 - never),
+            and not again, until TPS recovers
+        GC_LOG_ON: If java should write GC log, which is parsed into pauses, allocation rate and heap after GC, and
+            a report with recommended flags is logged on server stop. Not applied, if START_BAT is used
+        GC_LOG_FILE: ABS-path to GC log (logs/gc.log near manager's logs, if empty)
+        GC_ROLLUP_SEC: GC statistics are stored in DB once per this many seconds
+        RESTART_ON_CRASH: If server should be restarted, once it exits by itself
+        RESTART_BACKOFF_SEC: Delay before restart after crash, doubled with every next crash within the window
+        RESTART_MAX_BACKOFF_SEC: Max delay before restart after crash
+        CRASH_LOOP_WINDOW_SEC: Crashes within this many seconds are counted for backoff and crash loop
+        CRASH_LOOP_COUNT: Server is not restarted anymore, once it crashes this many times within CRASH_LOOP_WINDOW_SEC
+        CRASH_REPORT_LINES: Number of the latest lines of server's output to put into crash report
+        CRASH_REPORTS_DIR: ABS-path to folder with crash reports (logs/crash_reports near manager's logs, if empty)
+        CDS_ON: If java should keep class-data archive (AppCDS) of server to start faster (Java 13+). Archive is
+            written, when server stops, and used on the next starts. Not applied, if START_BAT is used
+        CDS_ARCHIVE: ABS-path to class-data archive (SERVER_JAR with .jsa extension, if empty)"""
+
+    model_config = SettingsConfigDict(
+        env_prefix='HEALTH_',
+        env_file=(find_my_file(CONFIG_FILE_NAME)),
+        extra='ignore'
+    )
+
+    ON:                bool  = True
+    SAMPLE_SEC:        float = 5
+    RING_SIZE:         int   = 720
+    DB_BATCH:          int   = 12
+    STALL_SEC:         float = 60
+    STALL_CPU_PERCENT: float = 95
+    MEM_ALERT_RATIO:   float = 1.3
+
+    TPS_ON:          bool      = True
+    TPS_COMMANDS:    list[str] = ['tps', 'mspt']
+    TPS_PROBE_SEC:   float     = 30
+    TPS_SERIES_SIZE: int       = 240
+    LOW_TPS:         float     = 15
+    LOW_TPS_PROBES:  int       = 0
+
+    GC_LOG_ON:     bool  = False
+    GC_LOG_FILE:   str   = ''
+    GC_ROLLUP_SEC: float = 60
+
+    RESTART_ON_CRASH:        bool  = True
+    RESTART_BACKOFF_SEC:     float = 10
+    RESTART_MAX_BACKOFF_SEC: float = 300
+    CRASH_LOOP_WINDOW_SEC:   float = 900
+    CRASH_LOOP_COUNT:        int   = 5
+    CRASH_REPORT_LINES:      int   = 200
+    CRASH_REPORTS_DIR:       str   = ''
+
+    CDS_ON:      bool = False
+    CDS_ARCHIVE: str  = ''
+
 
 class Settings(BaseSettings):
     """Apps main settings
@@ -230,7 +435,11 @@ class Settings(BaseSettings):
         paths: Paths to different files
         notifications: Settings for notifications
         backups: Settings for backing up world
-        down_detector: Settings for DownDetector"""
+        down_detector: Settings for DownDetector
+        toxicity: Settings for ToxicityManager
+        raw_log: Settings for the file with server's output
+        metrics: Settings for metrics
+        health: Settings for monitoring of server's process"""
 
     model_config = SettingsConfigDict(env_file=(find_my_file(CONFIG_FILE_NAME)),
                                       extra='ignore')
@@ -246,11 +455,16 @@ class Settings(BaseSettings):
     backups:       BackupSettings        = BackupSettings()
     down_detector: DownDetectorSettings  = DownDetectorSettings()
     antibot:       AntiBotSettings       = AntiBotSettings()
+    toxicity:      ToxicitySettings      = ToxicitySettings()
+    raw_log:       RawLogSettings        = RawLogSettings()
+    metrics:       MetricsSettings       = MetricsSettings()
+    health:        HealthSettings        = HealthSettings()
 
     TOXICITY_ON: bool = True
 
 
-logger.info(f'Found config.env at: {find_my_file(CONFIG_FILE_NAME)}')
+logger.info(f'Found config.env at: {find_my_file(CONFIG_FILE_NAME)} '
+            f'(discovery took {LOCATOR.get_discovery_time(CONFIG_FILE_NAME) * 1000:.1f} ms)')
 settings = Settings(
     _env_file=find_my_file(CONFIG_FILE_NAME),
     _env_file_encoding='utf-8'
@@ -0,0 +1,167 @@
+import os.path
+import pymorphy3
+
+from loguru import logger
+from typing import Optional
+
+from toxicity_manager.matcher import ProfanityMatcher
+from toxicity_manager.lemma_cache import LemmaCache
+
+
+class ToxicityAnalyzer:
+    """CPU-heavy part of toxicity check: morphology and search of bad words
+
+    Notes:
+        Does not depend on settings or ServerCommunicator, so it can be built inside worker-process
+
+    Attributes:
+        bad_words: List with bad words
+        matcher: Automaton, built from bad words, to check messages
+        morph: Helper to morph text
+        lemmas: Cache of lemmas for chat words"""
+
+    def __init__(self,
+                 bad_words_path: str,
+                 lemma_cache_path: str,
+                 lemma_cache_size: int):
+        """Init
+
+        Args:
+            bad_words_path: ABS-path to TXT with bad words
+            lemma_cache_path: ABS-path to JSON with warm lemma cache (empty - do not load)
+            lemma_cache_size: Max number of words in lemma cache"""
+
+        self.bad_words: list[str]               = []
+        self.matcher:   ProfanityMatcher        = ProfanityMatcher([])
+        self.morph:     pymorphy3.MorphAnalyzer = pymorphy3.MorphAnalyzer()
+        self.lemmas:    LemmaCache              = LemmaCache(lemmatizer=self._lemmatize,
+                                                             max_size=lemma_cache_size)
+
+        self._read_words(bad_words_path)
+        if lemma_cache_path:
+            self.lemmas.load(lemma_cache_path)
+
+    def has_profanity(self,
+                      text_to_check: str) -> bool:
+        """Checks if message contains profanity
+
+        Args:
+            text_to_check: Text to check
+        Returns:
+            True, if text contains bad words"""
+
+        normalized_input = self._normalize_text(text_to_check)
+        return self.matcher.contains_profanity(normalized_input)
+
+    def save_lemmas(self,
+                    lemma_cache_path: str) -> None:
+        """Logs lemma cache stats and saves it on disk
+
+        Args:
+            lemma_cache_path: ABS-path to JSON with lemma cache (empty - do not save)"""
+
+        logger.info(f'Lemma cache hit rate: {self.lemmas.get_hit_rate():.1%} '
+                    f'({self.lemmas.hits} hits, {self.lemmas.misses} misses)')
+        if not lemma_cache_path:
+            return
+
+        try:
+            self.lemmas.save(lemma_cache_path)
+        except Exception as e:
+            logger.error(f'Was not able to save lemma cache to {lemma_cache_path}')
+            logger.exception(e)
+
+    def _read_words(self,
+                    bad_words_path: str) -> None:
+        """Reads words and gets checker ready
+
+        Notes:
+            Words from the file are added to the default English word list, same as better_profanity did
+        Args:
+            bad_words_path: ABS-path to TXT with bad words"""
+
+        try:
+            if bad_words_path and os.path.exists(bad_words_path):
+                with open(bad_words_path, encoding='utf-8') as f:
+                    self.bad_words = f.read().splitlines()
+            else:
+                logger.warning(f'Path to bad words is empty or invalid: {bad_words_path}')
+            self.matcher = ProfanityMatcher(ProfanityMatcher.get_default_words() + self.bad_words)
+            logger.info(f'Profanity matcher is built from {self.matcher.words_count} words')
+        except Exception as e:
+            logger.exception(e)
+
+    def _normalize_text(self,
+                        text_to_normilize: str) -> str:
+        """Normalizes text to better profanity-check it
+
+        Args:
+            text_to_normilize: Text to normalize
+        Returns:
+            Normalized text"""
+
+        words = text_to_normilize.split()
+        pre_normalized_words = []
+        normalized_words = []
+        for word in words:
+            # Strip punctuation and get the lemma (lemmas are lowercase anyway, so cache is case-insensitive)
+            clean_word = word.strip('.,!?-').lower()
+            lemma = self.lemmas.get_lemma(clean_word)
+            pre_normalized_words.append(lemma)
+
+        for el in pre_normalized_words:
+            el = el.replace('ё', 'е')
+            normalized_words.append(el)
+
+        return " ".join(normalized_words)
+
+    def _lemmatize(self,
+                   word: str) -> str:
+        """Gets lemma of the word with morphology
+
+        Args:
+            word: Word to get lemma for
+        Returns:
+            Lemma"""
+
+        return self.morph.parse(word)[0].normal_form
+
+
+_ANALYZER: Optional[ToxicityAnalyzer] = None
+"""Analyzer of the current worker"""
+
+
+def init_worker(bad_words_path: str,
+                lemma_cache_path: str,
+                lemma_cache_size: int) -> None:
+    """Builds analyzer once per worker
+
+    Args:
+        bad_words_path: ABS-path to TXT with bad words
+        lemma_cache_path: ABS-path to JSON with warm lemma cache
+        lemma_cache_size: Max number of words in lemma cache"""
+
+    global _ANALYZER
+    _ANALYZER = ToxicityAnalyzer(bad_words_path=bad_words_path,
+                                 lemma_cache_path=lemma_cache_path,
+                                 lemma_cache_size=lemma_cache_size)
+
+
+def analyze_messages(messages: list[str]) -> bool:
+    """Checks messages of a single User in worker
+
+    Args:
+        messages: Messages to check
+    Returns:
+        True, if any of messages contains bad words"""
+
+    return any(_ANALYZER.has_profanity(message) for message in messages)
+
+
+def save_lemmas(lemma_cache_path: str) -> None:
+    """Saves lemma cache of worker on disk
+
+    Args:
+        lemma_cache_path: ABS-path to JSON with lemma cache"""
+
+    _ANALYZER.save_lemmas(lemma_cache_path)
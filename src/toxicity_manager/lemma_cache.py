@@ -0,0 +1,150 @@
+import os
+import json
+import tempfile
+import threading
+
+from loguru import logger
+from collections import OrderedDict
+from collections.abc import Callable
+
+
+class LemmaCache:
+    """Bounded LRU-cache of lemmas, so repeated words of chat skip morphology
+
+    Notes:
+        Chat vocabulary repeats heavily, while parsing a word with pymorphy3 is one of the most expensive operations of
+        the app. Cache can be saved on disk and loaded on start, so it is warm right after restart
+
+    Attributes:
+        hits: Number of words, found in cache
+        misses: Number of words, that had to be lemmatized
+
+        _lemmatizer: Function, that gets lemma of a word
+        _max_size: Max number of words to keep
+        _lemmas: {word: lemma}, ordered from the least to the most recently used
+        _lock: Lock for cache"""
+
+    def __init__(self,
+                 lemmatizer: Callable[[str], str],
+                 max_size: int):
+        """Init
+
+        Args:
+            lemmatizer: Function, that gets lemma of a word
+            max_size: Max number of words to keep (0 - do not cache at all)"""
+
+        self.hits:   int = 0
+        self.misses: int = 0
+
+        self._lemmatizer: Callable[[str], str]  = lemmatizer
+        self._max_size:   int                   = max_size
+        self._lemmas:     OrderedDict[str, str] = OrderedDict()
+        self._lock:       threading.Lock        = threading.Lock()
+
+    def get_lemma(self,
+                  word: str) -> str:
+        """Gets lemma of the word from cache or from lemmatizer
+
+        Args:
+            word: Word to get lemma for
+        Returns:
+            Lemma"""
+
+        with self._lock:
+            lemma = self._lemmas.get(word)
+            if lemma is not None:
+                self._lemmas.move_to_end(word)
+                self.hits += 1
+                return lemma
+            self.misses += 1
+
+        lemma = self._lemmatizer(word)
+        if self._max_size > 0:
+            with self._lock:
+                self._put(word, lemma)
+        return lemma
+
+    def get_hit_rate(self) -> float:
+        """Calculates share of words, found in cache
+
+        Returns:
+            Hit rate from 0 to 1"""
+
+        total = self.hits + self.misses
+        if not total:
+            return 0
+        return self.hits / total
+
+    def get_size(self) -> int:
+        """Counts cached words
+
+        Returns:
+            Number of cached words"""
+
+        with self._lock:
+            return len(self._lemmas)
+
+    def load(self,
+             file_path: str) -> None:
+        """Loads warm cache from disk
+
+        Notes:
+            Missing or broken file is not an error, cache just starts cold
+        Args:
+            file_path: ABS-path to JSON with cache"""
+
+        if not os.path.exists(file_path):
+            logger.info(f'No lemma cache at {file_path}, starting with empty one')
+            return
+
+        try:
+            with open(file_path, encoding='utf-8') as f:
+                data = json.load(f)
+            with self._lock:
+                for word, lemma in data.items():
+                    self._put(word, lemma)
+            logger.info(f'Lemma cache loaded: {len(self._lemmas)} words')
+        except Exception as e:
+            logger.error(f'Was not able to load lemma cache from {file_path}')
+            logger.exception(e)
+
+    def save(self,
+             file_path: str) -> None:
+        """Saves cache on disk, from the least to the most recently used word
+
+        Args:
+            file_path: ABS-path to JSON with cache"""
+
+        with self._lock:
+            data = dict(self._lemmas)
+
+        target_dir = os.path.dirname(os.path.abspath(file_path))
+        with tempfile.NamedTemporaryFile('w',
+                                         encoding='utf-8',
+                                         dir=target_dir,
+                                         suffix='.tmp',
+                                         delete=False) as f:
+            json.dump(data, f, ensure_ascii=False)
+            temp_path = f.name
+
+        try:
+            os.replace(temp_path, file_path)
+        except Exception:
+            os.remove(temp_path)
+            raise
+
+        logger.info(f'Lemma cache saved: {len(data)} words')
+
+    def _put(self,
+             word: str,
+             lemma: str) -> None:
+        """Puts word into cache, dropping the least recently used one on overflow. Call under lock
+
+        Args:
+            word: Word
+            lemma: Lemma of the word"""
+
+        self._lemmas[word] = lemma
+        self._lemmas.move_to_end(word)
+        while len(self._lemmas) > self._max_size:
+            self._lemmas.popitem(last=False)
@@ -1,11 +1,11 @@
-import os.path
-import pymorphy3
+import time
 
 from loguru import logger
 from typing import TYPE_CHECKING
-from better_profanity import profanity
 
 from settings import settings
+from toxicity_manager.pool import ToxicityPool
+from toxicity_manager.spam_guard import SpamGuard
 
 if TYPE_CHECKING:
     from server_communicator.communicator import ServerCommunicator
@@ -14,12 +14,21 @@ if TYPE_CHECKING:
 class ToxicityManager:
     """Searches toxicity in messages and punishes for it
 
+    Notes:
+        Messages are checked by ToxicityPool in worker-processes, so processing of server's logs is never blocked by
+        morphology. Punishments are sent back through ServerCommunicator. Duplicates are dropped by SpamGuard before
+        they get to workers. Messages above rate limit are held and sent to workers joined, MAX_BATCH at once (or
+        with the next message within the limit, or after HOLD_SEC), so flood with profanity is still punished, but
+        costs a few checks. Held messages of disconnected Player and the longest held ones above HOLD_MAX are dropped
+
     Attributes:
-        bad_words: List with bad words
-        profanity: Profanity to check messages
-        morph: Helper to morph text
+        pool: Workers, that check messages
+        spam_guard: Per-User chat rate limiter and duplicates detector
 
-        _server_comm: Communicator to send commands with"""
+        _server_comm: Communicator to send commands with
+        _held: Messages above rate limit, waiting to be checked together, the longest held first
+            {User: (monotonic time of the first held message, [messages])}
+        _held_count: Number of held messages of all Users"""
 
     def __init__(self,
                  server_comm: 'ServerCommunicator'):
@@ -28,72 +37,146 @@ class ToxicityManager:
         Args:
             server_comm: Communicator to send commands with"""
 
-        self.bad_words: list[str]               = []
-        self.profanity: profanity               = profanity
-        self.morph:     pymorphy3.MorphAnalyzer = pymorphy3.MorphAnalyzer()
+        self.pool: ToxicityPool = ToxicityPool(on_toxic=self._on_toxic,
+                                               bad_words_path=settings.paths.BAD_WORDS,
+                                               lemma_cache_path=settings.paths.LEMMA_CACHE,
+                                               lemma_cache_size=settings.toxicity.LEMMA_CACHE_SIZE,
+                                               workers=settings.toxicity.WORKERS,
+                                               queue_size=settings.toxicity.QUEUE_SIZE,
+                                               max_batch=settings.toxicity.MAX_BATCH)
+        self.spam_guard: SpamGuard = SpamGuard(rate=settings.toxicity.CHAT_RATE_PER_SEC,
+                                               burst=settings.toxicity.CHAT_BURST,
+                                               window=settings.toxicity.DUPLICATES_WINDOW)
 
-        self._server_comm: 'ServerCommunicator' = server_comm
+        self._server_comm: 'ServerCommunicator'                = server_comm
+        self._held:        dict[str, tuple[float, list[str]]] = {}
+        self._held_count:  int                                 = 0
 
-        self._read_words()
+        self.pool.start()
 
-    def _read_words(self) -> None:
-        """Reads words and gets checker ready"""
+    def stop(self) -> None:
+        """Stops workers, saving lemma cache on disk, so next start begins with warm cache"""
 
-        try:
-            if settings.paths.BAD_WORDS and os.path.exists(settings.paths.BAD_WORDS):
-                with open(settings.paths.BAD_WORDS, encoding='utf-8') as f:
-                    raw_bad_words  = f.read().splitlines()
-                    bad_words = []
-                    for w in raw_bad_words:
-                        bad_words.append(w.replace('ё', 'е'))
-                    self.bad_words = raw_bad_words
-                    self.profanity.add_censor_words(self.bad_words)
-            else:
-                logger.warning(f'Path to bad words is empty or invalid: {settings.paths.BAD_WORDS}')
-        except Exception as e:
-            logger.exception(e)
+        self.pool.stop()
 
-    def _normalize_text(self,
-                        text_to_normilize: str) -> str:
-        """Normalizes text to better profanity-check it
+    def check_text(self,
+                   text_to_check: str,
+                   user_name: str) -> None:
+        """Queues message to be checked for profanity, without waiting for the result. Duplicates are dropped
 
         Args:
-            text_to_normilize: Text to normalize
+            text_to_check: Text to check
+            user_name: User-name to punish, in case text contains profanity"""
+
+        self._submit_expired_held()
+
+        spam_reason = self.spam_guard.check(user_name, text_to_check)
+        if spam_reason:
+            logger.debug(f'Message from {user_name} is dropped as spam ({spam_reason})')
+            if settings.toxicity.PUNISH_SPAM and self.spam_guard.is_new_spammer(user_name):
+                logger.warning(f'User {user_name} will be punished for spam ({spam_reason}): {text_to_check=}')
+                self._punish(user_name)
+            if spam_reason == SpamGuard.RATE_LIMITED:
+                self._hold(user_name, text_to_check)
+            return
+
+        self._submit_held(user_name)
+        self._submit(user_name, text_to_check)
+
+    def on_disconnect(self,
+                      user_name: str) -> None:
+        """Drops held messages of disconnected User, as User can not be punished anymore
+
+        Args:
+            user_name: Disconnected User"""
+
+        dropped = self._drop_held(user_name)
+        if dropped:
+            logger.debug(f'User {user_name} disconnected, {dropped} held messages are dropped')
+
+    def _hold(self,
+              user_name: str,
+              text_to_check: str) -> None:
+        """Holds message above rate limit, to check it together with the next ones
+
+        Args:
+            user_name: Author of the message
+            text_to_check: Text to check"""
+
+        if user_name not in self._held:
+            self._held[user_name] = time.monotonic(), []
+        held = self._held[user_name][1]
+        held.append(text_to_check)
+        self._held_count += 1
+
+        if len(held) >= settings.toxicity.MAX_BATCH:
+            self._submit_held(user_name)
+
+        while self._held_count > settings.toxicity.HOLD_MAX:
+            oldest_user_name = next(iter(self._held))
+            dropped = self._drop_held(oldest_user_name)
+            logger.debug(f'Too many held messages, {dropped} messages from {oldest_user_name} are not checked')
+
+    def _submit_expired_held(self) -> None:
+        """Queues messages, that were held for too long"""
+
+        expired_before = time.monotonic() - settings.toxicity.HOLD_SEC
+        while self._held:
+            user_name, (held_at, _) = next(iter(self._held.items()))
+            if held_at > expired_before:
+                break
+            self._submit_held(user_name)
+
+    def _drop_held(self,
+                   user_name: str) -> int:
+        """Forgets held messages of User
+
+        Args:
+            user_name: Author of the messages
         Returns:
-            Normalized text"""
+            Number of dropped messages"""
 
-        words = text_to_normilize.split()
-        pre_normalized_words = []
-        normalized_words = []
-        for word in words:
-            # Strip punctuation and get the lemma
-            clean_word = word.strip('.,!?-')
-            lemma = self.morph.parse(clean_word)[0].normal_form
-            pre_normalized_words.append(lemma)
+        held = self._held.pop(user_name, None)
+        if not held:
+            return 0
+        self._held_count -= len(held[1])
+        return len(held[1])
 
-        for el in pre_normalized_words:
-            el = el.replace('ё', 'е')
-            normalized_words.append(el)
+    def _submit_held(self,
+                     user_name: str) -> None:
+        """Queues held messages of User as a single message
 
-        return " ".join(normalized_words)
+        Args:
+            user_name: Author of the messages"""
 
-    def check_text(self,
-                   text_to_check: str,
-                   user_name: str) -> None:
-        """Checks if message contains profanity
+        held = self._held.pop(user_name, None)
+        if held:
+            self._held_count -= len(held[1])
+            self._submit(user_name, '\n'.join(held[1]))
+
+    def _submit(self,
+                user_name: str,
+                text_to_check: str) -> None:
+        """Queues message to be checked
 
         Args:
-            text_to_check: Text to check
-            user_name: User-name to punish, in case text contains profanity"""
+            user_name: Author of the message
+            text_to_check: Text to check"""
 
-        try:
-            normalized_input = self._normalize_text(text_to_check)
-            has_bad_word = self.profanity.contains_profanity(normalized_input)
-            if has_bad_word:
-                logger.warning(f'User {user_name} will be punished for: {text_to_check=}')
-                self._punish(user_name)
-        except Exception as e:
-            logger.exception(e)
+        if not self.pool.submit(user_name, text_to_check):
+            logger.debug(f'Toxicity queue is full, message from {user_name} is not checked')
+
+    def _on_toxic(self,
+                  user_name: str,
+                  messages: list[str]) -> None:
+        """Punishes User for messages with profanity
+
+        Args:
+            user_name: User to punish
+            messages: Checked messages of the User, at least one of them contains profanity"""
+
+        logger.warning(f'User {user_name} will be punished for: {messages=}')
+        self._punish(user_name)
 
     def _punish(self,
                 user_name: str) -> None:
@@ -113,8 +196,11 @@ class ToxicityManager:
 
 
 if __name__ == '__main__':
+    import time
     from unittest.mock import Mock
 
     manager = ToxicityManager(server_comm=Mock())
     text = 'тупой ты убью'
     manager.check_text(text, 'user_name')
+    time.sleep(5)
+    manager.stop()
@@ -0,0 +1,140 @@
+import re
+
+from collections import deque
+from better_profanity.utils import read_wordlist, get_complete_path_of_file
+
+
+class ProfanityMatcher:
+    """Searches bad words in text with Aho-Corasick automaton, built once from the list of bad words
+
+    Notes:
+        Both bad words and checked text are normalized the same way: lowercased, 'ё' replaced with 'е', leetspeak
+        symbols and latin letters, that look like cyrillic ones, replaced with cyrillic letters, and any run of
+        non-word symbols replaced with a single space. Each bad word is padded with spaces, and so is the text, so
+        automaton matches whole words (and phrases) only. Check of the text is linear in its length and does not depend
+        on the number of bad words
+
+    Attributes:
+        words_count: Number of unique normalized bad words, automaton was built from
+
+        _goto: Transitions of automaton: [{symbol: next state}], state 0 is root
+        _fail: Fail-links: [state to fall back to]
+        _terminal: [True, if some bad word ends in this state or in any of its fail-states]"""
+
+    CHARS_MAP: dict[str, str] = {
+        'ё': 'е',
+        'a': 'а', '@': 'а', '4': 'ч',
+        'b': 'в', '6': 'б',
+        'c': 'с',
+        'e': 'е', '3': 'з',
+        'k': 'к',
+        'm': 'м',
+        'o': 'о', '0': 'о',
+        'p': 'р',
+        'x': 'х',
+        'y': 'у',
+        'u': 'и',
+    }
+    """Symbols, that are used instead of cyrillic letters"""
+
+    _TRANSLATION = str.maketrans(CHARS_MAP)
+    _NON_WORD    = re.compile(r'[\W_]+')
+
+    def __init__(self,
+                 words: list[str]):
+        """Init
+
+        Args:
+            words: Bad words (or phrases) to search"""
+
+        self.words_count: int = 0
+
+        self._goto:     list[dict[str, int]] = [{}]
+        self._fail:     list[int]            = [0]
+        self._terminal: list[bool]           = [False]
+
+        self._build(words)
+
+    @staticmethod
+    def get_default_words() -> list[str]:
+        """Reads default English word list of better_profanity
+
+        Returns:
+            Bad words"""
+
+        return list(read_wordlist(get_complete_path_of_file('profanity_wordlist.txt')))
+
+    @classmethod
+    def normalize(cls,
+                  text: str) -> str:
+        """Normalizes text the same way for bad words and checked messages
+
+        Args:
+            text: Text to normalize
+        Returns:
+            Normalized text, padded with spaces"""
+
+        text = text.lower().translate(cls._TRANSLATION)
+        text = cls._NON_WORD.sub(' ', text).strip()
+        return f' {text} '
+
+    def contains_profanity(self,
+                           text: str) -> bool:
+        """Checks if text contains any of bad words
+
+        Args:
+            text: Text to check
+        Returns:
+            True, if text contains bad word"""
+
+        goto     = self._goto
+        fail     = self._fail
+        terminal = self._terminal
+
+        state = 0
+        for symbol in self.normalize(text):
+            while state and symbol not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(symbol, 0)
+            if terminal[state]:
+                return True
+        return False
+
+    def _build(self,
+               words: list[str]) -> None:
+        """Builds automaton: trie of normalized words and fail-links
+
+        Args:
+            words: Bad words"""
+
+        patterns = set()
+        for word in words:
+            pattern = self.normalize(word)
+            if pattern.strip():
+                patterns.add(pattern)
+        self.words_count = len(patterns)
+
+        for pattern in patterns:
+            state = 0
+            for symbol in pattern:
+                next_state = self._goto[state].get(symbol)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._terminal.append(False)
+                    self._goto[state][symbol] = next_state
+                state = next_state
+            self._terminal[state] = True
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for symbol, next_state in self._goto[state].items():
+                fail_state = self._fail[state]
+                while fail_state and symbol not in self._goto[fail_state]:
+                    fail_state = self._fail[fail_state]
+                self._fail[next_state] = self._goto[fail_state].get(symbol, 0)
+                if self._terminal[self._fail[next_state]]:
+                    self._terminal[next_state] = True
+                queue.append(next_state)
@@ -0,0 +1,199 @@
+import threading
+import multiprocessing
+
+from loguru import logger
+from functools import partial
+from queue import Queue, Empty, Full
+from collections.abc import Callable
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+from toxicity_manager.analyzer import init_worker, analyze_messages, save_lemmas
+
+
+class ToxicityPool:
+    """Checks chat messages in worker-processes, so log-processor thread is never blocked by morphology
+
+    Notes:
+        Messages go into bounded queue (overflow is dropped), dispatcher thread takes them out and groups them per
+        User. Each User has at most one job in workers: messages, that come while it is running, are accumulated and
+        sent as the next single job. So a flood from a single User turns into a few batches, instead of a job per line
+
+    Attributes:
+        dropped: Number of messages, dropped because queue was full
+
+        _on_toxic: Function to call with (User, messages), when messages contain bad words
+        _workers: Number of worker-processes (0 - single thread in this process)
+        _max_batch: Max number of messages of a single User to keep waiting, the oldest ones above it are joined
+        _initargs: Arguments for worker's initializer
+        _lemma_cache_path: ABS-path to JSON with lemma cache, to save it on stop
+        _queue: Queue with (User, message)
+        _pending: Messages, waiting for User's job to finish {User: [messages]}
+        _in_flight: Users, whose messages are being checked right now
+        _executor: Pool of workers
+        _lock: Lock for pending messages and Users in flight (re-entrant, as done-callback of a job, that is already
+            finished, is called right away by the thread, that submits it)
+        _running: If dispatcher should keep running"""
+
+    def __init__(self,
+                 on_toxic: Callable[[str, list[str]], None],
+                 bad_words_path: str,
+                 lemma_cache_path: str,
+                 lemma_cache_size: int,
+                 workers: int,
+                 queue_size: int,
+                 max_batch: int):
+        """Init
+
+        Args:
+            on_toxic: Function to call with (User, messages), when messages contain bad words
+            bad_words_path: ABS-path to TXT with bad words
+            lemma_cache_path: ABS-path to JSON with lemma cache
+            lemma_cache_size: Max number of words in lemma cache of each worker
+            workers: Number of worker-processes (0 - single thread in this process)
+            queue_size: Max number of messages, waiting to be dispatched
+            max_batch: Max number of messages of a single User to keep waiting"""
+
+        self.dropped: int = 0
+
+        self._on_toxic:         Callable[[str, list[str]], None] = on_toxic
+        self._workers:          int                              = workers
+        self._max_batch:        int                              = max_batch
+        self._initargs:         tuple[str, str, int]             = (bad_words_path, lemma_cache_path, lemma_cache_size)
+        self._lemma_cache_path: str                              = lemma_cache_path
+        self._queue:            Queue                            = Queue(maxsize=queue_size)
+        self._pending:          dict[str, list[str]]             = {}
+        self._in_flight:        set[str]                         = set()
+        self._executor:         Executor | None                  = None
+        self._lock:             threading.RLock                  = threading.RLock()
+        self._running:          bool                             = False
+
+    def start(self) -> None:
+        """Starts workers and dispatcher thread"""
+
+        if self._workers > 0:
+            # Spawn, so workers do not inherit threads and locks of the app
+            self._executor = ProcessPoolExecutor(max_workers=self._workers,
+                                                 mp_context=multiprocessing.get_context('spawn'),
+                                                 initializer=init_worker,
+                                                 initargs=self._initargs)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=1,
+                                                initializer=init_worker,
+                                                initargs=self._initargs)
+
+        # Warm up, so the first message does not wait for morphology to load
+        for _ in range(max(self._workers, 1)):
+            self._executor.submit(analyze_messages, [])
+
+        self._running = True
+        threading.Thread(target=self._dispatch_loop, daemon=True).start()
+
+    def stop(self) -> None:
+        """Stops dispatcher and workers, saving lemma cache of one of the workers"""
+
+        self._running = False
+        if self._executor is None:
+            return
+
+        try:
+            self._executor.submit(save_lemmas, self._lemma_cache_path).result(timeout=30)
+        except Exception as e:
+            logger.error('Was not able to save lemma cache from toxicity worker')
+            logger.exception(e)
+
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+        if self.dropped:
+            logger.warning(f'Toxicity queue was full, {self.dropped} messages were not checked')
+
+    def submit(self,
+               user_name: str,
+               message: str) -> bool:
+        """Puts message into queue, without waiting
+
+        Args:
+            user_name: Author of the message
+            message: Message to check
+        Returns:
+            False, if queue is full and message was dropped"""
+
+        try:
+            self._queue.put_nowait((user_name, message))
+            return True
+        except Full:
+            self.dropped += 1
+            return False
+
+    def get_queue_size(self) -> int:
+        """Counts messages, waiting to be dispatched
+
+        Returns:
+            Size of the queue"""
+
+        return self._queue.qsize()
+
+    def _dispatch_loop(self) -> None:
+        """Takes messages out of queue and groups them into per-User jobs"""
+
+        while self._running:
+            try:
+                user_name, message = self._queue.get(timeout=0.5)
+            except Empty:
+                continue
+
+            try:
+                with self._lock:
+                    messages = self._pending.setdefault(user_name, [])
+                    messages.append(message)
+                    if len(messages) > self._max_batch:
+                        overflow = len(messages) - self._max_batch + 1
+                        messages[:overflow] = ['\n'.join(messages[:overflow])]
+
+                    if user_name not in self._in_flight:
+                        self._submit_user(user_name)
+            except Exception as e:
+                logger.exception(e)
+
+    def _submit_user(self,
+                     user_name: str) -> None:
+        """Sends all pending messages of User into workers as a single job. Call under lock
+
+        Args:
+            user_name: User to check messages of"""
+
+        if self._executor is None:
+            self._pending.pop(user_name, None)
+            return
+
+        messages = self._pending.pop(user_name)
+        self._in_flight.add(user_name)
+        future = self._executor.submit(analyze_messages, messages)
+        future.add_done_callback(partial(self._on_done, user_name, messages))
+
+    def _on_done(self,
+                 user_name: str,
+                 messages: list[str],
+                 future: Future) -> None:
+        """Handles result of User's job and sends messages, that came meanwhile
+
+        Args:
+            user_name: User, whose messages were checked
+            messages: Checked messages
+            future: Finished job"""
+
+        try:
+            if not future.cancelled() and future.result():
+                self._on_toxic(user_name, messages)
+        except Exception as e:
+            logger.error(f'Toxicity check for {user_name} failed')
+            logger.exception(e)
+
+        with self._lock:
+            self._in_flight.discard(user_name)
+            if user_name in self._pending:
+                try:
+                    self._submit_user(user_name)
+                except Exception as e:
+                    # Executor is shutting down
+                    logger.debug(f'Dropping pending messages of {user_name}: {e}')
+                    self._pending.pop(user_name, None)
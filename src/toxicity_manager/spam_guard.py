@@ -0,0 +1,141 @@
+import time
+import threading
+
+from collections import deque
+
+
+class ChatBucket:
+    """Chat state of a single User: token bucket and hashes of recent messages
+
+    Attributes:
+        tokens: Messages, User can send right now
+        updated_at: Monotonic time of the last refill
+        recent: Ring-buffer with hashes of the last messages
+        spamming: If User is in the middle of spam-wave: spam was found and bucket has not been full since then
+        wave_started: If the last message has started new spam-wave"""
+
+    def __init__(self,
+                 burst: int,
+                 window: int):
+        """Init
+
+        Args:
+            burst: Size of the bucket
+            window: Number of the last messages to compare new ones with"""
+
+        self.tokens:       float      = burst
+        self.updated_at:   float      = time.monotonic()
+        self.recent:       deque[int] = deque(maxlen=window)
+        self.spamming:     bool       = False
+        self.wave_started: bool       = False
+
+
+class SpamGuard:
+    """Cheap check of chat messages, that drops spam before it gets to morphology
+
+    Notes:
+        Each User has a token bucket: it refills with rate tokens per second up to burst, and each message takes one
+        token. Message without a token is spam. Message, equal (after lowercasing and collapsing spaces) to one of the
+        last window messages of the same User, is spam as well
+
+    Attributes:
+        RATE_LIMITED: Reason for messages above rate
+        DUPLICATE: Reason for repeated messages
+
+        _rate: Tokens per second
+        _burst: Size of the bucket
+        _window: Number of the last messages to compare new ones with
+        _buckets: {User: ChatBucket}
+        _lock: Lock for buckets"""
+
+    RATE_LIMITED: str = 'rate limit'
+    DUPLICATE:    str = 'duplicate'
+
+    FORGET_AFTER: int = 10_000
+    """Number of Users to keep, after which Users with full buckets are forgotten"""
+
+    def __init__(self,
+                 rate: float,
+                 burst: int,
+                 window: int):
+        """Init
+
+        Args:
+            rate: Messages per second, User can send in the long run
+            burst: Messages, User can send at once
+            window: Number of the last messages of User to search duplicates in (0 - do not search)"""
+
+        self._rate:    float                 = rate
+        self._burst:   int                   = burst
+        self._window:  int                   = window
+        self._buckets: dict[str, ChatBucket] = {}
+        self._lock:    threading.Lock        = threading.Lock()
+
+    def check(self,
+              user_name: str,
+              message: str) -> str | None:
+        """Checks if message is spam
+
+        Args:
+            user_name: Author of the message
+            message: Message
+        Returns:
+            Reason, if message is spam, otherwise None"""
+
+        now = time.monotonic()
+        message_hash = hash(' '.join(message.lower().split()))
+
+        with self._lock:
+            bucket = self._buckets.get(user_name)
+            if bucket is None:
+                if len(self._buckets) >= self.FORGET_AFTER:
+                    self._forget_idle(now)
+                bucket = ChatBucket(self._burst, self._window)
+                self._buckets[user_name] = bucket
+
+            bucket.tokens     = min(self._burst, bucket.tokens + (now - bucket.updated_at) * self._rate)
+            bucket.updated_at = now
+            was_calm          = bucket.tokens >= self._burst
+
+            reason = None
+            if bucket.tokens < 1:
+                reason = self.RATE_LIMITED
+            else:
+                bucket.tokens -= 1
+                if message_hash in bucket.recent:
+                    reason = self.DUPLICATE
+                bucket.recent.append(message_hash)
+
+            bucket.wave_started = reason is not None and not bucket.spamming
+            if reason is not None:
+                bucket.spamming = True
+            elif was_calm:
+                bucket.spamming = False
+            return reason
+
+    def is_new_spammer(self,
+                       user_name: str) -> bool:
+        """Checks if the last message of User has started new spam-wave, to punish once per wave, not for each line
+
+        Args:
+            user_name: User to check
+        Returns:
+            True, if the last message of User has started spam-wave"""
+
+        with self._lock:
+            bucket = self._buckets.get(user_name)
+            return bucket is not None and bucket.wave_started
+
+    def _forget_idle(self,
+                     now: float) -> None:
+        """Drops Users, whose buckets would be full by now. Call under lock
+
+        Args:
+            now: Current monotonic time"""
+
+        idle = []
+        for user_name, bucket in self._buckets.items():
+            if bucket.tokens + (now - bucket.updated_at) * self._rate >= self._burst:
+                idle.append(user_name)
+        for user_name in idle:
+            del self._buckets[user_name]
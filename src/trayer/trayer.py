@@ -89,9 +89,7 @@ class Trayer(SysTrayIcon):
     def _check_communicator(self) -> None:
         """Checks Communicator-object. Destroys tray, in case there is a signal to do so"""
 
-        while not self.main_comm.stop_trayer:
-            time.sleep(1)
-
+        self.main_comm.wait(MainComm.STOP_TRAYER)
         self._quit(None)
 
     def _make_logos(self) -> None:
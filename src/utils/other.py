@@ -1,33 +1,141 @@
 import os
+import time
+import threading
 
 
-def find_my_file(file_to_find_name: str,
-                 start_dir: str = ".") -> str:
-    """Searches for file recursively, starting from start_dir and walking up each parent folder
+CONFIG_PATH_ENV_VAR: str = 'MSM_CONFIG_PATH'
+"""Environment variable with ABS-path to config file (or to the folder with it), checked before anything else"""
 
-    At each step, it also searches all subfolders.
 
-    Args:
-        file_to_find_name: Name of the file you need to find
-        start_dir: Dir, from which to start searching
-    Returns:
-        Path to file or empty string"""
+class FileLocator:
+    """Searches for files along a well-defined search path and memoizes results once per process
+
+    Search path (first match wins):
+        1. Path from CONFIG_PATH_ENV_VAR environment variable (file itself or folder with it)
+        2. Current working directory
+        3. Project root (folder, containing src)
+        4. Parent folders of current working directory, up to the drive root
+
+    Notes:
+        Folders are only checked directly, subfolders are never walked. This keeps discovery time independent of
+        what lies next to the app (worlds, backups, drive root etc.)
+
+    Attributes:
+        _found: Memoized results {file_name: path or empty string}
+        _discovery_time: Seconds, spent on discovery of each file {file_name: seconds}
+        _lock: Lock, so concurrent lookups do not run discovery twice"""
+
+    def __init__(self):
+        """Init"""
+
+        self._found:          dict[str, str]   = {}
+        self._discovery_time: dict[str, float] = {}
+        self._lock:           threading.Lock   = threading.Lock()
+
+    def find(self,
+             file_name: str) -> str:
+        """Finds file, running discovery only on the first call for this file_name
 
-    current_dir = os.path.abspath(start_dir)
+        Args:
+            file_name: Name of the file to find
+        Returns:
+            ABS-path to file or empty string, if file was not found"""
 
-    while True:
-        # Walk through current_dir and its subdirectories
-        for root, dirs, files in os.walk(current_dir):
-            if file_to_find_name in files:
-                return os.path.join(root, file_to_find_name)
+        with self._lock:
+            if file_name not in self._found:
+                started_at = time.perf_counter()
+                self._found[file_name]          = self._discover(file_name)
+                self._discovery_time[file_name] = time.perf_counter() - started_at
+
+            return self._found[file_name]
+
+    def get_discovery_time(self,
+                           file_name: str) -> float:
+        """Gets time, spent on discovery of the file
+
+        Args:
+            file_name: Name of the file, that was searched for
+        Returns:
+            Seconds, spent on discovery, or 0 if this file was never searched for"""
+
+        return self._discovery_time.get(file_name, 0.0)
+
+    def get_search_path(self) -> list[str]:
+        """Builds list of folders to check, in order of priority
+
+        Returns:
+            ABS-paths to folders to check, without duplicates"""
+
+        current_dir  = os.path.abspath(os.getcwd())
+        project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+        search_path = [current_dir, project_root]
 
-        # Move one directory up
         parent_dir = os.path.dirname(current_dir)
+        while parent_dir != current_dir:
+            search_path.append(parent_dir)
+            current_dir = parent_dir
+            parent_dir  = os.path.dirname(current_dir)
+
+        unique_dirs = []
+        for folder in search_path:
+            if folder not in unique_dirs:
+                unique_dirs.append(folder)
 
-        # If we reached the root directory, break the loop
-        if parent_dir == current_dir:
-            break
+        return unique_dirs
 
-        current_dir = parent_dir
+    def _discover(self,
+                  file_name: str) -> str:
+        """Checks environment variable and each folder from search path for the file
+
+        Args:
+            file_name: Name of the file to find
+        Returns:
+            ABS-path to file or empty string"""
+
+        from_env = self._check_env_var(file_name)
+        if from_env:
+            return from_env
+
+        for folder in self.get_search_path():
+            candidate = os.path.join(folder, file_name)
+            if os.path.isfile(candidate):
+                return candidate
+
+        return ''
+
+    def _check_env_var(self,
+                       file_name: str) -> str:
+        """Checks path from CONFIG_PATH_ENV_VAR
+
+        Args:
+            file_name: Name of the file to find, in case environment variable points to a folder
+        Returns:
+            ABS-path to file or empty string"""
+
+        env_path = os.environ.get(CONFIG_PATH_ENV_VAR, '')
+        if not env_path:
+            return ''
+
+        env_path = os.path.abspath(env_path)
+        if os.path.isdir(env_path):
+            env_path = os.path.join(env_path, file_name)
+
+        if os.path.isfile(env_path):
+            return env_path
+        return ''
+
+
+LOCATOR = FileLocator()
+"""Process-wide locator, so each file is searched for only once"""
+
+
+def find_my_file(file_to_find_name: str) -> str:
+    """Searches for file along the bounded search path of LOCATOR. Result is memoized per process
+
+    Args:
+        file_to_find_name: Name of the file you need to find
+    Returns:
+        Path to file or empty string"""
 
-    return ''
+    return LOCATOR.find(file_to_find_name)
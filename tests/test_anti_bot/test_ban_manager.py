@@ -0,0 +1,45 @@
+import time
+
+from unittest.mock import Mock
+
+from anti_bot.models import TrackedIp
+from anti_bot.ban_manager import BanManager
+
+
+class TestBanManager:
+    """Tests for BanManager"""
+
+    def test_pop_due(self):
+        """Only IPs with expired bans should be popped, outdated entries should be skipped"""
+
+        ban_manager = BanManager(Mock(), commands_per_sec=0)
+        now = time.time()
+
+        ips = []
+        for i, delta in enumerate([-20, -10, 100, -5]):
+            ip = TrackedIp(f'10.0.0.{i}', f'bot_{i}')
+            ip.banned      = True
+            ip.unban_me_at = now + delta
+            ban_manager.schedule_unban(ip)
+            ips.append(ip)
+
+        ips[3].save_unban()
+
+        assert ban_manager.pop_due() == [ips[0], ips[1]]
+        assert ban_manager.pop_due() == []
+        assert ban_manager.get_scheduled_count() == 1
+        ban_manager.stop()
+
+    def test_commands_are_not_blocking(self):
+        """Commands should be sent from sender's thread, remaining ones should be flushed on stop"""
+
+        server_comm = Mock()
+        ban_manager = BanManager(server_comm, commands_per_sec=10)
+
+        started = time.monotonic()
+        for i in range(50):
+            ban_manager.send(f'pardon-ip 10.0.0.{i}\n')
+        assert time.monotonic() - started < 0.5
+
+        ban_manager.stop(timeout=5)
+        assert server_comm.send_to_server.call_count == 50
@@ -0,0 +1,35 @@
+from anti_bot.commands_trie import CommandsTrie
+
+
+class TestCommandsTrie:
+    """Tests for CommandsTrie"""
+
+    def test_token_prefixes(self):
+        """Command should be forbidden, only if it starts with whole tokens of forbidden command"""
+
+        trie = CommandsTrie(['plugins', 'version grimac', 'tps'])
+
+        assert trie.is_forbidden('plugins')
+        assert trie.is_forbidden('PLUGINS  list')
+        assert trie.is_forbidden('version grimac')
+        assert trie.is_forbidden('version GrimAC now')
+        assert not trie.is_forbidden('version')
+        assert not trie.is_forbidden('version grim')
+        assert not trie.is_forbidden('tpsx')
+        assert not trie.is_forbidden('tell Player tps')
+        assert not trie.is_forbidden('   ')
+
+    def test_namespaces_and_aliases(self):
+        """Namespaced variants and aliases should be covered by a single forbidden command"""
+
+        trie = CommandsTrie(['plugins', 'ver grimac', 'minecraft:help'])
+
+        assert trie.is_forbidden('bukkit:plugins')
+        assert trie.is_forbidden('pl')
+        assert trie.is_forbidden('bukkit:pl')
+        assert trie.is_forbidden('version grimac')
+        assert trie.is_forbidden('about grimac')
+        assert trie.is_forbidden('minecraft:help')
+        assert trie.is_forbidden('minecraft:?')
+        assert not trie.is_forbidden('help')
+        assert not trie.is_forbidden('bukkit:help')
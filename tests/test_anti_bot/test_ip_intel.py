@@ -0,0 +1,81 @@
+import ipaddress
+
+import _pytest.monkeypatch
+
+from settings import settings
+from anti_bot import ip_intel
+from anti_bot.ip_intel import PrefixTree, IpIntel
+
+
+class TestPrefixTree:
+    """Tests for PrefixTree"""
+
+    def test_longest_prefix(self):
+        """The longest network, that contains address, should be found"""
+
+        tree = PrefixTree()
+        tree.insert(ipaddress.ip_network('10.0.0.0/8'), 'wide')
+        tree.insert(ipaddress.ip_network('10.1.2.0/24'), 'narrow')
+        tree.insert(ipaddress.ip_network('2001:db8::/48'), 'v6')
+
+        assert tree.lookup(ipaddress.ip_address('10.1.2.3'))[1] == 'narrow'
+        assert tree.lookup(ipaddress.ip_address('10.1.3.3'))[1] == 'wide'
+        assert tree.lookup(ipaddress.ip_address('11.1.2.3')) is None
+        assert tree.lookup(ipaddress.ip_address('2001:db8::1'))[1] == 'v6'
+        assert len(tree) == 3
+
+        assert tree.remove(ipaddress.ip_network('10.1.2.0/24'))
+        assert not tree.remove(ipaddress.ip_network('10.1.2.0/24'))
+        assert tree.lookup(ipaddress.ip_address('10.1.2.3'))[1] == 'wide'
+        assert len(tree.items()) == 2
+
+
+class TestIpIntel:
+    """Tests for IpIntel"""
+
+    def test_subnet_ban(self, monkeypatch: _pytest.monkeypatch.MonkeyPatch):
+        """Subnet should be banned after enough distinct IPs from it were kicked, and ban should expire"""
+
+        now = [1000.0]
+        monkeypatch.setattr(ip_intel.time, 'time', lambda: now[0])
+        monkeypatch.setattr(settings.antibot, 'RANGE_BAN_AFTER_IPS', 3)
+        monkeypatch.setattr(settings.antibot, 'BAN_IP_FOR_HOURS', 0)
+        monkeypatch.setattr(settings.antibot, 'BAN_IP_FOR_MINUTES', 0)
+        monkeypatch.setattr(settings.antibot, 'BAN_IP_FOR_SECONDS', 60)
+
+        intel = IpIntel()
+        assert intel.record_kick('1.2.3.4') is None
+        assert intel.record_kick('1.2.3.4') is None
+        assert intel.record_kick('1.2.3.5') is None
+        assert intel.record_kick('9.9.9.9') is None
+        assert str(intel.record_kick('1.2.3.6')) == '1.2.3.0/24'
+
+        assert str(intel.get_banned_subnet('1.2.3.200')) == '1.2.3.0/24'
+        assert intel.get_banned_subnet('1.2.4.1') is None
+        assert intel.get_banned_subnet('not an ip') is None
+
+        now[0] += 61
+        assert intel.get_banned_subnet('1.2.3.200') is None
+
+    def test_subnet_window(self, monkeypatch: _pytest.monkeypatch.MonkeyPatch):
+        """IPs kicked too long ago should not be counted, and only the most recently kicked subnets kept"""
+
+        now = [1000.0]
+        monkeypatch.setattr(ip_intel.time, 'time', lambda: now[0])
+        monkeypatch.setattr(settings.antibot, 'RANGE_BAN_AFTER_IPS', 3)
+        monkeypatch.setattr(settings.antibot, 'RANGE_BAN_WINDOW_SEC', 60)
+        monkeypatch.setattr(settings.antibot, 'RANGE_BAN_MAX_SUBNETS', 2)
+
+        intel = IpIntel()
+        assert intel.record_kick('1.2.3.4') is None
+        assert intel.record_kick('1.2.3.5') is None
+        now[0] += 61
+        assert intel.record_kick('1.2.3.6') is None
+        assert intel.record_kick('1.2.3.7') is None
+        assert str(intel.record_kick('1.2.3.5')) == '1.2.3.0/24'
+
+        assert intel.record_kick('5.5.5.1') is None
+        assert intel.record_kick('5.5.5.2') is None
+        assert intel.record_kick('6.6.6.1') is None
+        assert intel.record_kick('7.7.7.1') is None
+        assert intel.record_kick('5.5.5.3') is None
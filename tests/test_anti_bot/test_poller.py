@@ -0,0 +1,121 @@
+from unittest.mock import Mock
+
+from anti_bot.poller import CoordinatesPoller
+
+
+class TestCoordinatesPoller:
+    """Tests for CoordinatesPoller"""
+
+    def _get_commands(self,
+                      server_comm: Mock) -> list[str]:
+        """Collects and forgets commands, sent to server
+
+        Args:
+            server_comm: Mocked communicator
+        Returns:
+            Commands"""
+
+        commands = [call.args[0].strip() for call in server_comm.send_to_server.call_args_list]
+        server_comm.send_to_server.reset_mock()
+        return commands
+
+    def _confirm_tags(self,
+                      poller: CoordinatesPoller,
+                      server_comm: Mock) -> None:
+        """Replies 'Added tag' to all sent tag-commands
+
+        Args:
+            poller: Poller to reply to
+            server_comm: Mocked communicator"""
+
+        for command in self._get_commands(server_comm):
+            if command.startswith('tag ') and ' add ' in command:
+                _, user_name, _, tag = command.split()
+                poller.on_tag_added(user_name, tag)
+
+    def test_single_command_per_cycle(self):
+        """All tracked Users should be polled with a single command, tags should change only with tracked Users"""
+
+        server_comm = Mock()
+        poller = CoordinatesPoller(server_comm, park_after=0, parked_poll_every=1)
+        poll_command = 'execute as @a[tag=msm_tracked] at @s run tp @s ~ ~ ~'
+
+        poller.poll([f'Bot{i}' for i in range(300)])
+        commands = self._get_commands(server_comm)
+        assert commands.count(poll_command) == 1
+        assert len(commands) == 901
+        for i in range(300):
+            poller.on_tag_added(f'Bot{i}', 'msm_tracked')
+
+        poller.poll([f'Bot{i}' for i in range(1, 300)])
+        assert self._get_commands(server_comm) == ['tag Bot0 remove msm_tracked', poll_command]
+
+        poller.poll([])
+        assert len(self._get_commands(server_comm)) == 299
+        assert poller.get_polled_count() == (0, 0)
+
+    def test_tag_resent_until_confirmed(self):
+        """Tag should be re-sent on each cycle, until server confirms it, stale tags should be removed first"""
+
+        server_comm = Mock()
+        poller = CoordinatesPoller(server_comm, park_after=0, parked_poll_every=1)
+        tag_commands = ['tag Bot remove msm_parked', 'tag Bot remove msm_tracked', 'tag Bot add msm_tracked']
+
+        poller.poll(['Bot'])
+        assert self._get_commands(server_comm)[:3] == tag_commands
+        poller.poll(['Bot'])
+        assert self._get_commands(server_comm)[:3] == tag_commands
+
+        poller.on_tag_added('Bot', 'msm_parked')
+        poller.on_tag_added('Other', 'msm_tracked')
+        poller.poll(['Bot'])
+        assert self._get_commands(server_comm)[:3] == tag_commands
+
+        poller.on_tag_added('Bot', 'msm_tracked')
+        poller.poll(['Bot'])
+        assert self._get_commands(server_comm) == ['execute as @a[tag=msm_tracked] at @s run tp @s ~ ~ ~']
+
+    def test_parking(self):
+        """Not moving User should be polled rarely, until User moves"""
+
+        server_comm = Mock()
+        poller = CoordinatesPoller(server_comm, park_after=2, parked_poll_every=3)
+        poller.poll(['Bot'])
+        self._confirm_tags(poller, server_comm)
+
+        poller.on_coordinates('Bot', changed=True, in_spawn=False)
+        poller.on_coordinates('Bot', changed=False, in_spawn=False)
+        assert poller.get_polled_count() == (1, 0)
+        poller.on_coordinates('Bot', changed=False, in_spawn=False)
+        assert poller.get_polled_count() == (0, 1)
+        assert self._get_commands(server_comm) == ['tag Bot remove msm_tracked', 'tag Bot add msm_parked']
+
+        parked_polls = 0
+        for _ in range(6):
+            poller.poll(['Bot'])
+            parked_polls += self._get_commands(server_comm).count(
+                'execute as @a[tag=msm_parked] at @s run tp @s ~ ~ ~')
+        assert parked_polls == 2
+
+        poller.on_coordinates('Bot', changed=True, in_spawn=False)
+        assert poller.get_polled_count() == (1, 0)
+        assert self._get_commands(server_comm) == ['tag Bot remove msm_parked', 'tag Bot add msm_tracked']
+
+    def test_not_parked_in_spawn(self):
+        """User in spawn zones should never be parked, as static-checks need fresh coordinates"""
+
+        server_comm = Mock()
+        poller = CoordinatesPoller(server_comm, park_after=2, parked_poll_every=3)
+        poller.poll(['Bot'])
+        self._confirm_tags(poller, server_comm)
+
+        for _ in range(5):
+            poller.on_coordinates('Bot', changed=False, in_spawn=True)
+        assert poller.get_polled_count() == (1, 0)
+
+        poller.on_coordinates('Bot', changed=False, in_spawn=False)
+        poller.on_coordinates('Bot', changed=False, in_spawn=False)
+        assert poller.get_polled_count() == (0, 1)
+
+        poller.on_coordinates('Bot', changed=False, in_spawn=True)
+        assert poller.get_polled_count() == (1, 0)
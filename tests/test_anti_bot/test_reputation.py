@@ -0,0 +1,73 @@
+import time
+import _pytest.monkeypatch
+
+from pathlib import Path
+
+from settings import settings
+from anti_bot.models import TrackedIp, TrackedUser
+from anti_bot.storage import STORAGE
+from anti_bot.reputation import IpReputation
+
+
+class TestIpReputation:
+    """Tests for IpReputation"""
+
+    def test_blocklist(self, tmp_path: Path):
+        """IPs from blocklisted networks and single IPs should be rejected, invalid lines skipped"""
+
+        blocklist = tmp_path / 'blocklist.txt'
+        blocklist.write_text('# bad hosting\n'
+                             '203.0.113.0/24\n'
+                             '198.51.100.7  # single bot\n'
+                             'not an ip\n'
+                             '\n'
+                             '2001:db8::/32\n',
+                             encoding='utf-8')
+
+        reputation = IpReputation()
+        reputation.load_blocklist(str(blocklist))
+
+        assert reputation.get_reject_reason('203.0.113.200') == IpReputation.BLOCKLIST
+        assert reputation.get_reject_reason('198.51.100.7') == IpReputation.BLOCKLIST
+        assert reputation.get_reject_reason('2001:db8::1') == IpReputation.BLOCKLIST
+        assert reputation.get_reject_reason('198.51.100.8') is None
+        assert reputation.get_reject_reason('unknown') is None
+
+    def test_offender(self, monkeypatch: _pytest.monkeypatch.MonkeyPatch):
+        """IP should become an offender on the same conditions, that ban IPs during the cycle, till the next check"""
+
+        monkeypatch.setattr(settings.antibot, 'BAN_IP_IF_SINGLE_USER_KICKED_NUMBER', 3)
+        monkeypatch.setattr(settings.antibot, 'BAN_IP_IF_KICKED_USERS_NUMBER', 2)
+
+        users = {}
+        for name in ('bot_1', 'bot_2'):
+            users[name]      = TrackedUser()
+            users[name].name = name
+            users[name].ip   = '10.0.0.1'
+        monkeypatch.setattr(STORAGE, 'get_user', lambda name: users.get(name))
+        monkeypatch.setattr(STORAGE, 'get_all_users', lambda: list(users.values()))
+
+        reputation = IpReputation()
+        tracked_ip = TrackedIp('10.0.0.1', 'bot_1')
+        users['bot_1'].kicked_count = 2
+        reputation.on_kick(tracked_ip)
+        assert reputation.get_reject_reason('10.0.0.1') is None
+
+        users['bot_1'].kicked_count = 3
+        reputation.on_kick(tracked_ip)
+        assert reputation.get_reject_reason('10.0.0.1') == IpReputation.OFFENDER
+
+        reputation.drop_offenders(marked_before=time.time() + 1)
+        assert reputation.get_reject_reason('10.0.0.1') is None
+
+        users['bot_1'].kicked_count = 1
+        tracked_ip.add_kicked_user('bot_2')
+        reputation.on_kick(tracked_ip)
+        assert reputation.get_reject_reason('10.0.0.1') is None
+
+        users['bot_2'].kicked_count = 1
+        reputation.on_kick(tracked_ip)
+        assert reputation.get_reject_reason('10.0.0.1') == IpReputation.OFFENDER
+
+        reputation.drop_offenders(marked_before=time.time() - 60)
+        assert reputation.get_reject_reason('10.0.0.1') == IpReputation.OFFENDER
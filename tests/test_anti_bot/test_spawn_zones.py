@@ -0,0 +1,76 @@
+import numpy as np
+
+from anti_bot.models import TrackedUser, Coordinates
+from anti_bot.detector import Detector
+from anti_bot.spawn_zones import SpawnZones
+
+
+class TestSpawnZones:
+    """Tests for SpawnZones"""
+
+    def _make_user(self,
+                   name: str,
+                   initial: tuple[int, int] | None,
+                   last: tuple[int, int] | None) -> TrackedUser:
+        """Creates User with coordinates
+
+        Args:
+            name: Name of the User
+            initial: Initial (x, z)
+            last: Last known (x, z)
+        Returns:
+            User"""
+
+        user = TrackedUser()
+        user.name = name
+        if initial:
+            user.initial_coordinates = Coordinates(initial[0], 80, initial[1])
+        if last:
+            user.last_know_coords = Coordinates(last[0], 80, last[1])
+        return user
+
+    def test_membership(self):
+        """Rectangles, points and polygons should be tested with inclusive bounds"""
+
+        zones = SpawnZones(areas=[[0, 10, 0, 10], [100, 110, 100, 110]],
+                           points=[[5, 5]],
+                           polygons=[[[200, 200], [220, 200], [200, 220]]])
+
+        xz = np.array([[0, 10], [105, 100], [11, 5], [205, 205], [219, 219], [np.nan, np.nan]])
+
+        assert zones.in_areas(xz).tolist() == [True, True, False, True, False, False]
+        assert zones.in_points(xz).tolist() == [False, False, False, False, False, False]
+        assert zones.is_in_point(Coordinates(6, 0, 4))
+        assert not zones.is_in_point(Coordinates(7, 0, 5))
+        assert zones.is_in_area(Coordinates(201, 0, 201))
+
+    def test_snapshot(self):
+        """Snapshot should test initial and last coordinates of all Users at once"""
+
+        zones = SpawnZones(areas=[[0, 10, 0, 10]], points=[[5, 5]])
+        users = [self._make_user('Static', (5, 5), (5, 5)),
+                 self._make_user('Walker', (5, 5), (8, 8)),
+                 self._make_user('Runner', (5, 5), (50, 8)),
+                 self._make_user('Outsider', (50, 50), None)]
+
+        snapshot = zones.take_snapshot(users)
+
+        assert [snapshot.is_in_point(user) for user in users] == [True, False, False, None]
+        assert [snapshot.is_in_area(user) for user in users] == [True, True, False, None]
+        assert [snapshot.has_moved(user) for user in users] == [False, True, True, None]
+        assert [snapshot.is_initial_in_area(user) for user in users] == [True, True, True, False]
+        assert snapshot.is_in_area(self._make_user('Unknown', (5, 5), (5, 5))) is None
+
+    def test_coordinates_after_snapshot(self):
+        """Coordinates, that came after snapshot was taken, should not be judged by it"""
+
+        detector = Detector()
+        detector.zones = SpawnZones(areas=[[0, 10, 0, 10]], points=[[5, 5]])
+        user = self._make_user('Late', (5, 5), None)
+
+        snapshot = detector.take_snapshot([user])
+        user.last_know_coords = Coordinates(5, 80, 5)
+        detector._check_user_movement(user, snapshot)
+
+        assert not user.left_spawn
+        assert not user.moved
@@ -7,6 +7,7 @@ from unittest.mock import MagicMock
 from _pytest.monkeypatch import MonkeyPatch
 
 from file_transfer.backuper import FileBackuper
+from file_transfer.throttle import BackupThrottle
 
 
 class TestFileBackuper:
@@ -74,3 +75,36 @@ class TestFileBackuper:
 
         expected_file = temp_dest / "world1" / "level.dat"
         assert expected_file.exists()
+
+    def test_zip_throttled(self,
+                           mock_settings: MagicMock,
+                           tmp_path: Path):
+        """Zipping should pause between files while server lags, but not longer than allowed
+
+        Args:
+            mock_settings: Mock for settings
+            tmp_path: Path to a temp folder for testing"""
+
+        checks = []
+
+        def is_lagging() -> bool:
+            """Server lags on the first two checks"""
+
+            checks.append(True)
+            return len(checks) <= 2
+
+        temp_dest = tmp_path / "manual_temp"
+        zip_path  = tmp_path / "backup.zip"
+        backuper  = FileBackuper()
+        backuper._copy_backups_to_temp_location(str(temp_dest), mock_settings.TO_BACKUP)
+
+        throttle = BackupThrottle(is_lagging, pause=0.01, max_pause=1)
+        backuper._zip_folders(str(temp_dest), str(zip_path), throttle)
+        assert abs(throttle.get_paused_seconds() - 0.02) < 1e-9
+        with zipfile.ZipFile(zip_path) as zipf:
+            assert zipf.namelist() == [os.path.join("world1", "level.dat").replace(os.sep, "/")]
+
+        stuck = BackupThrottle(lambda: True, pause=0.01, max_pause=0.05)
+        stuck.wait_if_lagging()
+        stuck.wait_if_lagging()
+        assert stuck.get_paused_seconds() < 0.06
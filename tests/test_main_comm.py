@@ -0,0 +1,63 @@
+import time
+import threading
+
+from main_comm import MainComm
+
+
+class TestMainComm:
+    """Tests for MainComm"""
+
+    def test_flags_are_topics(self):
+        """Flags should keep working as attributes and be published and cleared as topics"""
+
+        main_comm = MainComm()
+        assert main_comm.trayer_running
+        assert not main_comm.backup_now_trigger
+
+        main_comm.backup_now_trigger = True
+        assert main_comm.is_set(MainComm.BACKUP_REQUESTED)
+        main_comm.trayer_running = False
+        assert main_comm.is_set(MainComm.TRAYER_STOPPED)
+
+        main_comm.clear(MainComm.BACKUP_REQUESTED)
+        assert not main_comm.backup_now_trigger
+
+    def test_subscription(self):
+        """Subscriber should get each publication once, backup should be reported done, once its flag is cleared"""
+
+        main_comm = MainComm()
+        events    = main_comm.subscribe(MainComm.BACKUP_REQUESTED, MainComm.BACKUP_DONE, MainComm.ERROR)
+
+        main_comm.backup_now_trigger = True
+        main_comm.backup_now_trigger = True
+        assert events.wait(timeout=0) == [MainComm.BACKUP_REQUESTED]
+        assert events.wait(timeout=0) == []
+
+        main_comm.backup_now_trigger = False
+        main_comm.backup_now_trigger = False
+        main_comm.set_error('Something broke')
+        assert events.wait(timeout=0) == [MainComm.BACKUP_DONE, MainComm.ERROR]
+        assert 'Something broke' in main_comm.errors
+
+    def test_wakes_up_waiting_thread(self):
+        """Thread, blocked on topic, should wake up right after it is published"""
+
+        main_comm = MainComm()
+        woken_at  = []
+
+        def wait_for_stop() -> None:
+            """Waits for stop and remembers when"""
+
+            main_comm.wait(MainComm.STOP_SERVER, timeout=5)
+            woken_at.append(time.monotonic())
+
+        thread = threading.Thread(target=wait_for_stop)
+        thread.start()
+        time.sleep(0.05)
+        stopped_at = time.monotonic()
+        main_comm.stop_server = True
+        thread.join(timeout=5)
+
+        assert woken_at and woken_at[0] - stopped_at < 0.5
+        assert main_comm.wait_cleared(MainComm.DRAW_PLOT, timeout=0)
+        assert not main_comm.wait(MainComm.DRAW_PLOT, timeout=0.01)
@@ -0,0 +1,71 @@
+import urllib.request
+
+import pytest
+
+from metrics.exporter import MetricsExporter
+from metrics.registry import MetricsRegistry, Histogram
+
+
+class TestHistogram:
+    """Tests for Histogram"""
+
+    def test_percentiles(self):
+        """Percentiles should be within relative error of a bucket"""
+
+        histogram = Histogram()
+        for micros in range(1, 10_001):
+            histogram.observe(micros / 1_000_000)
+
+        assert histogram.get_count() == 10_000
+        for percent, expected in ((50, 0.005), (90, 0.009), (99, 0.0099)):
+            assert abs(histogram.get_percentile(percent) - expected) / expected < 1 / Histogram.SUB_BUCKETS
+        assert histogram.get_percentile(100) == 0.01
+
+    def test_buckets_cover_values(self):
+        """Upper bound of bucket should be the biggest value, that falls into it"""
+
+        for micros in (0, 1, 15, 16, 17, 31, 32, 33, 1000, 123_456, Histogram.MAX_MICROS):
+            index = Histogram._get_index(micros)
+            assert micros <= Histogram._get_upper_micros(index)
+            assert Histogram._get_index(Histogram._get_upper_micros(index)) == index
+            assert Histogram._get_index(Histogram._get_upper_micros(index) + 1) == index + 1
+
+
+class TestMetricsRegistry:
+    """Tests for MetricsRegistry and MetricsExporter"""
+
+    def test_render(self):
+        """Metrics should be rendered in Prometheus text format, one family per name"""
+
+        registry = MetricsRegistry()
+        registry.counter('lines_total', 'Lines').inc(3)
+        registry.gauge('queue', 'Queue').set_function(lambda: 7)
+        registry.histogram('phase_seconds', 'Phases', phase='poll').observe(0.002)
+        registry.histogram('phase_seconds', 'Phases', phase='ips').observe(20)
+        assert registry.counter('lines_total', 'Lines').get() == 3
+
+        text = registry.render()
+        assert '# TYPE lines_total counter\nlines_total 3' in text
+        assert 'queue 7' in text
+        assert text.count('# TYPE phase_seconds histogram') == 1
+        assert 'phase_seconds_bucket{phase="poll",le="0.0025"} 1' in text
+        assert 'phase_seconds_bucket{phase="ips",le="10"} 0' in text
+        assert 'phase_seconds_bucket{phase="ips",le="30"} 1' in text
+        assert 'phase_seconds_count{phase="ips"} 1' in text
+
+        with pytest.raises(ValueError):
+            registry.gauge('lines_total', 'Lines')
+
+    def test_exporter(self):
+        """Metrics should be served over HTTP"""
+
+        registry = MetricsRegistry()
+        registry.counter('scrapes_total', 'Scrapes').inc()
+        exporter = MetricsExporter('127.0.0.1', 0, registry)
+        exporter.start()
+        try:
+            url = f'http://127.0.0.1:{exporter.get_port()}/metrics'
+            with urllib.request.urlopen(url, timeout=5) as response:
+                assert 'scrapes_total 1' in response.read().decode('utf-8')
+        finally:
+            exporter.stop()
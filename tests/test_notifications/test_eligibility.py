@@ -0,0 +1,67 @@
+from notifications.eligibility import EligibilityIndex
+from notifications.models import NotificationsCatalogue, User
+
+
+class TestEligibilityIndex:
+    """Tests for EligibilityIndex"""
+
+    def _make_catalogue(self) -> NotificationsCatalogue:
+        """Creates catalogue with 3 announcements
+
+        Returns:
+            Catalogue"""
+
+        data = []
+        for notification_id in ('a', 'b', 'c'):
+            data.append({'id': notification_id, 'max_views': 2, 'header': {'en': 'H'}, 'body': {'en': 'B'}})
+        return NotificationsCatalogue(data)
+
+    def _view(self,
+              index: EligibilityIndex,
+              catalogue: NotificationsCatalogue,
+              user: User) -> str | None:
+        """Selects announcement and counts view, same as Notificator does
+
+        Args:
+            index: Index to select with
+            catalogue: Catalogue to select from
+            user: User to select for
+        Returns:
+            ID of selected announcement"""
+
+        announcement = index.get_next_announcement(catalogue, user)
+        if announcement is None:
+            return None
+        if announcement.id in user.seen_announcements:
+            user.seen_announcements[announcement.id].times_seen += 1
+        else:
+            user.add_new_seen_notification(announcement)
+        index.on_view(catalogue, user, announcement)
+        return announcement.id
+
+    def test_pointer_advances(self):
+        """Announcements should be shown in order, each max_views times"""
+
+        index     = EligibilityIndex()
+        catalogue = self._make_catalogue()
+        user      = User('Player', [{'id': 'a', 'times_seen': 2}])
+
+        shown = [self._view(index, catalogue, user) for _ in range(5)]
+
+        assert shown == ['b', 'b', 'c', 'c', None]
+
+    def test_pointers_dropped_on_new_catalogue(self):
+        """New catalogue should be checked from the start"""
+
+        index = EligibilityIndex()
+        user  = User('Player', [])
+        catalogue = self._make_catalogue()
+        for _ in range(6):
+            self._view(index, catalogue, user)
+        assert index.get_next_announcement(catalogue, user) is None
+
+        new_catalogue = NotificationsCatalogue(
+            [{'id': 'new', 'max_views': 1, 'header': {'en': 'H'}, 'body': {'en': 'B'}}]
+        )
+
+        assert index.get_next_announcement(new_catalogue, user).id == 'new'
@@ -1,16 +1,33 @@
 import json
+import shutil
+import sqlite3
+import pytest
+
 from pathlib import Path
+from _pytest.monkeypatch import MonkeyPatch
 
 from notifications.notificator import Notificator
 from settings import settings
 
 
 class TestNotificator:
+    @pytest.fixture(autouse=True)
+    def _copy_fixtures(self,
+                       tmp_path: Path,
+                       monkeypatch: MonkeyPatch):
+        """Copies fixtures into tmp_path, so tests never change tracked files, and restores settings after test"""
+
+        self._fixtures_folder = tmp_path / 'fixtures'
+        shutil.copytree(Path(__file__).parent / 'fixtures', self._fixtures_folder)
+
+        monkeypatch.setattr(settings.notifications, 'ACTIVATED', settings.notifications.ACTIVATED)
+        monkeypatch.setattr(settings.paths, 'MESSAGES', settings.paths.MESSAGES)
+        monkeypatch.setattr(settings.paths, 'USERS_DATA', settings.paths.USERS_DATA)
+
     def _get_fixtures_path(self) -> tuple[Path, Path]:
         """"""
 
-        test_notifications_folder = Path(__file__).parent
-        fixtures_folder = test_notifications_folder / 'fixtures'
+        fixtures_folder = self._fixtures_folder
         notifications_data_json_path = fixtures_folder / 'notifications_data.json'
         user_data_json_path = fixtures_folder / 'user_data.json'
 
@@ -106,6 +123,7 @@ class TestNotificator:
         message_6 = notificator.get_login_message('OtherPlayer')
         assert message_6 == '{"text": "T1\\nText 1"}'
 
+        notificator.flush()
         notifications_data_json_path, user_data_json_path = self._get_fixtures_path()
         with open(user_data_json_path, 'rb') as f:
             actual_data = json.load(f)
@@ -144,6 +162,7 @@ class TestNotificator:
         message_1 = notificator.get_login_message('NewPlayer')
         assert message_1 == '{"text": "Server Speed up\\nServer is now 10x faster"}'
 
+        notificator.flush()
         notifications_data_json_path, user_data_json_path = self._get_fixtures_path()
         with open(user_data_json_path, 'rb') as f:
             actual_data = json.load(f)
@@ -228,6 +247,83 @@ class TestNotificator:
                 }
             ]
         }
+        notificator.flush()
         with open(user_data_json_path, 'rb') as f:
             actual_data = json.load(f)
         assert actual_data == expected_data
+
+    def test_users_not_written_before_flush(self):
+        """"""
+
+        self._fill_fixtures()
+        self._prepare_settings()
+        notificator = Notificator()
+        notifications_data_json_path, user_data_json_path = self._get_fixtures_path()
+        with open(user_data_json_path, 'rb') as f:
+            data_before = json.load(f)
+
+        notificator.get_login_message('PlayerOne')
+        with open(user_data_json_path, 'rb') as f:
+            assert json.load(f) == data_before
+
+        notificator.flush()
+        with open(user_data_json_path, 'rb') as f:
+            assert json.load(f)['PlayerOne'][0]['times_seen'] == 5
+
+    def test_messages_reloaded_on_change(self):
+        """"""
+
+        self._fill_fixtures()
+        self._prepare_settings()
+        notificator = Notificator()
+
+        message_1 = notificator.get_login_message('OtherPlayer')
+        assert message_1 == '{"text": "T1\\nText 1"}'
+
+        notifications_data_json_path, user_data_json_path = self._get_fixtures_path()
+        new_notifications = [
+            {
+                "id": "new_event",
+                "max_views": 1,
+                "header": {"en": "Event", "ru": "Событие"},
+                "body": {"en": "New event", "ru": "Новое событие"}
+            }
+        ]
+        with open(notifications_data_json_path, 'w', encoding='utf-8') as f:
+            json.dump(new_notifications, f, indent=4, ensure_ascii=False)
+
+        message_2 = notificator.get_login_message('OtherPlayer')
+        assert message_2 == '{"text": "Event\\nNew event"}'
+
+    def test_sqlite_storage(self,
+                            tmp_path: Path,
+                            monkeypatch: MonkeyPatch):
+        """"""
+
+        self._fill_fixtures()
+        self._prepare_settings()
+        db_path = tmp_path / 'test.db'
+        monkeypatch.setattr('settings.settings.notifications.USERS_STORAGE', 'sqlite')
+        monkeypatch.setattr('settings.settings.paths.DB', str(db_path))
+        notificator = Notificator()
+
+        # Data was migrated from JSON, so PlayerOne has only one view of speed_up left
+        message_1 = notificator.get_login_message('PlayerOne')
+        assert message_1 == '{"text": "Server Speed up\\nServer is now 10x faster"}'
+        message_2 = notificator.get_login_message('PlayerOne')
+        assert message_2 == '{"text": "T1\\nText 1"}'
+
+        message_3 = notificator.get_login_message('NewPlayer')
+        assert message_3 == '{"text": "Server Speed up\\nServer is now 10x faster"}'
+        notificator.stop()
+
+        conn = sqlite3.connect(db_path)
+        rows = conn.execute('SELECT user_name, notification_id, times_seen FROM user_notifications').fetchall()
+        conn.close()
+        assert sorted(rows) == [
+            ('NewPlayer', 'speed_up', 1),
+            ('OtherPlayer', 'something_else', 1),
+            ('OtherPlayer', 'speed_up', 5),
+            ('PlayerOne', 'something_else', 2),
+            ('PlayerOne', 'speed_up', 5),
+        ]
@@ -0,0 +1,50 @@
+from pathlib import Path
+
+import pytest
+
+from server_communicator.raw_log_sink import RawLogSink
+
+
+class TestRawLogSink:
+    """Tests for RawLogSink"""
+
+    def test_buffered_and_rotated(self, tmp_path: Path):
+        """Lines should be written as is, buffered till flush, and files should be rotated by size"""
+
+        path = tmp_path / 'minecraft.log'
+        sink = RawLogSink(str(path), max_bytes=100, backups=2, buffer_size=4096, flush_interval=60)
+        line = b'[12:00:00 INFO]: Teleported Name to 1.0, 2.0, 3.0\n'
+
+        sink.write(line)
+        assert path.read_bytes() == b''
+        sink.flush()
+        assert path.read_bytes() == line
+
+        for _ in range(10):
+            sink.write(line)
+        sink.close()
+
+        assert sorted(p.name for p in tmp_path.iterdir()) == ['minecraft.log', 'minecraft.log.1', 'minecraft.log.2']
+        assert path.with_name('minecraft.log.1').read_bytes() == line * 2
+
+    def test_filtered_and_sampled(self, tmp_path: Path):
+        """Filtered mode should keep only interesting lines, sampled mode should add every N-th of others"""
+
+        noise = b'[12:00:00 INFO]: Teleported Name to 1.0, 2.0, 3.0\n'
+        login = b'[12:00:00 INFO]: Name[/127.0.0.1:5000] logged in with entity id 1 at ([world]1.0, 2.0, 3.0)\n'
+
+        for mode, expected in (('filtered', login), ('sampled', login + noise), ('off', None)):
+            path = tmp_path / f'{mode}.log'
+            sink = RawLogSink(str(path), mode=mode, sample_every=3)
+            sink.write(noise)
+            sink.write(login)
+            sink.write(noise)
+            sink.write(noise)
+            sink.close()
+            if expected is None:
+                assert not path.exists()
+            else:
+                assert path.read_bytes() == expected
+
+        with pytest.raises(ValueError):
+            RawLogSink(str(tmp_path / 'bad.log'), mode='verbose')
@@ -0,0 +1,53 @@
+import time
+import threading
+
+from server_communicator.scheduler import DelayedJobsScheduler
+
+
+class TestDelayedJobsScheduler:
+    """Tests for DelayedJobsScheduler"""
+
+    def test_jobs_executed_in_due_order(self):
+        """Jobs should be executed after delay, the closest first"""
+
+        scheduler = DelayedJobsScheduler()
+        scheduler.start()
+        executed = []
+        done = threading.Event()
+
+        scheduler.schedule('late', 0.2, lambda: (executed.append('late'), done.set()))
+        scheduler.schedule('early', 0.05, executed.append, 'early')
+
+        assert done.wait(2)
+        assert executed == ['early', 'late']
+        scheduler.stop()
+
+    def test_same_key_replaces_pending_job(self):
+        """Fast re-login should produce a single job"""
+
+        scheduler = DelayedJobsScheduler()
+        scheduler.start()
+        executed = []
+
+        scheduler.schedule('Player', 0.05, executed.append, 'first')
+        scheduler.schedule('Player', 0.1, executed.append, 'second')
+        assert scheduler.get_pending_count() == 1
+
+        time.sleep(0.3)
+        assert executed == ['second']
+        scheduler.stop()
+
+    def test_cancelled_job_not_executed(self):
+        """Cancelled job should never run"""
+
+        scheduler = DelayedJobsScheduler()
+        scheduler.start()
+        executed = []
+
+        scheduler.schedule('Player', 0.05, executed.append, 'welcome')
+        assert scheduler.cancel('Player') is True
+        assert scheduler.cancel('Player') is False
+
+        time.sleep(0.2)
+        assert executed == []
+        scheduler.stop()
@@ -0,0 +1,87 @@
+import os
+import sqlite3
+
+from pathlib import Path
+
+from server_health.gc_log import GcAdvisor, GcLogParser, GcLogTailer
+
+
+LOG_LINES = [
+    '[0.012s][info][gc,init] Heap Region Size: 1M',
+    '[1.000s][info][gc,start    ] GC(0) Pause Young (Normal) (G1 Evacuation Pause)',
+    '[1.000s][info][gc          ] GC(0) Pause Young (Normal) (G1 Evacuation Pause) 300M->100M(4096M) 10.000ms',
+    '[3.000s][info][gc          ] GC(1) Pause Young (Normal) (G1 Evacuation Pause) 500M->120M(4096M) 20,000ms',
+    '[4.000s][info][gc          ] GC(2) Pause Young (Concurrent Start) (G1 Humongous Allocation) '
+    '320M->150M(4096M) 80.000ms',
+    '[4.500s][info][gc          ] GC(2) Concurrent Mark Cycle 120.000ms',
+]
+
+
+class TestGcLogParser:
+    """Tests for GcLogParser and GcAdvisor"""
+
+    def test_aggregates(self):
+        """Pauses, allocation rate and heap after GC should be aggregated, concurrent phases should be skipped"""
+
+        parser = GcLogParser()
+        for line in LOG_LINES:
+            parser.parse_line(line)
+
+        total = parser.get_total()
+        assert total.pauses.get_count() == 3
+        assert abs(total.pause_seconds - 0.11) < 1e-9
+        assert total.humongous == 1
+        assert list(total.heap_after_bytes) == [100 * 2 ** 20, 120 * 2 ** 20, 150 * 2 ** 20]
+        # (500M - 100M) + (320M - 120M) allocated over 3 seconds
+        assert total.get_alloc_rate() == 600 * 2 ** 20 / 3
+        assert parser.get_region_bytes() == 2 ** 20
+
+        assert parser.pop_window().pauses.get_count() == 3
+        assert parser.pop_window().pauses.get_count() == 0
+
+    def test_report(self):
+        """Report should recommend smaller heap, bigger regions and a pause target within a tick"""
+
+        parser = GcLogParser()
+        assert 'no pauses' in GcAdvisor.get_report(parser, max_pause_ms=200)
+
+        for line in LOG_LINES:
+            parser.parse_line(line)
+        report = GcAdvisor.get_report(parser, max_pause_ms=200)
+
+        assert 'MAX_MEM of 1G' in report
+        assert '-XX:G1HeapRegionSize=2M (now 1M)' in report
+        assert 'p99 pause is above a tick' in report
+
+
+class TestGcLogTailer:
+    """Tests for GcLogTailer"""
+
+    def test_tail_and_rotation(self, tmp_path: Path):
+        """Only complete lines should be parsed, rotated log should be followed, rollup should be stored"""
+
+        path    = tmp_path / 'gc.log'
+        db_path = str(tmp_path / 'db.sqlite')
+        tailer  = GcLogTailer(str(path), db_path)
+        assert '-Xlog:gc*:file="' in GcLogTailer.get_java_flag(str(path))
+
+        tailer.read_new_lines()
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(LOG_LINES[2] + '\n' + LOG_LINES[3][:40])
+        tailer.read_new_lines()
+        assert tailer.get_parser().get_total().pauses.get_count() == 1
+
+        with open(path, 'a', encoding='utf-8') as file:
+            file.write(LOG_LINES[3][40:] + '\n')
+        tailer.read_new_lines()
+        assert tailer.get_parser().get_total().pauses.get_count() == 2
+
+        os.replace(path, tmp_path / 'gc.log.0')
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(LOG_LINES[4] + '\n')
+        tailer.stop()
+        assert tailer.get_parser().get_total().pauses.get_count() == 3
+
+        with sqlite3.connect(db_path) as conn:
+            assert conn.execute('SELECT pauses FROM gc_rollups').fetchall() == [(3,)]
+        conn.close()
@@ -0,0 +1,105 @@
+import os
+import time
+import sqlite3
+
+from pathlib import Path
+
+from main_comm import MainComm
+from server_health.jvm_monitor import JvmMonitor, SamplesRing
+
+
+class TestSamplesRing:
+    """Tests for SamplesRing"""
+
+    def test_overwrites_oldest(self):
+        """Ring should keep only the latest samples, the oldest first"""
+
+        ring = SamplesRing(3)
+        for index in range(5):
+            ring.append(float(index), index * 10.0, index * 100, index)
+
+        assert len(ring) == 3
+        assert ring.get_last(10) == [(2.0, 20.0, 200, 2), (3.0, 30.0, 300, 3), (4.0, 40.0, 400, 4)]
+        assert ring.get_last(1) == [(4.0, 40.0, 400, 4)]
+
+
+class TestJvmMonitor:
+    """Tests for JvmMonitor"""
+
+    @staticmethod
+    def _get_monitor(main_comm: MainComm,
+                     last_output_at: list[float],
+                     db_path: str = '') -> JvmMonitor:
+        """Creates monitor for the current process
+
+        Args:
+            main_comm: Communicator to report errors into
+            last_output_at: Single-item list with time (monotonic) of the last output
+            db_path: ABS-path to DB
+        Returns:
+            Monitor"""
+
+        return JvmMonitor(os.getpid(),
+                          main_comm,
+                          lambda: last_output_at[0],
+                          interval=60,
+                          ring_size=10,
+                          stall_seconds=30,
+                          stall_cpu_percent=0,
+                          max_rss_bytes=0,
+                          db_path=db_path,
+                          db_batch=2)
+
+    def test_stall_reported_once(self):
+        """Silent server with busy CPU should be reported once per stall"""
+
+        main_comm      = MainComm()
+        last_output_at = [time.monotonic()]
+        monitor        = self._get_monitor(main_comm, last_output_at)
+
+        monitor.sample()
+        assert not monitor.is_stalled()
+        assert main_comm.errors == 'All good!'
+
+        last_output_at[0] -= 60
+        monitor.sample()
+        assert monitor.is_stalled()
+        assert 'No output from server' in main_comm.errors
+
+        main_comm.errors = 'All good!'
+        monitor.sample()
+        assert main_comm.errors == 'All good!'
+
+        last_output_at[0] = time.monotonic()
+        monitor.sample()
+        assert not monitor.is_stalled()
+        assert len(monitor.get_samples(10)) == 4
+
+    def test_memory_alert_and_db(self, tmp_path: Path):
+        """RSS above limit should be reported, samples should be written into DB in batches"""
+
+        main_comm = MainComm()
+        db_path   = str(tmp_path / 'db.sqlite')
+        monitor   = self._get_monitor(main_comm, [time.monotonic()], db_path)
+        monitor._max_rss_bytes = 1
+
+        monitor.sample()
+        assert 'memory' in main_comm.errors
+        assert not os.path.exists(db_path)
+
+        monitor.sample()
+        monitor.sample()
+        monitor.stop()
+        with sqlite3.connect(db_path) as conn:
+            assert conn.execute('SELECT COUNT(*) FROM jvm_samples').fetchone()[0] == 3
+        conn.close()
+
+    def test_keeps_looking_for_java(self):
+        """Launcher should be sampled, until java is started, but not remembered instead of java"""
+
+        monitor = self._get_monitor(MainComm(), [time.monotonic()])
+
+        monitor.sample()
+        monitor.sample()
+        assert len(monitor.get_samples(10)) == 2
+        assert monitor._process is None
@@ -0,0 +1,53 @@
+import os
+import time
+import threading
+
+from pathlib import Path
+
+from server_health.startup import CdsArchive, StartupTracker
+
+
+class TestCdsArchive:
+    """Tests for CdsArchive"""
+
+    def test_dumped_then_used(self, tmp_path: Path):
+        """Archive should be dumped, if missing or older than jar, and used otherwise"""
+
+        jar     = tmp_path / 'server.jar'
+        archive = tmp_path / 'server.jsa'
+        jar.write_bytes(b'jar')
+        cds = CdsArchive(str(archive), str(jar))
+
+        assert cds.get_java_flags() == [f'-XX:ArchiveClassesAtExit={archive}']
+
+        archive.write_bytes(b'classes')
+        assert cds.is_usable()
+        assert cds.get_java_flags() == [f'-XX:SharedArchiveFile={archive}']
+
+        os.utime(jar, (time.time() + 10, time.time() + 10))
+        assert cds.get_java_flags() == [f'-XX:ArchiveClassesAtExit={archive}']
+        assert not archive.exists()
+
+
+class TestStartupTracker:
+    """Tests for StartupTracker"""
+
+    def test_ready_and_recorded(self, tmp_path: Path):
+        """Readiness should be set on 'Done' line, startups should be recorded and averaged by archive usage"""
+
+        db_path = str(tmp_path / 'db.sqlite')
+        for with_cds in (False, True):
+            ready   = threading.Event()
+            tracker = StartupTracker(ready, db_path, with_cds)
+
+            tracker.check_line('[12:00:00 INFO]: Preparing level "world"')
+            assert not ready.is_set()
+            assert tracker.get_startup_seconds() is None
+
+            tracker.check_line('[12:00:03 INFO]: Done (3.142s)! For help, type "help"')
+            assert ready.is_set()
+            assert tracker.get_startup_seconds() is not None
+
+        assert tracker.get_average_seconds(with_cds=True) is not None
+        assert tracker.get_average_seconds(with_cds=False) is not None
+        assert StartupTracker(threading.Event(), '', False).get_average_seconds(with_cds=True) is None
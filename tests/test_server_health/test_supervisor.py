@@ -0,0 +1,77 @@
+import sys
+import time
+import subprocess
+
+from pathlib import Path
+
+from main_comm import MainComm
+from server_health.supervisor import ServerSupervisor
+
+
+class TestServerSupervisor:
+    """Tests for ServerSupervisor"""
+
+    @staticmethod
+    def _wait_for_crash(supervisor: ServerSupervisor) -> bool:
+        """Waits for watcher to notice exit
+
+        Args:
+            supervisor: Supervisor to check
+        Returns:
+            True, if crash was noticed"""
+
+        for _ in range(100):
+            if supervisor.has_crashed():
+                return True
+            time.sleep(0.05)
+        return False
+
+    def test_backoff_and_crash_loop(self, tmp_path: Path):
+        """Restarts should be delayed more with every crash, crash loop should stop restarts"""
+
+        main_comm  = MainComm()
+        supervisor = ServerSupervisor(main_comm, str(tmp_path), backoff=10, max_backoff=25,
+                                      crash_loop_window=60, crash_loop_count=4)
+
+        delays = []
+        for _ in range(4):
+            supervisor.watch(subprocess.Popen([sys.executable, '-c', 'import sys; sys.exit(3)']))
+            assert self._wait_for_crash(supervisor)
+            delays.append(supervisor.handle_crash(['[12:00:00 ERROR]: Exception in server tick loop']))
+            assert not supervisor.has_crashed()
+
+        assert delays == [10, 20, 25, None]
+        assert 'will not be restarted' in main_comm.errors
+
+        reports = sorted(tmp_path.iterdir())
+        assert reports
+        text = reports[-1].read_text(encoding='utf-8')
+        assert 'Exit code: 3' in text
+        assert 'Exception in server tick loop' in text
+
+    def test_expected_exit(self, tmp_path: Path):
+        """Exit, caused by manager, should not count as crash"""
+
+        supervisor = ServerSupervisor(MainComm(), str(tmp_path), backoff=10, max_backoff=25,
+                                      crash_loop_window=60, crash_loop_count=4)
+        proc = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(0.2)'])
+        supervisor.watch(proc)
+        supervisor.expect_exit()
+        proc.wait()
+        time.sleep(0.3)
+
+        assert not supervisor.has_crashed()
+
+    def test_stop_command(self, tmp_path: Path):
+        """Clean exit after 'Stopping server' should not count as crash, failed exit after it should"""
+
+        supervisor = ServerSupervisor(MainComm(), str(tmp_path), backoff=10, max_backoff=25,
+                                      crash_loop_window=60, crash_loop_count=4)
+        supervisor.watch(subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(0.2)']))
+        supervisor.check_line('[12:00:00 INFO]: Stopping server')
+        time.sleep(0.5)
+        assert not supervisor.has_crashed()
+
+        supervisor.watch(subprocess.Popen([sys.executable, '-c', 'import time, sys; time.sleep(0.2); sys.exit(1)']))
+        supervisor.check_line('[12:00:00 INFO]: Stopping server')
+        assert self._wait_for_crash(supervisor)
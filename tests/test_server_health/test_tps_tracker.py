@@ -0,0 +1,99 @@
+from server_health.tps_tracker import TpsTracker
+
+
+class FakeAntiBot:
+    """AntiBot, that only remembers if it became aggressive"""
+
+    def __init__(self):
+        """Init"""
+
+        self.aggressive: bool = False
+
+    def is_aggressive(self) -> bool:
+        """Checks if aggressive mode is on"""
+
+        return self.aggressive
+
+    def become_aggressive(self) -> None:
+        """Turns aggressive mode on"""
+
+        self.aggressive = True
+
+
+class FakeServerComm:
+    """ServerCommunicator, that only holds AntiBot"""
+
+    def __init__(self):
+        """Init"""
+
+        self.antibot: FakeAntiBot = FakeAntiBot()
+
+
+class TestTpsTracker:
+    """Tests for TpsTracker"""
+
+    @staticmethod
+    def _get_tracker(server_comm: FakeServerComm) -> TpsTracker:
+        """Creates tracker, that turns aggressive mode on after 2 lagging answers
+
+        Args:
+            server_comm: Communicator with AntiBot
+        Returns:
+            Tracker"""
+
+        return TpsTracker(server_comm, ['tps', 'mspt'], interval=60, low_tps=15, low_tps_probes=2, series_size=10)
+
+    def test_parses_answers(self):
+        """Answers of Paper and vanilla should be parsed, other lines should be ignored"""
+
+        server_comm = FakeServerComm()
+        tracker     = self._get_tracker(server_comm)
+
+        tracker.check_line('[12:00:00 INFO]: Name issued server command: /tps')
+        assert tracker.get_tps() is None
+        assert not tracker.is_lagging()
+
+        tracker.check_line('[12:00:00 INFO]: TPS from last 1m, 5m, 15m: §a*20.0, §a20.0, §a19.97')
+        tracker.check_line('[12:00:00 INFO]: Server tick times (avg/min/max) from last 5s, 10s, 1m:')
+        tracker.check_line('[12:00:00 INFO]: ◴ 12.3/4.5/40.1, 11.0/4.5/40.1, 10.2/3.9/45.0')
+        tracker.check_line('[12:00:00 INFO]: Average time per tick: 100.0ms (Target: 50.0ms)')
+        tracker.check_line("[12:00:00 WARN]: Can't keep up! Is the server overloaded? Running 2500ms or 50 ticks behind")
+
+        assert tracker.is_lagging()
+
+        series = [(tps, mspt) for _, tps, mspt in tracker.get_series()]
+        assert series == [(20.0, None), (None, 12.3), (10.0, 100.0)]
+        assert tracker.get_tps() == 10.0
+        assert not server_comm.antibot.aggressive
+
+    def test_low_tps_turns_aggressive(self):
+        """AntiBot should become aggressive only after several lagging answers in a row"""
+
+        server_comm = FakeServerComm()
+        tracker     = self._get_tracker(server_comm)
+
+        for tps in ('10.0', '19.0', '10.0'):
+            tracker.check_line(f'[12:00:00 INFO]: TPS from last 1m, 5m, 15m: {tps}, 20.0, 20.0')
+        assert not server_comm.antibot.aggressive
+
+        tracker.check_line('[12:00:00 INFO]: TPS from last 1m, 5m, 15m: 9.5, 20.0, 20.0')
+        assert server_comm.antibot.aggressive
+
+    def test_aggressive_again_only_after_recovery(self):
+        """Slow server should not turn aggressive mode on again, until its TPS recovers"""
+
+        server_comm = FakeServerComm()
+        tracker     = self._get_tracker(server_comm)
+
+        for tps in ('10.0', '10.0'):
+            tracker.check_line(f'[12:00:00 INFO]: TPS from last 1m, 5m, 15m: {tps}, 20.0, 20.0')
+        assert server_comm.antibot.aggressive
+
+        server_comm.antibot.aggressive = False
+        for tps in ('10.0', '10.0', '10.0'):
+            tracker.check_line(f'[12:00:00 INFO]: TPS from last 1m, 5m, 15m: {tps}, 20.0, 20.0')
+        assert not server_comm.antibot.aggressive
+
+        for tps in ('20.0', '10.0', '10.0'):
+            tracker.check_line(f'[12:00:00 INFO]: TPS from last 1m, 5m, 15m: {tps}, 20.0, 20.0')
+        assert server_comm.antibot.aggressive
@@ -45,3 +45,18 @@ class TestMinecraftServerManager:
         datetime_mock.now.return_value = datetime.datetime(1970, 1, 2, 15, 0)  # 3:00 PM
         main_comm.backup_now_trigger = True
         assert manager._check_backup_triggers() is True
+
+    def test_max_rss_bytes(self,
+                           monkeypatch: MonkeyPatch):
+        """Memory limit should be taken from MAX_MEM, but not when server is started with START_BAT
+
+        Args:
+            monkeypatch: patch to mock variables"""
+
+        monkeypatch.setattr("settings.settings.MAX_MEM", 4)
+        monkeypatch.setattr("settings.settings.health.MEM_ALERT_RATIO", 1.5)
+        monkeypatch.setattr("settings.settings.paths.START_BAT", "")
+        assert MinecraftServerManager._get_max_rss_bytes() == 6 * 2 ** 30
+
+        monkeypatch.setattr("settings.settings.paths.START_BAT", "start.bat")
+        assert MinecraftServerManager._get_max_rss_bytes() == 0
@@ -0,0 +1,51 @@
+import os
+
+from toxicity_manager.lemma_cache import LemmaCache
+
+
+class TestLemmaCache:
+    """Tests for LemmaCache"""
+
+    def test_lru(self):
+        """Repeated words should not be lemmatized again, the least recently used word should be dropped"""
+
+        calls = []
+
+        def lemmatize(word: str) -> str:
+            calls.append(word)
+            return word.upper()
+
+        cache = LemmaCache(lemmatizer=lemmatize, max_size=2)
+
+        assert cache.get_lemma('a') == 'A'
+        assert cache.get_lemma('b') == 'B'
+        assert cache.get_lemma('a') == 'A'
+        assert cache.get_lemma('c') == 'C'
+        assert cache.get_lemma('b') == 'B'
+
+        assert calls == ['a', 'b', 'c', 'b']
+        assert (cache.hits, cache.misses) == (1, 4)
+        assert cache.get_size() == 2
+
+    def test_warm_cache(self, tmp_path):
+        """Saved cache should be loaded without lemmatizing words again"""
+
+        file_path = os.path.join(tmp_path, 'lemmas.json')
+        cache = LemmaCache(lemmatizer=str.upper, max_size=10)
+        for word in ('a', 'b'):
+            cache.get_lemma(word)
+        cache.save(file_path)
+
+        warm_cache = LemmaCache(lemmatizer=lambda word: 'not cached', max_size=10)
+        warm_cache.load(file_path)
+
+        assert warm_cache.get_lemma('b') == 'B'
+        assert warm_cache.hits == 1
+
+    def test_missing_file(self, tmp_path):
+        """Missing file should leave cache empty"""
+
+        cache = LemmaCache(lemmatizer=str.upper, max_size=10)
+        cache.load(os.path.join(tmp_path, 'missing.json'))
+
+        assert cache.get_size() == 0
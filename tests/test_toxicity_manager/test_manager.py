@@ -0,0 +1,71 @@
+from unittest.mock import Mock
+
+import _pytest.monkeypatch
+
+from toxicity_manager import spam_guard
+from toxicity_manager import manager as toxicity_manager
+from toxicity_manager.manager import ToxicityManager
+
+
+class TestToxicityManager:
+    """Tests for ToxicityManager"""
+
+    def test_flood_is_checked_in_batches(self, monkeypatch: _pytest.monkeypatch.MonkeyPatch):
+        """Messages above rate limit should be checked joined, duplicates should be dropped"""
+
+        now = [100]
+        monkeypatch.setattr(spam_guard.time, 'monotonic', lambda: now[0])
+        monkeypatch.setattr(toxicity_manager.time, 'monotonic', lambda: now[0])
+        monkeypatch.setattr(toxicity_manager.ToxicityPool, 'start', lambda pool: None)
+        monkeypatch.setattr(toxicity_manager.settings.toxicity, 'CHAT_RATE_PER_SEC', 1)
+        monkeypatch.setattr(toxicity_manager.settings.toxicity, 'CHAT_BURST', 2)
+        monkeypatch.setattr(toxicity_manager.settings.toxicity, 'DUPLICATES_WINDOW', 5)
+        monkeypatch.setattr(toxicity_manager.settings.toxicity, 'MAX_BATCH', 3)
+        monkeypatch.setattr(toxicity_manager.settings.toxicity, 'HOLD_SEC', 60)
+        monkeypatch.setattr(toxicity_manager.settings.toxicity, 'HOLD_MAX', 100)
+
+        manager = ToxicityManager(Mock())
+        submitted = []
+        monkeypatch.setattr(manager.pool, 'submit', lambda user_name, message: submitted.append(message) or True)
+
+        for message in ('hi', 'hi', 'all', 'of', 'you', 'bad', 'words'):
+            manager.check_text(message, 'Flooder')
+
+        assert submitted == ['hi', 'all\nof\nyou']
+
+        now[0] += 10
+        manager.check_text('sorry', 'Flooder')
+        assert submitted == ['hi', 'all\nof\nyou', 'bad\nwords', 'sorry']
+
+    def test_held_messages_are_bounded(self, monkeypatch: _pytest.monkeypatch.MonkeyPatch):
+        """Held messages should be checked after timeout, dropped on disconnect and above the total limit"""
+
+        now = [100]
+        monkeypatch.setattr(spam_guard.time, 'monotonic', lambda: now[0])
+        monkeypatch.setattr(toxicity_manager.time, 'monotonic', lambda: now[0])
+        monkeypatch.setattr(toxicity_manager.ToxicityPool, 'start', lambda pool: None)
+        monkeypatch.setattr(toxicity_manager.settings.toxicity, 'CHAT_RATE_PER_SEC', 0.01)
+        monkeypatch.setattr(toxicity_manager.settings.toxicity, 'CHAT_BURST', 1)
+        monkeypatch.setattr(toxicity_manager.settings.toxicity, 'DUPLICATES_WINDOW', 1)
+        monkeypatch.setattr(toxicity_manager.settings.toxicity, 'MAX_BATCH', 10)
+        monkeypatch.setattr(toxicity_manager.settings.toxicity, 'HOLD_SEC', 5)
+        monkeypatch.setattr(toxicity_manager.settings.toxicity, 'HOLD_MAX', 3)
+
+        manager = ToxicityManager(Mock())
+        submitted = []
+        monkeypatch.setattr(manager.pool, 'submit', lambda user_name, message: submitted.append((user_name, message)) or True)
+
+        for user_name in ('First', 'Second', 'Third'):
+            manager.check_text('hi', user_name)
+        submitted.clear()
+
+        manager.check_text('bad', 'First')
+        now[0] += 1
+        manager.check_text('one', 'Second')
+        manager.check_text('two', 'Second')
+        manager.check_text('three', 'Third')
+        manager.on_disconnect('Third')
+
+        now[0] += 5
+        manager.check_text('four', 'Second')
+        assert submitted == [('Second', 'one\ntwo')]
@@ -0,0 +1,46 @@
+from toxicity_manager.matcher import ProfanityMatcher
+
+
+class TestProfanityMatcher:
+    """Tests for ProfanityMatcher"""
+
+    def test_whole_words(self):
+        """Only whole words should match, not parts of other words"""
+
+        matcher = ProfanityMatcher(['дурак', 'bad'])
+
+        assert matcher.contains_profanity('ты дурак')
+        assert matcher.contains_profanity('Дурак!!!')
+        assert matcher.contains_profanity('so bad, really')
+        assert not matcher.contains_profanity('дураками')
+        assert not matcher.contains_profanity('badge')
+        assert not matcher.contains_profanity('')
+
+    def test_normalization(self):
+        """Ё, leetspeak and latin look-alikes should be normalized both in words and in text"""
+
+        matcher = ProfanityMatcher(['ёжик', 'e6aль'])
+
+        assert matcher.contains_profanity('ежик')
+        assert matcher.contains_profanity('ЁЖИК')
+        assert matcher.contains_profanity('ебаль')
+        assert matcher.contains_profanity('3a e6@ль')
+
+    def test_phrases_and_overlaps(self):
+        """Phrases should match with any separators, words should be found when overlapping with others"""
+
+        matcher = ProfanityMatcher(['злой пес', 'пес', 'кот'])
+
+        assert matcher.contains_profanity('злой...пес')
+        assert matcher.contains_profanity('злой кот')
+        assert not matcher.contains_profanity('злой песок')
+        assert matcher.words_count == 3
+
+    def test_default_words(self):
+        """Default English word list of better_profanity should be caught"""
+
+        matcher = ProfanityMatcher(ProfanityMatcher.get_default_words())
+
+        assert matcher.contains_profanity('what the fuck')
+        assert matcher.contains_profanity('Sh1t happens')
+        assert not matcher.contains_profanity('hello, anyone wants to trade diamonds?')
@@ -0,0 +1,135 @@
+import time
+import threading
+
+import _pytest.monkeypatch
+
+from toxicity_manager import pool
+from toxicity_manager.pool import ToxicityPool
+
+
+class TestToxicityPool:
+    """Tests for ToxicityPool"""
+
+    def _make_pool(self,
+                   reported: list,
+                   queue_size: int = 100) -> ToxicityPool:
+        """Creates pool, that checks messages in a thread of this process
+
+        Args:
+            reported: List to collect (User, messages) of toxic messages
+            queue_size: Size of the queue
+        Returns:
+            Pool"""
+
+        return ToxicityPool(on_toxic=lambda user_name, messages: reported.append((user_name, messages)),
+                            bad_words_path='',
+                            lemma_cache_path='',
+                            lemma_cache_size=10,
+                            workers=0,
+                            queue_size=queue_size,
+                            max_batch=3)
+
+    def _wait(self,
+              condition) -> None:
+        """Waits for condition to become true
+
+        Args:
+            condition: Function to check"""
+
+        deadline = time.monotonic() + 5
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_messages_batched_per_user(self, monkeypatch: _pytest.monkeypatch.MonkeyPatch):
+        """Messages, that came while User's job is running, should be checked as a single next job, overflow joined"""
+
+        release = threading.Event()
+        batches = []
+
+        def analyze(messages: list[str]) -> bool:
+            if messages:
+                batches.append(messages)
+                release.wait(5)
+            return 'bad' in messages
+
+        monkeypatch.setattr(pool, 'init_worker', lambda *args: None)
+        monkeypatch.setattr(pool, 'analyze_messages', analyze)
+
+        reported = []
+        toxicity_pool = self._make_pool(reported)
+        toxicity_pool.start()
+        try:
+            toxicity_pool.submit('Player', 'first')
+            self._wait(lambda: len(batches) == 1)
+            for message in ('1', '2', 'bad', '3'):
+                toxicity_pool.submit('Player', message)
+            self._wait(lambda: toxicity_pool.get_queue_size() == 0)
+            time.sleep(0.1)
+            release.set()
+            self._wait(lambda: len(reported) == 1)
+        finally:
+            toxicity_pool.stop()
+
+        assert batches == [['first'], ['1\n2', 'bad', '3']]
+        assert reported == [('Player', ['1\n2', 'bad', '3'])]
+
+    def test_queue_overflow(self):
+        """Messages above queue size should be dropped without blocking"""
+
+        toxicity_pool = self._make_pool([], queue_size=2)
+
+        assert toxicity_pool.submit('Player', '1')
+        assert toxicity_pool.submit('Player', '2')
+        assert not toxicity_pool.submit('Player', '3')
+        assert toxicity_pool.dropped == 1
+
+    def test_real_analyzer(self, tmp_path):
+        """Toxic messages should be reported with real morphology in worker thread, default English words too"""
+
+        bad_words_path = tmp_path / 'bad_words.txt'
+        bad_words_path.write_text('дурак\n', encoding='utf-8')
+
+        reported = []
+        toxicity_pool = ToxicityPool(on_toxic=lambda user_name, messages: reported.append(user_name),
+                                     bad_words_path=str(bad_words_path),
+                                     lemma_cache_path='',
+                                     lemma_cache_size=10,
+                                     workers=0,
+                                     queue_size=100,
+                                     max_batch=10)
+        toxicity_pool.start()
+        try:
+            toxicity_pool.submit('Nice', 'привет всем')
+            toxicity_pool.submit('Rude', 'вы все дураки')
+            toxicity_pool.submit('Swearer', 'what the fuck')
+            self._wait(lambda: len(reported) == 2)
+            time.sleep(0.1)
+        finally:
+            toxicity_pool.stop()
+
+        assert sorted(reported) == ['Rude', 'Swearer']
+
+    def test_worker_process(self, tmp_path):
+        """Toxic messages should be reported from spawned worker-process, as with default settings"""
+
+        bad_words_path = tmp_path / 'bad_words.txt'
+        bad_words_path.write_text('дурак\n', encoding='utf-8')
+
+        reported = []
+        toxicity_pool = ToxicityPool(on_toxic=lambda user_name, messages: reported.append((user_name, messages)),
+                                     bad_words_path=str(bad_words_path),
+                                     lemma_cache_path='',
+                                     lemma_cache_size=10,
+                                     workers=1,
+                                     queue_size=100,
+                                     max_batch=10)
+        toxicity_pool.start()
+        try:
+            toxicity_pool.submit('Rude', 'ты дурак')
+            deadline = time.monotonic() + 60
+            while not reported and time.monotonic() < deadline:
+                time.sleep(0.05)
+        finally:
+            toxicity_pool.stop()
+
+        assert reported == [('Rude', ['ты дурак'])]
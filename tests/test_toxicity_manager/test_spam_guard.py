@@ -0,0 +1,74 @@
+import _pytest.monkeypatch
+
+from toxicity_manager import spam_guard
+from toxicity_manager.spam_guard import SpamGuard
+
+
+class FakeClock:
+    """Monotonic clock, moved by test"""
+
+    def __init__(self):
+        """Init"""
+
+        self.now: float = 100
+
+    def __call__(self) -> float:
+        """Current time
+
+        Returns:
+            Current time"""
+
+        return self.now
+
+
+class TestSpamGuard:
+    """Tests for SpamGuard"""
+
+    def test_rate_limit(self, monkeypatch: _pytest.monkeypatch.MonkeyPatch):
+        """Messages above burst should be spam, until bucket refills"""
+
+        clock = FakeClock()
+        monkeypatch.setattr(spam_guard.time, 'monotonic', clock)
+        guard = SpamGuard(rate=1, burst=3, window=0)
+
+        reasons = [guard.check('Player', f'message {i}') for i in range(5)]
+        assert reasons == [None, None, None, SpamGuard.RATE_LIMITED, SpamGuard.RATE_LIMITED]
+        assert guard.check('Other', 'message') is None
+
+        clock.now += 1
+        assert guard.check('Player', 'message 5') is None
+        assert guard.check('Player', 'message 6') == SpamGuard.RATE_LIMITED
+
+    def test_duplicates(self, monkeypatch: _pytest.monkeypatch.MonkeyPatch):
+        """Repeated message should be spam, while it is among the last window messages"""
+
+        clock = FakeClock()
+        monkeypatch.setattr(spam_guard.time, 'monotonic', clock)
+        guard = SpamGuard(rate=100, burst=100, window=2)
+
+        assert guard.check('Player', 'Buy gold') is None
+        assert guard.check('Player', 'buy   GOLD') == SpamGuard.DUPLICATE
+        assert guard.check('Other', 'buy gold') is None
+        assert guard.check('Player', 'hello') is None
+        assert guard.check('Player', 'hi') is None
+        assert guard.check('Player', 'buy gold') is None
+
+    def test_single_punishment_per_wave(self, monkeypatch: _pytest.monkeypatch.MonkeyPatch):
+        """Only the first spam message of a wave should start it, new wave starts after bucket was full again"""
+
+        clock = FakeClock()
+        monkeypatch.setattr(spam_guard.time, 'monotonic', clock)
+        guard = SpamGuard(rate=1, burst=2, window=0)
+
+        new_waves = []
+        for i in range(5):
+            guard.check('Player', str(i))
+            new_waves.append(guard.is_new_spammer('Player'))
+        assert new_waves == [False, False, True, False, False]
+
+        clock.now += 10
+        guard.check('Player', 'calm')
+        assert not guard.is_new_spammer('Player')
+        guard.check('Player', 'spam')
+        guard.check('Player', 'spam')
+        assert guard.is_new_spammer('Player')
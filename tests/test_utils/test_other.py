@@ -0,0 +1,103 @@
+from pathlib import Path
+from _pytest.monkeypatch import MonkeyPatch
+
+from utils.other import FileLocator, CONFIG_PATH_ENV_VAR
+
+
+class TestFileLocator:
+    """Tests for FileLocator"""
+
+    def test_finds_file_in_cwd(self,
+                               tmp_path: Path,
+                               monkeypatch: MonkeyPatch):
+        """File in current working directory should be found
+
+        Args:
+            tmp_path: Path to a temp folder for testing
+            monkeypatch: Patch for variables"""
+
+        monkeypatch.delenv(CONFIG_PATH_ENV_VAR, raising=False)
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / 'some_config.env').write_text('A=1')
+
+        locator = FileLocator()
+
+        assert locator.find('some_config.env') == str(tmp_path / 'some_config.env')
+
+    def test_finds_file_in_parent(self,
+                                  tmp_path: Path,
+                                  monkeypatch: MonkeyPatch):
+        """File in parent folder should be found
+
+        Args:
+            tmp_path: Path to a temp folder for testing
+            monkeypatch: Patch for variables"""
+
+        monkeypatch.delenv(CONFIG_PATH_ENV_VAR, raising=False)
+        nested = tmp_path / 'a' / 'b'
+        nested.mkdir(parents=True)
+        monkeypatch.chdir(nested)
+        (tmp_path / 'some_config.env').write_text('A=1')
+
+        locator = FileLocator()
+
+        assert locator.find('some_config.env') == str(tmp_path / 'some_config.env')
+
+    def test_does_not_walk_subfolders(self,
+                                      tmp_path: Path,
+                                      monkeypatch: MonkeyPatch):
+        """File, hidden in subfolder of cwd, should not be found
+
+        Args:
+            tmp_path: Path to a temp folder for testing
+            monkeypatch: Patch for variables"""
+
+        monkeypatch.delenv(CONFIG_PATH_ENV_VAR, raising=False)
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / 'world').mkdir()
+        (tmp_path / 'world' / 'hidden_config.env').write_text('A=1')
+
+        locator = FileLocator()
+
+        assert locator.find('hidden_config.env') == ''
+
+    def test_env_var_has_priority(self,
+                                  tmp_path: Path,
+                                  monkeypatch: MonkeyPatch):
+        """Path from environment variable should win over cwd
+
+        Args:
+            tmp_path: Path to a temp folder for testing
+            monkeypatch: Patch for variables"""
+
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / 'some_config.env').write_text('A=1')
+        other_folder = tmp_path / 'other'
+        other_folder.mkdir()
+        (other_folder / 'some_config.env').write_text('A=2')
+        monkeypatch.setenv(CONFIG_PATH_ENV_VAR, str(other_folder))
+
+        locator = FileLocator()
+
+        assert locator.find('some_config.env') == str(other_folder / 'some_config.env')
+
+    def test_result_is_memoized(self,
+                                tmp_path: Path,
+                                monkeypatch: MonkeyPatch):
+        """Second lookup should return first result without searching again
+
+        Args:
+            tmp_path: Path to a temp folder for testing
+            monkeypatch: Patch for variables"""
+
+        monkeypatch.delenv(CONFIG_PATH_ENV_VAR, raising=False)
+        monkeypatch.chdir(tmp_path)
+        config_path = tmp_path / 'some_config.env'
+        config_path.write_text('A=1')
+
+        locator = FileLocator()
+        first = locator.find('some_config.env')
+        config_path.unlink()
+
+        assert locator.find('some_config.env') == first
+        assert locator.get_discovery_time('some_config.env') >= 0